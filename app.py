@@ -1,4 +1,7 @@
+import os
 import streamlit as st
+import plotly.graph_objects as go
+from utils import metrics
 
 st.set_page_config(
     page_title="Interactive Math Tool",
@@ -17,6 +20,62 @@ try:
 except FileNotFoundError:
     pass # No custom CSS found
 
+# --- Hidden admin view: open /?admin=<STREAMLIT_MATH_ADMIN_TOKEN> ---
+# Disabled unless the token environment variable is set.
+admin_token = os.environ.get("STREAMLIT_MATH_ADMIN_TOKEN")
+if admin_token and st.query_params.get("admin") == admin_token:
+    st.title("Operation Metrics")
+    timings, counters = metrics.snapshot()
+
+    if not timings:
+        st.info("No operations recorded yet in this server process.")
+    else:
+        rows = []
+        for op, stats in timings.items():
+            rows.append({
+                "Operation": op,
+                "Count": stats['count'],
+                "Errors": stats['errors'],
+                "Mean (ms)": 1e3 * stats['sum'] / stats['count'],
+                "p50 (ms)": 1e3 * metrics.estimate_quantile(stats, 0.50),
+                "p95 (ms)": 1e3 * metrics.estimate_quantile(stats, 0.95),
+                "p99 (ms)": 1e3 * metrics.estimate_quantile(stats, 0.99),
+                "Max (ms)": 1e3 * stats['max'],
+                "Total (s)": stats['sum'],
+            })
+        rows.sort(key=lambda row: row["Total (s)"], reverse=True) # Biggest time sinks first
+        st.dataframe(rows, use_container_width=True)
+
+        selected_op = st.selectbox("Latency histogram", [row["Operation"] for row in rows])
+        bucket_labels = [f"≤ {bound:g}s" for bound in metrics.BUCKETS[:-1]] + ["> 30s"]
+        fig_hist = go.Figure(go.Bar(x=bucket_labels, y=timings[selected_op]['buckets']))
+        fig_hist.update_layout(title=f"Latency distribution: {selected_op}", xaxis_title="Latency bucket", yaxis_title="Calls")
+        st.plotly_chart(fig_hist, use_container_width=True)
+
+    if counters:
+        st.subheader("Event Counters")
+        st.dataframe([{"Event": k, "Count": v} for k, v in sorted(counters.items())], use_container_width=True)
+
+    current_gauges = metrics.gauges()
+    if current_gauges:
+        st.subheader("Scheduler")
+        st.dataframe([{"Gauge": k, "Value": v} for k, v in sorted(current_gauges.items())], use_container_width=True)
+
+    admin_cols = st.columns(3)
+    with admin_cols[0]:
+        if st.button("Export Prometheus File"):
+            try:
+                st.success(f"Metrics written to {metrics.export_prometheus()}")
+            except OSError as e:
+                st.error(f"Could not write metrics file: {e}")
+    with admin_cols[1]:
+        st.download_button("Download metrics.prom", metrics.render_prometheus(), file_name="metrics.prom", mime="text/plain")
+    with admin_cols[2]:
+        if st.button("Reset Metrics"):
+            metrics.reset()
+            st.rerun()
+    st.stop()
+
 # *** Use the 01_Home.py file as the effective landing page. ***
 
 st.sidebar.success("Select a module above.")
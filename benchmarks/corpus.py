@@ -0,0 +1,138 @@
+import sympy
+
+# Textbook-style inputs used by the benchmark suite.
+# Each entry mirrors what a student would type into the corresponding page.
+
+PARSE_INPUTS = [
+    "x**2 + 3*x - 4",
+    "sin(x)/x",
+    "2x sin(x) + cos(2x)",
+    "exp(-x**2) * log(x, 10)",
+    "(x**2 - 1) / (x - 1)",
+    "sqrt(1 - x**2) + asin(x)",
+    "a*sin(k*(x - pi/4)) + c",
+    "(x**3 - 2*x + 1)**5",
+]
+
+PLOT_INPUTS = [
+    "x**2",
+    "sin(x)/x",
+    "tan(x)",
+    "sqrt(x)",
+    "exp(-x**2) * cos(3*x)",
+]
+
+PLOT_POINTS = [500, 5000, 50000]
+
+# Two-variable plots on [-5, 5]^2, (expr, points per axis): cold tile cache vs. a panned view
+SURFACE_INPUTS = [
+    ("sin(x)*cos(y)", 500),
+    ("sin(x)*cos(y)", 1000),
+    ("exp(-(x**2 + y**2)/4) * cos(x*y)", 1000),
+]
+
+# Implicit curves, (relation, half-width of the square view)
+IMPLICIT_INPUTS = [
+    ("x^2 + y^2 = 1", 2),
+    ("sin(x) = cos(y)", 10),
+    ("tan(x) = y", 5),
+    ("sin(x*y) = 1/2", 5),
+]
+
+# High-resolution export grids: chunked evaluation, single-threaded vs. the thread pool
+GRID_POINTS = 2_000_000
+
+# Evaluation backends (utils.backends) are compared on the plot inputs plus deeper expressions
+BACKEND_INPUTS = PLOT_INPUTS + [
+    "x**3 * sin(x)",
+    "atan(x)/sqrt(1 + x**2)",
+    "exp(-x**2/8) * (sin(3*x) + cos(5*x)) / (1 + x**2)",
+    "log(x**2 + 1) * cos(x)**2 - sqrt(abs(x)) * sin(2*x)",
+]
+
+# (expr, var, point, dir)
+LIMIT_INPUTS = [
+    ("sin(x)/x", "x", "0", "+"),
+    ("(1 + 1/x)**x", "x", "oo", "-"),
+    ("(x**2 - 1)/(x - 1)", "x", "1", "+"),
+    ("(1 - cos(x))/x**2", "x", "0", "+"),
+    ("x*log(x)", "x", "0", "+"),
+    ("(3*x**2 + 2)/(5*x**2 - x)", "x", "oo", "-"),
+]
+
+# (expr, var, order)
+DERIVATIVE_INPUTS = [
+    ("x**3 * sin(x)", "x", 1),
+    ("exp(x)*cos(x)", "x", 2),
+    ("log(x**2 + 1)", "x", 1),
+    ("atan(x)/sqrt(1 + x**2)", "x", 3),
+    ("tan(x)", "x", 5),
+]
+
+# High orders: sympy.diff trees vs. the shared-subexpression program (utils.derivatives)
+HIGH_ORDER_DERIVATIVE_INPUTS = [
+    ("tan(sin(x))", "x", 12),
+    ("exp(sin(x))/x", "x", 12),
+    ("sqrt(1 + sin(x)**2)", "x", 10),
+]
+
+# (expr, var, lower, upper); lower/upper None for indefinite integrals
+INTEGRAL_INPUTS = [
+    ("cos(x)", "x", None, None),
+    ("x**2", "x", "0", "2"),
+    ("x*exp(x)", "x", None, None),
+    ("1/(x**2 + 1)", "x", "-oo", "oo"),
+    ("sin(x)**2", "x", "0", "pi"),
+    ("(x + 1)/(x**2 - 4)", "x", None, None),
+    ("x**3 - 2*x + 1", "x", "-1", "3"),
+]
+
+# (expr, var, point, order)
+TAYLOR_INPUTS = [
+    ("exp(x)", "x", "0", 3),
+    ("sin(x)", "x", "0", 9),
+    ("log(1 + x)", "x", "0", 6),
+    ("cos(x)", "x", "pi/2", 5),
+    ("1/(1 - x)", "x", "0", 12),
+]
+
+# (solver name, args) - argument order follows the solver signatures in utils.geometry_helpers
+TRIANGLE_INPUTS = [
+    ("solve_sss", (5.0, 6.0, 7.0)),
+    ("solve_sss", (3.0, 4.0, 5.0)),
+    ("solve_sas", (6.0, 60.0, 7.0)),
+    ("solve_asa", (60.0, 7.0, 50.0)),
+    ("solve_aas", (50.0, 60.0, 6.0)),
+]
+
+# Distances per angle-of-elevation sweep
+ELEVATION_SWEEP_SIZES = [5000, 100000]
+
+# (routes, legs per route) for the vectorized great-circle route solver, random legs with a fixed seed
+ROUTE_FLEETS = [
+    (10, 5),
+    (10000, 20),
+]
+
+TRIG_ANGLES = [
+    sympy.pi / 6,
+    sympy.pi / 4,
+    2 * sympy.pi / 3,
+    7 * sympy.pi / 6,
+    sympy.rad(37),
+]
+
+SEQUENCE_INPUTS = [
+    "1/n",
+    "(-1)**n / n",
+    "n/(n + 1)",
+    "(1 + 1/n)**n",
+]
+SEQUENCE_MAX_N = 50
+
+SERIES_INPUTS = [
+    "1/n**2",
+    "1/2**n",
+    "1/(n*(n + 1))",
+    "(-1)**(n+1) / n",
+]
@@ -0,0 +1,311 @@
+"""
+Benchmark suite for the utils hot paths.
+
+Runs offline (no Streamlit server needed) and writes JSON results that can be
+compared against a stored baseline:
+
+    python -m benchmarks.run                          # run everything, print a table
+    python -m benchmarks.run -o results.json          # also write JSON results
+    python -m benchmarks.run --save-baseline          # store results as the baseline
+    python -m benchmarks.run --compare                # fail (exit 1) on regressions
+    python -m benchmarks.run -k compute_integral      # only matching benchmarks
+    python -m benchmarks.run --slow-log slow_expressions.jsonl   # add logged slow cases
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+
+import numpy as np
+import sympy
+from sympy.core.cache import clear_cache
+
+from utils.helpers import parse_expression
+from utils.plotting_helpers import plot_function, evaluate_surface, clear_surface_cache, plot_implicit
+from utils.numeric_helpers import evaluate_chunked, eval_threads, estimate_limit
+from utils import backends
+from utils.autodiff import value_and_derivative
+from utils.calculus_helpers import compute_limit, compute_derivative, compute_derivative_program, compute_integral, compute_taylor_series, parse_point
+from utils import geometry_helpers
+from utils.trig_helpers import get_trig_values
+from utils import slowlog
+from . import corpus
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Index variable used by the Sequences & Series page
+n = sympy.symbols('n', integer=True, positive=True)
+
+
+# --- Sequence / series evaluation (mirrors pages/07_Calculus_2_Sequences.py) ---
+
+def evaluate_sequence(term_str, n_max):
+    """Evaluates the first n_max terms and the limit as n -> oo, like the Sequence Plotter."""
+    seq_expr = parse_expression(term_str, local_dict={'n': n})
+    terms = [float(seq_expr.subs({n: val}).evalf()) for val in np.arange(1, n_max + 1)]
+    try:
+        seq_limit = sympy.limit(seq_expr, n, sympy.oo)
+    except Exception:
+        seq_limit = None  # The page reports this as a warning and still plots the terms
+    return terms, seq_limit
+
+
+def evaluate_series(term_str):
+    """Runs the divergence test and symbolic summation, like the Series Convergence section."""
+    term_expr = parse_expression(term_str, local_dict={'n': n})
+    try:
+        term_limit = sympy.limit(term_expr, n, sympy.oo)
+    except Exception:
+        return None, None  # The page stops at the divergence test when the limit fails
+    if term_limit != 0:
+        return term_limit, None
+    return term_limit, sympy.summation(term_expr, (n, 1, sympy.oo))
+
+
+# --- Benchmark registry ---
+
+def collect_benchmarks(slow_log=None):
+    """
+    Builds the list of benchmarks as (name, callable, cache_sensitive) tuples.
+    Cache-sensitive benchmarks clear SymPy's cache before every sample so repeated
+    runs measure real work instead of cache hits.
+    Entries of a slow-expression log (see utils.slowlog) are added when given.
+    """
+    benchmarks = []
+
+    for expr_str in corpus.PARSE_INPUTS:
+        benchmarks.append((f"parse_expression[{expr_str}]", lambda s=expr_str: parse_expression(s), True))
+
+    for expr_str in corpus.PLOT_INPUTS:
+        for points in corpus.PLOT_POINTS:
+            benchmarks.append((f"plot_function[{expr_str}|{points}]",
+                               lambda s=expr_str, p=points: plot_function(s, 'x', -10, 10, points=p), True))
+
+    def surface(expr_str, points, cold):
+        if cold:
+            clear_surface_cache()
+        return evaluate_surface(expr_str, (-5, 5), (-5, 5), points)
+
+    for expr_str, points in corpus.SURFACE_INPUTS:
+        benchmarks.append((f"evaluate_surface[{expr_str}|{points}|cold]",
+                           lambda s=expr_str, p=points: surface(s, p, True), False))
+        # Cold view, then panned by a tenth of it: most tiles of the second view come from the cache
+        benchmarks.append((f"evaluate_surface[{expr_str}|{points}|cold+pan]",
+                           lambda s=expr_str, p=points: (surface(s, p, True), evaluate_surface(s, (-4, 6), (-5, 5), p)), False))
+
+    for relation, half_width in corpus.IMPLICIT_INPUTS:
+        view = (-half_width, half_width)
+        benchmarks.append((f"plot_implicit[{relation}]", lambda r=relation, v=view: plot_implicit(r, v, v), True))
+
+    grid = np.linspace(-10, 10, corpus.GRID_POINTS)
+    for expr_str in corpus.PLOT_INPUTS:
+        func = sympy.lambdify(sympy.symbols('x'), parse_expression(expr_str), modules=['numpy'])
+        for threads in sorted({1, eval_threads()}):
+            benchmarks.append((f"evaluate_chunked[{expr_str}|{corpus.GRID_POINTS}|threads={threads}]",
+                               lambda f=func, t=threads: evaluate_chunked(f, grid, threads=t), False))
+
+    # Single-threaded, so the comparison isolates the backend; skipped for backends that aren't installed
+    for expr_str in corpus.BACKEND_INPUTS:
+        expr = parse_expression(expr_str)
+        for backend in backends.available_backends():
+            func = backends.lambdify(sympy.symbols('x'), expr, backend=backend)
+            benchmarks.append((f"backend[{expr_str}|{backend}|{corpus.GRID_POINTS}]",
+                               lambda f=func: evaluate_chunked(f, grid, threads=1), False))
+
+    # f and f' over a plot grid: one forward-mode AD pass
+    for expr_str in corpus.PLOT_INPUTS:
+        expr = parse_expression(expr_str)
+        for points in corpus.PLOT_POINTS:
+            x_vals = np.linspace(-10, 10, points)
+            benchmarks.append((f"value_and_derivative[{expr_str}|{points}]",
+                               lambda e=expr, v=x_vals: value_and_derivative(e, sympy.symbols('x'), v), False))
+
+    for expr_str, var_str, point_str, dir_str in corpus.LIMIT_INPUTS:
+        benchmarks.append((f"compute_limit[{expr_str}|{var_str}->{point_str}{dir_str}]",
+                           lambda args=(expr_str, var_str, point_str, dir_str): compute_limit(*args), True))
+        benchmarks.append((f"estimate_limit[{expr_str}|{var_str}->{point_str}{dir_str}]",
+                           lambda args=(parse_expression(expr_str), sympy.symbols(var_str), parse_point(point_str), dir_str): estimate_limit(*args), False))
+
+    for expr_str, var_str, order in corpus.DERIVATIVE_INPUTS:
+        benchmarks.append((f"compute_derivative[{expr_str}|{var_str}|{order}]",
+                           lambda args=(expr_str, var_str, order): compute_derivative(*args), True))
+
+    for expr_str, var_str, order in corpus.HIGH_ORDER_DERIVATIVE_INPUTS:
+        args = (expr_str, var_str, order)
+        benchmarks.append((f"compute_derivative[{expr_str}|{var_str}|{order}]", lambda a=args: compute_derivative(*a), True))
+        benchmarks.append((f"compute_derivative_program[{expr_str}|{var_str}|{order}]",
+                           lambda a=args: compute_derivative_program(*a), True))
+
+    for expr_str, var_str, lower, upper in corpus.INTEGRAL_INPUTS:
+        bounds = "" if lower is None else f"|{lower}..{upper}"
+        benchmarks.append((f"compute_integral[{expr_str}|{var_str}{bounds}]",
+                           lambda args=(expr_str, var_str, lower, upper): compute_integral(*args), True))
+
+    for expr_str, var_str, point_str, order in corpus.TAYLOR_INPUTS:
+        benchmarks.append((f"compute_taylor_series[{expr_str}|{var_str}={point_str}|{order}]",
+                           lambda args=(expr_str, var_str, point_str, order): compute_taylor_series(*args), True))
+
+    for solver_name, args in corpus.TRIANGLE_INPUTS:
+        solver = getattr(geometry_helpers, solver_name)
+        benchmarks.append((f"{solver_name}{args}", lambda f=solver, a=args: f(*a), False))
+
+    for solver_name, args in corpus.TRIANGLE_INPUTS:
+        solve_type = solver_name.removeprefix("solve_").upper()
+        inputs = geometry_helpers.TRIANGLE_SOLVERS_MANY[solve_type][1]
+        sigmas = [0.5 if name in geometry_helpers.ANGLE_NAMES else 0.05 for name in inputs]
+        benchmarks.append((f"propagate_triangle_uncertainty[{solve_type}{args}]",
+                           lambda t=solve_type, a=args, s=sigmas: geometry_helpers.propagate_triangle_uncertainty(t, a, s, seed=0), False))
+
+    for size in corpus.ELEVATION_SWEEP_SIZES:
+        sweep = np.linspace(1.0, 1000.0, size)
+        benchmarks.append((f"solve_angle_elevation_many[{size}]",
+                           lambda d=sweep: geometry_helpers.solve_angle_elevation_many(d, 50.0), False))
+        benchmarks.append((f"solve_height_from_elevation_many[{size}]",
+                           lambda d=sweep: geometry_helpers.solve_height_from_elevation_many(d, 30.0), False))
+
+    rng = np.random.default_rng(0)
+    for routes, legs in corpus.ROUTE_FLEETS:
+        args = (rng.uniform(-60, 60, routes), rng.uniform(-180, 180, routes),
+                rng.uniform(0, 360, (routes, legs)), rng.uniform(0, 1000, (routes, legs)))
+        benchmarks.append((f"solve_routes[{routes}x{legs}]", lambda a=args: geometry_helpers.solve_routes(*a), False))
+
+    for angle in corpus.TRIG_ANGLES:
+        benchmarks.append((f"get_trig_values[{angle}]", lambda ang=angle: get_trig_values(ang), True))
+
+    for term_str in corpus.SEQUENCE_INPUTS:
+        benchmarks.append((f"evaluate_sequence[{term_str}|{corpus.SEQUENCE_MAX_N}]",
+                           lambda s=term_str: evaluate_sequence(s, corpus.SEQUENCE_MAX_N), True))
+
+    for term_str in corpus.SERIES_INPUTS:
+        benchmarks.append((f"evaluate_series[{term_str}]", lambda s=term_str: evaluate_series(s), True))
+
+    if slow_log:
+        operations = slowlog.replay_operations()
+        for index, entry in enumerate(slowlog.read_log(slow_log), start=1):
+            try:
+                call = slowlog.replay_call(entry, operations)
+            except (KeyError, sympy.SympifyError):
+                continue
+            benchmarks.append((f"slowlog[{index}:{entry['operation']}]", call, True))
+
+    return benchmarks
+
+
+def time_benchmark(func, cache_sensitive, repeat):
+    """Returns per-call timings (seconds) for `repeat` samples."""
+    func()  # Warm-up: imports, lambdify code generation, etc.
+
+    if cache_sensitive:
+        samples = []
+        for _ in range(repeat):
+            clear_cache()
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+        return samples, 1
+
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return [total / number for total in timer.repeat(repeat=repeat, number=number)], number
+
+
+def run_benchmarks(selected, repeat):
+    results = {}
+    for name, func, cache_sensitive in selected:
+        samples, number = time_benchmark(func, cache_sensitive, repeat)
+        results[name] = {
+            "min": min(samples),
+            "median": statistics.median(samples),
+            "mean": statistics.mean(samples),
+            "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            "repeat": repeat,
+            "number": number,
+        }
+        print(f"{name:<70} {results[name]['median'] * 1e3:>10.3f} ms", flush=True)
+    return results
+
+
+def environment_info():
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sympy": sympy.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Prints a comparison table and returns the names of regressed benchmarks.
+    Compares the fastest sample, which is the least sensitive to background noise.
+    """
+    regressions = []
+    print()
+    print(f"{'Benchmark (min, ms)':<70} {'Baseline':>10} {'Current':>10} {'Ratio':>7}")
+    for name, stats in results.items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if base is None:
+            print(f"{name:<70} {'-':>10} {stats['min'] * 1e3:>10.3f} {'new':>7}")
+            continue
+        ratio = stats["min"] / base["min"] if base["min"] > 0 else float("inf")
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<70} {base['min'] * 1e3:>10.3f} {stats['min'] * 1e3:>10.3f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the utils hot paths.")
+    parser.add_argument("-k", "--filter", default=None, help="Only run benchmarks whose name contains this string.")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Samples per benchmark (default: 5).")
+    parser.add_argument("-o", "--output", default=None, help="Write JSON results to this file.")
+    parser.add_argument("--slow-log", default=None, help="Also benchmark the entries of this slow-expression log.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file (default: benchmarks/baseline.json).")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline.")
+    parser.add_argument("--compare", action="store_true", help="Compare against the baseline and exit 1 on regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown before a benchmark counts as regressed (default: 0.25 = 25%%).")
+    args = parser.parse_args(argv)
+
+    # Benchmark runs should not append to the production slow-expression log
+    os.environ[slowlog.SLOW_THRESHOLD_ENV] = "inf"
+
+    selected = [b for b in collect_benchmarks(args.slow_log) if args.filter is None or args.filter in b[0]]
+    if not selected:
+        print(f"No benchmarks match '{args.filter}'.")
+        return 1
+
+    report = {"environment": environment_info(), "benchmarks": run_benchmarks(selected, args.repeat)}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if args.compare:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            print(f"\nNo baseline found at {args.baseline}. Run with --save-baseline first.")
+            return 1
+        regressions = compare_to_baseline(report["benchmarks"], baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.tolerance:.0%}.")
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
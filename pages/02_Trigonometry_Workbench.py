@@ -3,9 +3,14 @@ import numpy as np
 import math
 import sympy
 import plotly.graph_objects as go
-from utils.helpers import parse_expression, display_results, default_symbols, theta, alpha, beta
-from utils.trig_helpers import REFERENCE_ANGLES, TRIG_IDENTITIES, get_trig_values, check_reference_angle
-from utils.plotting_helpers import plot_unit_circle, plot_function
+from utils.helpers import parse_expression, display_results, default_symbols, theta
+from utils.trig_helpers import alpha, beta, REFERENCE_ANGLES, TRIG_IDENTITIES, get_trig_values, check_reference_angle
+from utils.plotting_helpers import plot_unit_circle, plot_unit_circle_animation, plot_function, plot_parameterized, compile_parameterized
+from utils.metrics import timed
+from utils.slowlog import watch
+from utils import coalesce
+from utils.numeric_helpers import find_roots_numeric
+from utils import workers
 
 st.set_page_config(page_title="Trigonometry Workbench", layout="wide")
 st.title("📐 Trigonometry Workbench")
@@ -16,49 +21,56 @@ col1, col2 = st.columns([1, 2]) # Input column, Plot column
 
 with col1:
     unit_mode = st.radio("Angle Input Mode", ["Degrees", "Radians"], key="unit_mode")
-    if unit_mode == "Degrees":
-        angle_deg = st.slider("Angle (degrees)", 0.0, 360.0, 45.0, 1.0, key="angle_deg_slider")
-        angle_rad_sympy = sympy.rad(angle_deg) # Keep symbolic for trig values
-        angle_rad_float = math.radians(angle_deg) # Float for plotting
+    # Animated mode: every frame is precomputed and the slider runs in the browser (no reruns)
+    unit_animated = st.toggle("Animated sweep (client-side slider)", value=False, key="unit_animated")
+    if unit_animated:
+        st.write("Drag the slider under the circle or press ▶ Play. The values for each angle are shown on the plot; reference angles are marked with a star and their exact values.")
+        fig_unit, err_unit = plot_unit_circle_animation(360 if unit_mode == "Degrees" else 720, radians=unit_mode == "Radians")
     else:
-        # Allow direct input or slider for radians
-        angle_rad_input = st.number_input("Angle (radians)", value=float(sympy.pi/4), min_value=0.0, max_value=float(2*sympy.pi), step=float(sympy.pi/12), format="%.4f", key="angle_rad_input")
-        # Use a slider for easier exploration
-        angle_rad_slider = st.slider("Angle (radians)", 0.0, float(2*sympy.pi), float(angle_rad_input), float(sympy.pi/36), format="%.4f", key="angle_rad_slider")
-        angle_rad_sympy = angle_rad_slider # Keep symbolic/float
-        angle_rad_float = float(angle_rad_slider) # Float for plotting
-        angle_deg = math.degrees(angle_rad_float) # Calculate degrees for reference check
-
-    st.write(f"Current Angle: {angle_deg:.2f}° = {angle_rad_float:.4f} radians")
-
-    # Check if it's a reference angle
-    ref_deg, ref_data = check_reference_angle(angle_deg)
-    if ref_data:
-        st.success(f"This is a common reference angle: {ref_deg}°")
-        fig_unit, err_unit = plot_unit_circle(angle_rad_float, highlight_ref_angle=ref_data)
-        vals_sym, vals_num = get_trig_values(ref_data['rad']) # Use exact rad value
-    else:
-        st.info("This is not a common reference angle.")
-        fig_unit, err_unit = plot_unit_circle(angle_rad_float)
-        vals_sym, vals_num = get_trig_values(angle_rad_sympy) # Use input angle
-
-    # Display Trig Values
-    st.subheader("Trigonometric Values:")
-    if ref_data:
-        st.write("(Using exact values for reference angle)")
-    st.latex(f"\\sin({sympy.latex(angle_rad_sympy)}) = {sympy.latex(vals_sym['sin'])} \\approx {vals_num['sin']:.4f}")
-    st.latex(f"\\cos({sympy.latex(angle_rad_sympy)}) = {sympy.latex(vals_sym['cos'])} \\approx {vals_num['cos']:.4f}")
-    st.latex(f"\\tan({sympy.latex(angle_rad_sympy)}) = {sympy.latex(vals_sym['tan'])} \\approx {vals_num['tan']:.4f}")
-    st.latex(f"\\csc({sympy.latex(angle_rad_sympy)}) = {sympy.latex(vals_sym['csc'])} \\approx {vals_num['csc']:.4f}")
-    st.latex(f"\\sec({sympy.latex(angle_rad_sympy)}) = {sympy.latex(vals_sym['sec'])} \\approx {vals_num['sec']:.4f}")
-    st.latex(f"\\cot({sympy.latex(angle_rad_sympy)}) = {sympy.latex(vals_sym['cot'])} \\approx {vals_num['cot']:.4f}")
+        if unit_mode == "Degrees":
+            angle_deg = st.slider("Angle (degrees)", 0.0, 360.0, 45.0, 1.0, key="angle_deg_slider")
+            angle_rad_sympy = sympy.rad(angle_deg) # Keep symbolic for trig values
+            angle_rad_float = math.radians(angle_deg) # Float for plotting
+        else:
+            # Allow direct input or slider for radians
+            angle_rad_input = st.number_input("Angle (radians)", value=float(sympy.pi/4), min_value=0.0, max_value=float(2*sympy.pi), step=float(sympy.pi/12), format="%.4f", key="angle_rad_input")
+            # Use a slider for easier exploration
+            angle_rad_slider = st.slider("Angle (radians)", 0.0, float(2*sympy.pi), float(angle_rad_input), float(sympy.pi/36), format="%.4f", key="angle_rad_slider")
+            angle_rad_sympy = angle_rad_slider # Keep symbolic/float
+            angle_rad_float = float(angle_rad_slider) # Float for plotting
+            angle_deg = math.degrees(angle_rad_float) # Calculate degrees for reference check
+
+        st.write(f"Current Angle: {angle_deg:.2f}° = {angle_rad_float:.4f} radians")
+
+        # Check if it's a reference angle
+        ref_deg, ref_data = check_reference_angle(angle_deg)
+        if ref_data:
+            st.success(f"This is a common reference angle: {ref_deg}°")
+            fig_unit, err_unit = plot_unit_circle(angle_rad_float, highlight_ref_angle=ref_data)
+            vals_sym, vals_num = get_trig_values(ref_data['rad']) # Use exact rad value
+        else:
+            st.info("This is not a common reference angle.")
+            fig_unit, err_unit = plot_unit_circle(angle_rad_float)
+            vals_sym, vals_num = get_trig_values(angle_rad_sympy) # Use input angle
+
+        # Display Trig Values
+        st.subheader("Trigonometric Values:")
+        if ref_data:
+            st.write("(Using exact values for reference angle)")
+        st.latex(f"\\sin({sympy.latex(angle_rad_sympy)}) = {sympy.latex(vals_sym['sin'])} \\approx {vals_num['sin']:.4f}")
+        st.latex(f"\\cos({sympy.latex(angle_rad_sympy)}) = {sympy.latex(vals_sym['cos'])} \\approx {vals_num['cos']:.4f}")
+        st.latex(f"\\tan({sympy.latex(angle_rad_sympy)}) = {sympy.latex(vals_sym['tan'])} \\approx {vals_num['tan']:.4f}")
+        st.latex(f"\\csc({sympy.latex(angle_rad_sympy)}) = {sympy.latex(vals_sym['csc'])} \\approx {vals_num['csc']:.4f}")
+        st.latex(f"\\sec({sympy.latex(angle_rad_sympy)}) = {sympy.latex(vals_sym['sec'])} \\approx {vals_num['sec']:.4f}")
+        st.latex(f"\\cot({sympy.latex(angle_rad_sympy)}) = {sympy.latex(vals_sym['cot'])} \\approx {vals_num['cot']:.4f}")
 
 
 with col2:
     if err_unit:
         st.error(err_unit)
     else:
-        st.plotly_chart(fig_unit, use_container_width=True)
+        with timed("trig_workbench.plotly_chart"):
+            st.plotly_chart(fig_unit, use_container_width=True)
 
 st.divider()
 
@@ -70,32 +82,40 @@ selected_func_base = st.selectbox("Select Function Type", func_options, index=0)
 plot_range_min = st.number_input("Plot Range Min (x-axis)", value=-float(2*sympy.pi), format="%.2f")
 plot_range_max = st.number_input("Plot Range Max (x-axis)", value=float(2*sympy.pi), format="%.2f")
 
-if "sin" in selected_func_base or "cos" in selected_func_base:
-     # Add sliders for parameters if a generic form is chosen
-     if selected_func_base in ["a*sin(k*(x-p))+v", "a*cos(k*(x-p))+v"]:
-        col_a, col_k, col_p, col_v = st.columns(4)
-        with col_a:
-             a_val = st.slider("Amplitude (a)", 0.1, 5.0, 1.0, 0.1)
-        with col_k:
-             k_val = st.slider("Frequency Factor (k)", 0.1, 5.0, 1.0, 0.1) # k relates to period P = 2pi/k
-        with col_p:
-             p_val = st.slider("Phase Shift (p)", -float(sympy.pi), float(sympy.pi), 0.0, float(sympy.pi/8), format="%.3f")
-        with col_v:
-             v_val = st.slider("Vertical Shift (v)", -3.0, 3.0, 0.0, 0.1)
-
-        func_str = selected_func_base.replace('a', str(a_val)).replace('k', str(k_val)).replace('p', str(p_val)).replace('v', str(v_val))
-        st.latex(f"f(x) = {sympy.latex(parse_expression(func_str))}")
-     else:
-         func_str = selected_func_base
+# Parameter sliders for the generic forms: (label, min, max, default, step, format)
+PARAMETER_SLIDERS = {
+    "a": ("Amplitude (a)", 0.1, 5.0, 1.0, 0.1, None),
+    "k": ("Frequency Factor (k)", 0.1, 5.0, 1.0, 0.1, None), # k relates to period P = 2pi/k
+    "p": ("Phase Shift (p)", -float(sympy.pi), float(sympy.pi), 0.0, float(sympy.pi/8), "%.3f"),
+    "v": ("Vertical Shift (v)", -3.0, 3.0, 0.0, 0.1, None),
+}
+
+if selected_func_base in ["a*sin(k*(x-p))+v", "a*cos(k*(x-p))+v"]:
+    # The form is compiled once with a, k, p, v as arguments; moving a slider only re-evaluates it
+    animate_param = st.selectbox("Client-side slider for (no reruns while dragging)", ["None"] + list(PARAMETER_SLIDERS), key="trig_animate_param")
+    param_values = {}
+    for col, (name, (label, low, high, default, step, fmt)) in zip(st.columns(4), PARAMETER_SLIDERS.items()):
+        with col:
+            param_values[name] = st.slider(label, low, high, default, step, format=fmt, disabled=animate_param == name)
+
+    animate = None if animate_param == "None" else animate_param
+    sweep = None
+    if animate:
+        _, low, high, _, step, _ = PARAMETER_SLIDERS[animate]
+        sweep = np.arange(low, high + step / 2, step)
+    _, template_expr, _ = compile_parameterized(selected_func_base, 'x', tuple(param_values))
+    shown_values = {sympy.symbols(name): sympy.Float(value, 4) for name, value in param_values.items() if name != animate}
+    st.latex(f"f(x) = {sympy.latex(template_expr.subs(shown_values))}")
+    fig_func, err_func = plot_parameterized(selected_func_base, param_values, 'x', min_val=plot_range_min, max_val=plot_range_max,
+                                            animate=animate, sweep=sweep)
 else:
-    func_str = selected_func_base
-
-fig_func, err_func = plot_function(func_str, 'x', min_val=plot_range_min, max_val=plot_range_max)
+    fig_func, err_func = plot_function(selected_func_base, 'x', min_val=plot_range_min, max_val=plot_range_max)
 
 if err_func:
     st.error(err_func)
 elif fig_func:
-    st.plotly_chart(fig_func, use_container_width=True)
+    with timed("trig_workbench.plotly_chart"):
+        st.plotly_chart(fig_func, use_container_width=True)
 
 st.divider()
 
@@ -126,7 +146,8 @@ with col_id2:
             st.write("---")
             try:
                  # Method 1: Simplify difference
-                 diff_simplified = sympy.simplify(expr1 - expr2)
+                 with timed("trig_workbench.simplify"):
+                     diff_simplified = coalesce.simplify(expr1 - expr2)
                  st.write("Method 1: Simplify(Expression 1 - Expression 2)")
                  st.latex(f"Simplify({sympy.latex(expr1)} - ({sympy.latex(expr2)})) = {sympy.latex(diff_simplified)}")
                  if diff_simplified == 0:
@@ -137,8 +158,9 @@ with col_id2:
                  # Method 2: Trig simplification and equals()
                  st.write("---")
                  st.write("Method 2: TrigSimplify and .equals()")
-                 expr1_trigsimp = sympy.trigsimp(expr1)
-                 expr2_trigsimp = sympy.trigsimp(expr2)
+                 with timed("trig_workbench.trigsimp"):
+                     expr1_trigsimp = coalesce.trigsimp(expr1)
+                     expr2_trigsimp = coalesce.trigsimp(expr2)
                  st.latex(f"TrigSimp(Expr1) = {sympy.latex(expr1_trigsimp)}")
                  st.latex(f"TrigSimp(Expr2) = {sympy.latex(expr2_trigsimp)}")
 
@@ -181,9 +203,12 @@ if st.button("Solve Equation"):
      # Use solveset for potentially infinite solutions
      from sympy import solveset, S, Interval # S is Singleton, Interval for domains
 
+     SOLVESET_TIME_LIMIT = 10 # seconds; the numeric roots are shown regardless
+
      var = sympy.symbols(var_str)
      try:
          # Parse the equation string into a SymPy Eq object or expression = 0
+         equation = None
          if '=' in eq_str:
              lhs_str, rhs_str = eq_str.split('=', 1)
              lhs = parse_expression(lhs_str.strip(), default_symbols)
@@ -192,30 +217,47 @@ if st.button("Solve Equation"):
                  st.error("Could not parse one or both sides of the equation.")
              else:
                  equation = sympy.Eq(lhs, rhs)
-                 # Define the domain (e.g., real numbers, or a specific interval like [0, 2*pi])
-                 # Using Reals is common, but intervals can be more specific
-                 # domain = S.Reals
-                 domain = Interval(0, 2*sympy.pi) # Example: Solutions in [0, 2*pi]
-                 st.write(f"Solving for {var} in the domain: ${sympy.latex(domain)}$")
-                 solution = solveset(equation, var, domain=domain)
-                 st.write("Solution Set:")
-                 st.latex(sympy.latex(solution))
-                 if not solution:
-                     st.warning("No solution found in the specified domain.")
-
          else:
              # Assume expression = 0
-             expr = parse_expression(eq_str.strip(), default_symbols)
-             if expr is None:
+             equation = parse_expression(eq_str.strip(), default_symbols)
+             if equation is None:
                  st.error("Could not parse the expression.")
+
+         if equation is not None:
+             # Define the domain (e.g., real numbers, or a specific interval like [0, 2*pi])
+             # Using Reals is common, but intervals can be more specific
+             # domain = S.Reals
+             domain = Interval(0, 2*sympy.pi) # Example: Solutions in [0, 2*pi]
+             if isinstance(equation, sympy.Equality):
+                 st.write(f"Solving for {var} in the domain: ${sympy.latex(domain)}$")
              else:
-                domain = Interval(0, 2*sympy.pi) # Example: Solutions in [0, 2*pi]
-                st.write(f"Solving {sympy.latex(expr)} = 0 for {var} in the domain: ${sympy.latex(domain)}$")
-                solution = solveset(expr, var, domain=domain)
-                st.write("Solution Set:")
-                st.latex(sympy.latex(solution))
-                if not solution:
+                 st.write(f"Solving {sympy.latex(equation)} = 0 for {var} in the domain: ${sympy.latex(domain)}$")
+
+             # Fast path: numeric roots in milliseconds, shown before the symbolic solve starts
+             with timed("trig_workbench.numeric_roots"):
+                 numeric_roots, numeric_error = find_roots_numeric(equation, var, 0, 2*math.pi)
+             st.write("Numeric Roots:")
+             if numeric_error:
+                 st.warning(numeric_error)
+             elif numeric_roots:
+                 st.write(", ".join(f"{r:.6f} (≈ {r/math.pi:.4f}π)" for r in numeric_roots))
+             else:
+                 st.write("No real roots found numerically in the domain.")
+
+             # Symbolic solve in a worker process, so a slow solveset can't hang the page
+             with st.spinner("Solving symbolically..."):
+                 with timed("trig_workbench.solveset"), watch("solveset", f=equation, symbol=var, domain=domain):
+                     future = workers.submit(solveset, equation, var, domain, time_limit=SOLVESET_TIME_LIMIT)
+                     solution, solve_error = workers.wait_result(future, timeout=SOLVESET_TIME_LIMIT + 5)
+             st.write("Solution Set:")
+             if solve_error:
+                 st.info(f"Symbolic solve did not finish ({solve_error}). The numeric roots above are approximate.")
+             else:
+                 st.latex(sympy.latex(solution))
+                 if isinstance(solution, sympy.ConditionSet):
+                     st.info("SymPy could not solve this equation in closed form; see the numeric roots above.")
+                 elif not solution:
                      st.warning("No solution found in the specified domain.")
 
      except Exception as e:
-         st.error(f"Could not solve equation: {e}")
\ No newline at end of file
+         st.error(f"Could not solve equation: {e}")
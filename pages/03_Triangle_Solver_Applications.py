@@ -1,13 +1,47 @@
 import streamlit as st
 import math
 from utils.geometry_helpers import (solve_sss, solve_sas, solve_asa, solve_aas,
-                                    solve_angle_elevation, solve_height_from_elevation)
-from utils.plotting_helpers import plot_solved_triangle, plot_angle_elevation
+                                    solve_angle_elevation, solve_height_from_elevation,
+                                    solve_angle_elevation_many, solve_height_from_elevation_many,
+                                    solve_routes, great_circle_distances, initial_bearings,
+                                    propagate_triangle_uncertainty, TRIANGLE_SOLVERS_MANY, ANGLE_NAMES)
+from utils.plotting_helpers import (plot_solved_triangle, plot_angle_elevation, plot_elevation_sweep, plot_routes,
+                                    plot_uncertainty_histograms)
+from utils.metrics import timed
+import numpy as np
 import plotly.graph_objects as go
 
 st.set_page_config(page_title="Triangle Solver & Applications", layout="wide")
 st.title("🔺 Triangle Solver & Applications")
 
+MAX_SWEEP_POINTS = 100_000
+TRIANGLE_LABELS = {"a": "a", "b": "b", "c": "c", "alpha": "α", "beta": "β", "gamma": "γ"}
+
+DEFAULT_ROUTE_STARTS = {"Route": ["A", "B", "C"], "Start Lat": [51.47, 40.64, 35.55], "Start Lon": [-0.45, -73.78, 139.78]}
+DEFAULT_ROUTE_LEGS = {
+    "Route": ["A", "A", "B", "B", "C"],
+    "Bearing (°)": [255.0, 230.0, 60.0, 95.0, 45.0],
+    "Distance (km)": [2000.0, 3500.0, 3000.0, 2500.0, 4000.0],
+}
+
+
+def route_arrays(starts, legs):
+    """Start points and NaN-padded (routes, legs) bearing/distance arrays from the two tables."""
+    names = [str(r) for r in starts["Route"]]
+    by_route = {name: [] for name in names}
+    for route, bearing, distance in zip(legs["Route"], legs["Bearing (°)"], legs["Distance (km)"]):
+        if str(route) in by_route and bearing is not None and distance is not None:
+            by_route[str(route)].append((bearing, distance))
+    n_legs = max([len(v) for v in by_route.values()] + [1])
+    leg_array = np.full((len(names), n_legs, 2), np.nan)
+    for i, name in enumerate(names):
+        if by_route[name]:
+            leg_array[i, :len(by_route[name])] = by_route[name]
+    starts_lat = np.array([np.nan if v is None else v for v in starts["Start Lat"]], dtype=float)
+    starts_lon = np.array([np.nan if v is None else v for v in starts["Start Lon"]], dtype=float)
+    return names, starts_lat, starts_lon, leg_array[..., 0], leg_array[..., 1]
+
+
 tab1, tab2 = st.tabs(["Triangle Solver", "Geometric Applications"])
 
 # --- Triangle Solver Tab ---
@@ -62,6 +96,18 @@ with tab1:
                     b, c, gamma, error_msg = solve_aas(alpha, beta, a)
                     if not error_msg: solved_values = {'b': b, 'c': c, 'γ': gamma}
 
+        # Measured inputs in the solver's argument order, for the uncertainty propagation
+        measured = {"SSS": (a, b, c), "SAS": (b, gamma, a), "ASA": (beta, c, alpha), "AAS": (alpha, beta, a)}[solve_type]
+        with st.expander("Measurement Uncertainty"):
+            propagate = st.toggle("Propagate measurement errors to the solution", key="tri_uncertainty")
+            sigma_cols = st.columns(2)
+            with sigma_cols[0]:
+                side_sigma = st.number_input("Side std. dev.", min_value=0.0, value=0.05, format="%.4f", key="tri_side_sigma")
+            with sigma_cols[1]:
+                angle_sigma = st.number_input("Angle std. dev. (degrees)", min_value=0.0, value=0.5, format="%.4f", key="tri_angle_sigma")
+            mc_samples = st.select_slider("Monte Carlo samples", options=[10_000, 50_000, 100_000, 200_000, 500_000],
+                                          value=200_000, key="tri_samples")
+
     with col_results:
         st.subheader("Results")
         if error_msg:
@@ -85,17 +131,42 @@ with tab1:
                  if err_tri_plot:
                      st.warning(f"Plotting Error: {err_tri_plot}")
                  else:
-                     st.plotly_chart(fig_tri, use_container_width=True)
+                     with timed("triangle_solver.plotly_chart"):
+                         st.plotly_chart(fig_tri, use_container_width=True)
             else:
                  st.warning("Could not plot triangle: Missing values.")
 
+            if propagate:
+                inputs = TRIANGLE_SOLVERS_MANY[solve_type][1]
+                sigmas = [angle_sigma if name in ANGLE_NAMES else side_sigma for name in inputs]
+                report, report_err = propagate_triangle_uncertainty(solve_type, measured, sigmas, samples=mc_samples)
+                if report_err:
+                    st.warning(f"Uncertainty propagation: {report_err}")
+                else:
+                    st.write("**Uncertainty of the Unknowns:**")
+                    rows = report["unknowns"]
+                    st.dataframe({
+                        "Unknown": [TRIANGLE_LABELS[n] for n in rows],
+                        "Solved": [u["nominal"] for u in rows.values()],
+                        "Mean": [u["mean"] for u in rows.values()],
+                        "Std. Dev. (Monte Carlo)": [u["std"] for u in rows.values()],
+                        "Std. Dev. (Linearized)": [u["linear_std"] for u in rows.values()],
+                        f"{report['confidence']:.0%} Lower": [u["lower"] for u in rows.values()],
+                        f"{report['confidence']:.0%} Upper": [u["upper"] for u in rows.values()],
+                    }, hide_index=True)
+                    invalid_note = f"; {report['invalid']:,} draws gave no valid triangle and were dropped" if report["invalid"] else ""
+                    st.caption(f"{report['samples']:,} perturbed triangles solved in {report['seconds'] * 1000:.0f} ms{invalid_note}. "
+                               "A large gap between the Monte Carlo and linearized spreads means the errors are too large for the linear approximation.")
+                    hist_fig, _ = plot_uncertainty_histograms(report, TRIANGLE_LABELS)
+                    st.plotly_chart(hist_fig, use_container_width=True)
+
         else:
             st.info("Enter triangle parameters and click 'Solve'.")
 
 # --- Geometric Applications Tab ---
 with tab2:
     st.header("Geometric Applications")
-    app_type = st.selectbox("Select Application Type", ["Angle of Elevation/Depression"]) # TODO: Add Bearings
+    app_type = st.selectbox("Select Application Type", ["Angle of Elevation/Depression", "Bearings"])
 
     app_col_inputs, app_col_results = st.columns(2)
 
@@ -103,47 +174,116 @@ with tab2:
         st.subheader("Inputs")
         if app_type == "Angle of Elevation/Depression":
             solve_for = st.radio("Solve for:", ["Angle", "Height/Depth"])
-            distance = st.number_input("Horizontal Distance", min_value=0.01, value=100.0)
-
-            angle, height = None, None
-            app_error_msg = None
-            plot_fig = go.Figure()
-            plot_err = "Enter values and solve."
-
-            if solve_for == "Angle":
-                height = st.number_input("Object Height (for Elevation) / Depth (for Depression)", value=50.0) # Allow negative for depression?
-                if st.button("Calculate Angle"):
-                    angle, app_error_msg = solve_angle_elevation(distance, height)
-                    if not app_error_msg:
-                         plot_fig, plot_err = plot_angle_elevation(distance, height, angle)
-
-            elif solve_for == "Height/Depth":
-                angle = st.number_input("Angle (degrees, 0-90)", min_value=0.1, max_value=89.9, value=30.0) # Use 0-90 for simplicity
-                is_depression = st.checkbox("Is this an Angle of Depression?")
-                if st.button("Calculate Height/Depth"):
-                     height, app_error_msg = solve_height_from_elevation(distance, angle)
-                     if not app_error_msg:
-                          # Plotting depression often mirrors elevation, just interpret height as depth
-                          plot_height = -height if is_depression else height
-                          plot_fig, plot_err = plot_angle_elevation(distance, plot_height, angle)
+            sweep = st.toggle("Sweep over distances", key="elev_sweep",
+                              help="Solve for every distance in a range at once and plot the result.")
+
+            if sweep:
+                sweep_cols = st.columns(3)
+                with sweep_cols[0]:
+                    sweep_min = st.number_input("Min Distance", min_value=0.01, value=1.0, key="sweep_min")
+                with sweep_cols[1]:
+                    sweep_max = st.number_input("Max Distance", min_value=0.01, value=1000.0, key="sweep_max")
+                with sweep_cols[2]:
+                    sweep_points = st.number_input("Distances", min_value=10, max_value=MAX_SWEEP_POINTS, value=5000, step=500, key="sweep_points")
+                if solve_for == "Angle":
+                    sweep_height = st.number_input("Object Height (for Elevation) / Depth (for Depression)", value=50.0, key="sweep_height")
+                else:
+                    sweep_angle = st.number_input("Angle (degrees, 0-90)", min_value=0.1, max_value=89.9, value=30.0, key="sweep_angle")
+                    sweep_depression = st.checkbox("Is this an Angle of Depression?", key="sweep_depression")
+            else:
+                distance = st.number_input("Horizontal Distance", min_value=0.01, value=100.0)
+
+                angle, height = None, None
+                app_error_msg = None
+                plot_fig = go.Figure()
+                plot_err = "Enter values and solve."
 
+                if solve_for == "Angle":
+                    height = st.number_input("Object Height (for Elevation) / Depth (for Depression)", value=50.0) # Allow negative for depression?
+                    if st.button("Calculate Angle"):
+                        angle, app_error_msg = solve_angle_elevation(distance, height)
+                        if not app_error_msg:
+                             plot_fig, plot_err = plot_angle_elevation(distance, height, angle)
+
+                elif solve_for == "Height/Depth":
+                    angle = st.number_input("Angle (degrees, 0-90)", min_value=0.1, max_value=89.9, value=30.0) # Use 0-90 for simplicity
+                    is_depression = st.checkbox("Is this an Angle of Depression?")
+                    if st.button("Calculate Height/Depth"):
+                         height, app_error_msg = solve_height_from_elevation(distance, angle)
+                         if not app_error_msg:
+                              # Plotting depression often mirrors elevation, just interpret height as depth
+                              plot_height = -height if is_depression else height
+                              plot_fig, plot_err = plot_angle_elevation(distance, plot_height, angle)
+
+        elif app_type == "Bearings":
+            st.caption("Each route starts at its start point and follows its legs in order: "
+                       "an initial great-circle bearing (degrees clockwise from north) and a distance.")
+            route_starts = st.data_editor(DEFAULT_ROUTE_STARTS, num_rows="dynamic", key="route_starts")
+            route_legs = st.data_editor(DEFAULT_ROUTE_LEGS, num_rows="dynamic", key="route_legs")
 
     with app_col_results:
         st.subheader("Results")
-        if app_error_msg:
-             st.error(app_error_msg)
-        elif solve_for == "Angle" and angle is not None:
-             st.success(f"Calculated Angle = {angle:.4f}°")
-             if plot_err: st.warning(f"Plotting issue: {plot_err}")
-             else: st.plotly_chart(plot_fig, use_container_width=True)
-        elif solve_for == "Height/Depth" and height is not None:
-             label = "Depth" if is_depression else "Height"
-             st.success(f"Calculated {label} = {height:.4f}")
-             if plot_err: st.warning(f"Plotting issue: {plot_err}")
-             else: st.plotly_chart(plot_fig, use_container_width=True)
-        else:
-             st.info("Enter parameters and click Calculate.")
+        if app_type == "Angle of Elevation/Depression" and sweep:
+            if sweep_min >= sweep_max:
+                st.error("Min Distance must be less than Max Distance.")
+            else:
+                sweep_distances = np.linspace(sweep_min, sweep_max, int(sweep_points))
+                if solve_for == "Angle":
+                    sweep_values, sweep_valid = solve_angle_elevation_many(sweep_distances, sweep_height)
+                    quantity, fixed_label = "Angle (°)", f"height {sweep_height:g}"
+                else:
+                    sweep_values, sweep_valid = solve_height_from_elevation_many(sweep_distances, sweep_angle)
+                    if sweep_depression:
+                        sweep_values = -sweep_values
+                    quantity = "Depth" if sweep_depression else "Height"
+                    fixed_label = f"angle {sweep_angle:g}°"
+                if not sweep_valid.all():
+                    st.warning(f"{np.count_nonzero(~sweep_valid)} of {sweep_valid.size} scenarios are invalid and left out.")
+                sweep_fig, sweep_err = plot_elevation_sweep(sweep_distances, sweep_values, sweep_valid, quantity, fixed_label)
+                if sweep_err:
+                    st.warning(f"Plotting issue: {sweep_err}")
+                else:
+                    with timed("triangle_solver.plotly_chart"):
+                        st.plotly_chart(sweep_fig, use_container_width=True)
+        elif app_type == "Angle of Elevation/Depression":
+            if app_error_msg:
+                 st.error(app_error_msg)
+            elif solve_for == "Angle" and angle is not None:
+                 st.success(f"Calculated Angle = {angle:.4f}°")
+                 if plot_err: st.warning(f"Plotting issue: {plot_err}")
+                 else:
+                     with timed("triangle_solver.plotly_chart"):
+                         st.plotly_chart(plot_fig, use_container_width=True)
+            elif solve_for == "Height/Depth" and height is not None:
+                 label = "Depth" if is_depression else "Height"
+                 st.success(f"Calculated {label} = {height:.4f}")
+                 if plot_err: st.warning(f"Plotting issue: {plot_err}")
+                 else:
+                     with timed("triangle_solver.plotly_chart"):
+                         st.plotly_chart(plot_fig, use_container_width=True)
+            else:
+                 st.info("Enter parameters and click Calculate.")
 
-        # TODO: Implement Bearing calculations and plotting
-        if app_type == "Bearings":
-            st.warning("Bearing calculations and plotting are not yet implemented.")
\ No newline at end of file
+        elif app_type == "Bearings":
+            names, start_lats, start_lons, bearings, distances = route_arrays(route_starts, route_legs)
+            solved, route_err = solve_routes(start_lats, start_lons, bearings, distances)
+            if route_err:
+                st.error(route_err)
+            else:
+                lats, lons = solved
+                last = np.sum(np.isfinite(lats), axis=1) - 1 # Index of each route's final waypoint
+                end_lats, end_lons = lats[np.arange(len(names)), last], lons[np.arange(len(names)), last]
+                st.dataframe({
+                    "Route": names,
+                    "End Lat": np.round(end_lats, 4),
+                    "End Lon": np.round(end_lons, 4),
+                    "Route Length (km)": np.round(np.nansum(distances, axis=1), 1),
+                    "Direct Distance (km)": np.round(great_circle_distances(start_lats, start_lons, end_lats, end_lons), 1),
+                    "Direct Bearing (°)": np.round(initial_bearings(start_lats, start_lons, end_lats, end_lons), 1),
+                }, hide_index=True)
+                route_fig, route_plot_err = plot_routes(lats, lons, labels=names)
+                if route_plot_err:
+                    st.warning(f"Plotting issue: {route_plot_err}")
+                else:
+                    with timed("triangle_solver.plotly_chart"):
+                        st.plotly_chart(route_fig, use_container_width=True)
@@ -1,7 +1,11 @@
 import streamlit as st
 import sympy
-from utils.helpers import parse_expression, display_results, default_symbols
-from utils.plotting_helpers import plot_function
+from utils.helpers import parse_expression, try_parse_expression, display_results, default_symbols
+from utils.plotting_helpers import (plot_function, add_analysis_markers, plot_function_2d, SURFACE_KINDS,
+                                    MAX_SURFACE_RESOLUTION, PREVIEW_RESOLUTION, plot_implicit, IMPLICIT_RESOLUTIONS)
+from utils.numeric_helpers import analyze_function
+from utils.metrics import timed
+from utils import workers
 
 st.set_page_config(page_title="Functions & Algebra", layout="wide")
 st.title("📈 Functions & Algebra")
@@ -17,15 +21,145 @@ with plot_cols[0]:
 with plot_cols[1]:
     plot_max_alg = st.number_input("Plot Max X", 10.0, key="alg_max")
 
+analyze_alg = st.checkbox("Find roots, extrema and inflection points", value=True, key="alg_analyze")
+confirm_alg = st.checkbox("Confirm symbolically (slower)", value=False, key="alg_confirm", disabled=not analyze_alg)
+SYMBOLIC_TIME_LIMIT = 10 # seconds per solveset call
 
 if st.button("Plot Function", key="alg_plot_btn"):
     fig_alg, err_alg = plot_function(func_str_alg, var_str_alg, plot_min_alg, plot_max_alg)
     if err_alg:
         st.error(err_alg)
     else:
-        st.plotly_chart(fig_alg, use_container_width=True)
+        analysis, err_analysis = None, None
+        if analyze_alg:
+            expr_alg, _ = try_parse_expression(func_str_alg) # Parsing errors were already reported by plot_function
+            var_alg = sympy.symbols(var_str_alg)
+            # Same grid as the plot: f, f' and f'' are evaluated together in one pass
+            analysis, err_analysis = analyze_function(expr_alg, var_alg, plot_min_alg, plot_max_alg)
+            if analysis:
+                add_analysis_markers(fig_alg, analysis)
 
-    # TODO: Add analysis like finding roots (sympy.solve(expr, var)), domain/range (hard).
+        with timed("functions_algebra.plotly_chart"):
+            st.plotly_chart(fig_alg, use_container_width=True)
+
+        if err_analysis:
+            st.warning(err_analysis)
+        elif analysis:
+            st.latex(f"f'({var_str_alg}) = {sympy.latex(analysis['derivative'])}, \\quad f''({var_str_alg}) = {sympy.latex(analysis['second_derivative'])}")
+            st.caption(f"Numeric results on [{plot_min_alg:g}, {plot_max_alg:g}]")
+            res_cols = st.columns(3)
+            with res_cols[0]:
+                st.subheader("Roots")
+                for x0, _ in analysis["roots"]:
+                    st.write(f"x ≈ {x0:.6f}")
+                if not analysis["roots"]:
+                    st.write("None found.")
+            with res_cols[1]:
+                st.subheader("Critical Points")
+                for x0, y0, kind in analysis["critical_points"]:
+                    label = {"min": "local min", "max": "local max"}.get(kind, "stationary")
+                    st.write(f"x ≈ {x0:.6f}, f ≈ {y0:.6f} ({label})")
+                if not analysis["critical_points"]:
+                    st.write("None found.")
+            with res_cols[2]:
+                st.subheader("Inflection Points")
+                for x0, y0 in analysis["inflection_points"]:
+                    st.write(f"x ≈ {x0:.6f}, f ≈ {y0:.6f}")
+                if not analysis["inflection_points"]:
+                    st.write("None found.")
+
+            if confirm_alg:
+                # f = 0, f' = 0 and f'' = 0 are solved in parallel on the worker pool
+                domain = sympy.Interval(plot_min_alg, plot_max_alg)
+                real_var = analysis["variable"]
+                targets = [("Roots", analysis["function"]), ("Critical points", analysis["derivative"]),
+                           ("Inflection candidates", analysis["second_derivative"])]
+                with st.spinner("Solving symbolically..."), timed("functions_algebra.symbolic_confirm"):
+                    futures = [workers.submit(sympy.solveset, target, real_var, domain, time_limit=SYMBOLIC_TIME_LIMIT)
+                               for _, target in targets]
+                    solutions = [workers.wait_result(future, timeout=SYMBOLIC_TIME_LIMIT + 5) for future in futures]
+                st.subheader("Symbolic Confirmation")
+                for (name, _), (solution, err_solve) in zip(targets, solutions):
+                    if err_solve:
+                        st.write(f"{name}: not confirmed ({err_solve})")
+                    else:
+                        st.latex(f"\\text{{{name}: }} {sympy.latex(solution)}")
+
+    # TODO: Domain/range analysis (hard).
+
+st.divider()
+
+# --- Two-Variable Plotter ---
+st.header("Two-Variable Plotter")
+func_str_2d = st.text_input("Enter f(x, y) (e.g., 'sin(x)*cos(y)', 'exp(-(x^2 + y^2))')", "sin(x)*cos(y)", key="plot2d_func")
+kind_2d = st.radio("Plot type", SURFACE_KINDS, horizontal=True, format_func=str.title, key="plot2d_kind")
+range_cols_2d = st.columns(5)
+with range_cols_2d[0]:
+    x_min_2d = st.number_input("Min X", value=-5.0, key="plot2d_xmin")
+with range_cols_2d[1]:
+    x_max_2d = st.number_input("Max X", value=5.0, key="plot2d_xmax")
+with range_cols_2d[2]:
+    y_min_2d = st.number_input("Min Y", value=-5.0, key="plot2d_ymin")
+with range_cols_2d[3]:
+    y_max_2d = st.number_input("Max Y", value=5.0, key="plot2d_ymax")
+with range_cols_2d[4]:
+    resolution_2d = st.select_slider("Resolution", [128, 250, 500, 1000], value=500, key="plot2d_res")
+st.caption("Resolution is the most points per axis. Narrow the ranges to zoom: the grid is refined for the new view, "
+           f"and tiles already computed are reused. Surfaces are capped at {MAX_SURFACE_RESOLUTION['surface']} points per axis.")
+
+if func_str_2d.strip():
+    chart_2d = st.empty()
+    view_2d = ((x_min_2d, x_max_2d), (y_min_2d, y_max_2d))
+    inputs_2d = (func_str_2d, view_2d, kind_2d, resolution_2d)
+    # Redrawn live as the ranges change; other widgets' reruns reuse the last figure
+    result_2d = st.session_state.get("plot2d_result")
+    if result_2d and result_2d["inputs"] == inputs_2d:
+        fig_2d, err_2d = result_2d["fig"], result_2d["error"]
+    else:
+        if resolution_2d > PREVIEW_RESOLUTION:
+            # Coarse pass first (a few tiles), replaced by the full resolution when it is ready
+            fig_2d, err_2d = plot_function_2d(func_str_2d, *view_2d, kind=kind_2d, resolution=PREVIEW_RESOLUTION)
+            if not err_2d:
+                chart_2d.plotly_chart(fig_2d, use_container_width=True)
+        fig_2d, err_2d = plot_function_2d(func_str_2d, *view_2d, kind=kind_2d, resolution=resolution_2d)
+        st.session_state["plot2d_result"] = {"inputs": inputs_2d, "fig": fig_2d, "error": err_2d}
+    if err_2d:
+        chart_2d.error(err_2d)
+    else:
+        with timed("functions_algebra.plotly_chart"):
+            chart_2d.plotly_chart(fig_2d, use_container_width=True)
+
+st.divider()
+
+# --- Implicit Plotter ---
+st.header("Implicit Plotter")
+relation_str = st.text_input("Enter an equation in x and y (e.g., 'x^2 + y^2 = 1', 'sin(x) = cos(y)')", "x^2 + y^2 = 1", key="implicit_rel")
+implicit_cols = st.columns(5)
+with implicit_cols[0]:
+    x_min_imp = st.number_input("Min X", value=-3.0, key="implicit_xmin")
+with implicit_cols[1]:
+    x_max_imp = st.number_input("Max X", value=3.0, key="implicit_xmax")
+with implicit_cols[2]:
+    y_min_imp = st.number_input("Min Y", value=-3.0, key="implicit_ymin")
+with implicit_cols[3]:
+    y_max_imp = st.number_input("Max Y", value=3.0, key="implicit_ymax")
+with implicit_cols[4]:
+    resolution_imp = st.select_slider("Grid", IMPLICIT_RESOLUTIONS, value=100, key="implicit_res",
+                                      help="Coarse cells per axis. Raise it if small closed curves are missing.")
+
+if relation_str.strip():
+    inputs_imp = (relation_str, (x_min_imp, x_max_imp), (y_min_imp, y_max_imp), resolution_imp)
+    result_imp = st.session_state.get("implicit_result")
+    if result_imp and result_imp["inputs"] == inputs_imp:
+        fig_imp, err_imp = result_imp["fig"], result_imp["error"]
+    else:
+        fig_imp, err_imp = plot_implicit(relation_str, *inputs_imp[1:3], resolution=resolution_imp)
+        st.session_state["implicit_result"] = {"inputs": inputs_imp, "fig": fig_imp, "error": err_imp}
+    if err_imp:
+        st.error(err_imp)
+    else:
+        with timed("functions_algebra.plotly_chart"):
+            st.plotly_chart(fig_imp, use_container_width=True)
 
 st.divider()
 
@@ -40,7 +174,8 @@ with op_cols[0]:
         if expr:
             try:
                 # Assume variables are positive for log expansion rules
-                expanded_expr = sympy.expand_log(expr, force=True)
+                with timed("functions_algebra.expand_log"):
+                    expanded_expr = sympy.expand_log(expr, force=True)
                 display_results(expr, expanded_expr, "Log Expanded")
             except Exception as e:
                 st.error(f"Could not expand log: {e}")
@@ -50,7 +185,8 @@ with op_cols[1]:
          expr = parse_expression(log_exp_str)
          if expr:
              try:
-                 combined_expr = sympy.logcombine(expr, force=True)
+                 with timed("functions_algebra.logcombine"):
+                     combined_expr = sympy.logcombine(expr, force=True)
                  display_results(expr, combined_expr, "Log Combined")
              except Exception as e:
                  st.error(f"Could not combine log: {e}")
@@ -60,9 +196,11 @@ with op_cols[2]:
          expr = parse_expression(log_exp_str)
          if expr:
              try:
-                 expanded_expr = sympy.expand(expr, func=True, power_exp=True) # More general expand might work
+                 with timed("functions_algebra.expand"):
+                     expanded_expr = sympy.expand(expr, func=True, power_exp=True) # More general expand might work
                  if expanded_expr == expr: # If general expand didn't change it, try specific exp expand
-                     expanded_expr = sympy.expand(sympy.expand_power_exp(expr))
+                     with timed("functions_algebra.expand"):
+                         expanded_expr = sympy.expand(sympy.expand_power_exp(expr))
                  display_results(expr, expanded_expr, "Expanded")
              except Exception as e:
                  st.error(f"Could not expand: {e}")
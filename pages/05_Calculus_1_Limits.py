@@ -3,12 +3,21 @@ import sympy
 import numpy as np
 import plotly.graph_objects as go
 from utils.helpers import parse_expression, display_results, default_symbols, x, t, theta
-from utils.calculus_helpers import compute_limit, compute_derivative
-from utils.plotting_helpers import plot_function
+from utils.calculus_helpers import compute_limit, compute_derivative, compute_derivative_program, parse_point
+from utils.autodiff import value_and_derivative
+from utils.derivatives import expanded, used_assignments, lambdify_derivatives
+from utils.numeric_helpers import estimate_limit
+from utils.metrics import timed
+from utils import progressive
 
 st.set_page_config(page_title="Limits & Derivatives", layout="wide")
 st.title("Σ Calculus 1: Limits & Derivatives")
 
+LIMIT_TIME_LIMIT = 60 # seconds; the exact limit runs in a worker process
+MAX_DERIVATIVE_ORDER = 15
+EXPANDED_ORDER = 5 # Higher-order derivatives are expanded for display on request
+TANGENT_POINTS = 500
+
 # --- Limit Calculator ---
 st.header("Limit Calculator")
 lim_cols = st.columns([3, 1, 1, 1]) # Expression, Variable, Point, Direction
@@ -21,20 +30,85 @@ with lim_cols[2]:
 with lim_cols[3]:
     lim_dir = st.selectbox("Direction", ['+', '-', 'two-sided'], index=2, key="lim_dir")
 
+lim_numeric_only = st.toggle("Numeric estimate only (skip the exact computation)", key="lim_numeric_only")
+
+
+def show_limit_heading(context):
+    st.write("---")
+    st.write(f"**Limit of:**")
+    st.latex(sympy.latex(context["expr"]))
+    direction = context["dir"]
+    st.write(f"**As {context['var']} → {context['point']} ({'from ' + ('right' if direction == '+' else 'left') if direction != 'two-sided' else 'two-sided'}):**")
+
+
+def show_estimate(preview):
+    estimate, estimate_err = preview
+    if estimate is None:
+        if estimate_err:
+            st.caption(estimate_err)
+        return
+    details = f"{estimate.method.capitalize()} extrapolation, {estimate.confidence} confidence, error ≈ {estimate.error:.1e}"
+    if estimate.value is not None:
+        st.latex(f"\\approx {estimate.value:.10g}")
+        st.caption(f"Numeric estimate ({details}).")
+    else:
+        st.latex(f"\\text{{left}} \\approx {estimate.left:.10g}, \\quad \\text{{right}} \\approx {estimate.right:.10g}")
+        st.caption(f"The one-sided estimates differ, so the two-sided limit does not exist ({details}).")
+
+
+def show_cross_check(limit_val, preview):
+    """The numeric estimate next to the exact limit, flagging disagreement."""
+    estimate, _ = preview
+    if estimate is None or estimate.value is None:
+        return
+    st.caption(f"Numeric cross-check: ≈ {estimate.value:.10g} ({estimate.confidence} confidence).")
+    if limit_val.is_real and limit_val.is_finite:
+        exact = float(limit_val)
+        if abs(exact - estimate.value) > max(10 * estimate.error, 1e-6 * max(1, abs(exact))):
+            st.warning("The numeric estimate differs from the exact limit; check the expression near the point.")
+
+
 if st.button("Compute Limit", key="lim_compute"):
-    sympy_dir = lim_dir if lim_dir != 'two-sided' else '+' # Sympy '+' for two-sided if point is finite
+    sympy_dir = lim_dir if lim_dir != 'two-sided' else '+-'
+    original_expr = parse_expression(lim_expr_str) # Reports parse errors itself
+    if original_expr is None:
+        progressive.clear("lim_job")
+    else:
+        try:
+            preview = estimate_limit(original_expr, sympy.symbols(lim_var_str), parse_point(lim_point_str), sympy_dir)
+        except ValueError as e:
+            preview = (None, str(e))
+        context = {"expr": original_expr, "var": lim_var_str, "point": lim_point_str, "dir": lim_dir}
+        if lim_numeric_only:
+            progressive.clear("lim_job")
+            show_limit_heading(context)
+            show_estimate(preview)
+        else:
+            # The exact limit runs in a worker; the numeric estimate is shown until it arrives
+            progressive.start("lim_job", compute_limit, lim_expr_str, lim_var_str, lim_point_str, dir_str=sympy_dir,
+                              preview=preview, time_limit=LIMIT_TIME_LIMIT, context=context)
 
-    limit_val, err = compute_limit(lim_expr_str, lim_var_str, lim_point_str, dir_str=lim_dir)
 
-    if err:
+def show_limit_preview_with_heading(job):
+    show_limit_heading(job["context"])
+    show_estimate(job["preview"])
+
+
+def show_limit(job, result, error):
+    limit_val, err = result if result is not None else (None, error)
+    if err and job["preview"][0] is None:
         st.error(err)
+        return
+    show_limit_heading(job["context"])
+    if err:
+        st.warning(f"No exact limit: {err}")
+        show_estimate(job["preview"])
     else:
-        original_expr = parse_expression(lim_expr_str)
-        st.write("---")
-        st.write(f"**Limit of:**")
-        st.latex(sympy.latex(original_expr))
-        st.write(f"**As {lim_var_str} → {lim_point_str} ({'from ' + ('right' if lim_dir == '+' else 'left') if lim_dir != 'two-sided' else 'two-sided'}):**")
         st.latex(sympy.latex(limit_val))
+        show_cross_check(limit_val, job["preview"])
+
+
+progressive.show("lim_job", show_limit, show_limit_preview_with_heading)
 
 st.divider()
 
@@ -46,21 +120,53 @@ with deriv_cols[0]:
 with deriv_cols[1]:
     deriv_var_str = st.text_input("Variable", "x", key="deriv_var2", max_chars=5) # Use different key
 with deriv_cols[2]:
-    deriv_order = st.number_input("Order", min_value=1, max_value=5, value=1, step=1, key="deriv_order")
+    deriv_order = st.number_input("Order", min_value=1, max_value=MAX_DERIVATIVE_ORDER, value=1, step=1, key="deriv_order")
 
 if st.button("Compute Derivative", key="deriv_compute"):
-    derivative, err = compute_derivative(deriv_expr_str, deriv_var_str, deriv_order)
+    # All orders up to deriv_order, kept in shared-subexpression form (utils.derivatives)
+    program, err = compute_derivative_program(deriv_expr_str, deriv_var_str, deriv_order)
     if err:
         st.error(err)
+        st.session_state.pop("deriv_result", None)
     else:
-        original_expr = parse_expression(deriv_expr_str)
-        st.write("---")
-        st.write(f"**Original Function $f({deriv_var_str})$:**")
-        st.latex(sympy.latex(original_expr))
-        st.write(f"**Derivative (Order {deriv_order}) $\\frac{{d^{deriv_order}}}{{d{deriv_var_str}^{deriv_order}}} f({deriv_var_str})$:**")
-        st.latex(sympy.latex(derivative))
-
-st.subheader("Visualize Tangent Line (Order 1)")
+        st.session_state["deriv_result"] = {"program": program, "expr_str": deriv_expr_str,
+                                            "var": deriv_var_str, "order": deriv_order}
+
+deriv_result = st.session_state.get("deriv_result")
+if deriv_result and (deriv_result["expr_str"], deriv_result["var"], deriv_result["order"]) != (deriv_expr_str, deriv_var_str, deriv_order):
+    deriv_result = None # Inputs changed since the last computation
+
+if deriv_result:
+    program, order, var_name = deriv_result["program"], deriv_result["order"], deriv_result["var"]
+    st.write("---")
+    st.write(f"**Original Function $f({var_name})$:**")
+    st.latex(sympy.latex(expanded(program, 0)))
+    st.write(f"**Derivative (Order {order}) $\\frac{{d^{{{order}}}}}{{d{var_name}^{{{order}}}}} f({var_name})$:**")
+    # High orders are only expanded into a single expression when asked for
+    if order <= EXPANDED_ORDER or st.toggle("Show the expanded expression", key="deriv_expand"):
+        with timed("limits_derivatives.expand"):
+            st.latex(sympy.latex(expanded(program, order)))
+    else:
+        st.caption(f"Kept in shared-subexpression form ({len(used_assignments(program))} intermediate steps).")
+
+    with st.expander(f"Values of f and its first {order} derivatives at a point"):
+        value_point_str = st.text_input("Point", "1", key="deriv_value_point")
+        value_point = parse_expression(value_point_str)
+        try:
+            value_point = float(value_point)
+        except (TypeError, ValueError):
+            st.error(f"Cannot evaluate '{value_point_str}' to a number.")
+        else:
+            try:
+                values = lambdify_derivatives(program)([value_point])[:, 0] # All orders in one pass
+            except Exception as e: # Functions NumPy can't evaluate elementwise, e.g. erf
+                st.error(f"Could not evaluate the derivatives numerically: {e}")
+            else:
+                st.dataframe({"Order": list(range(order + 1)),
+                              "Value": [f"{v:.10g}" if np.isfinite(v) else "undefined" for v in values]},
+                             hide_index=True)
+
+st.subheader("Visualize Tangent Line")
 tan_cols = st.columns([3, 1, 2]) # Use function from above, Variable from above, Point
 with tan_cols[0]:
     st.write(f"Using Function: `{deriv_expr_str}`")
@@ -69,72 +175,88 @@ with tan_cols[1]:
      tan_point_str = st.text_input("Point x₀", "pi/2", key="tan_point")
 with tan_cols[2]:
      plot_range_tan = st.slider("Plot Range Width around x₀", 0.5, 20.0, 5.0, key="tan_range")
+tan_toggle_cols = st.columns(2)
+with tan_toggle_cols[0]:
+    show_derivative_curve = st.toggle("Overlay f′(x)", key="tan_overlay")
+with tan_toggle_cols[1]:
+    show_symbolic_derivative = st.toggle("Show symbolic f′(x)", key="tan_symbolic")
+
+
+def values_and_slopes(expr_str, expr, var_str, x_vals):
+    """f and f' over x_vals in one pass (forward-mode AD), or ((None, None), error)."""
+    result, err = value_and_derivative(expr, sympy.symbols(var_str), x_vals)
+    if err: # Functions without an AD rule: the derivative program of the same expression
+        program, err = compute_derivative_program(expr_str, var_str, 1)
+        if not err:
+            try:
+                result = tuple(lambdify_derivatives(program)(x_vals))
+            except Exception as e: # Functions NumPy can't evaluate elementwise
+                err = str(e) or type(e).__name__
+    return result or (None, None), err
+
+
+# Redrawn live: moving x₀ only re-evaluates f and f' numerically
+original_expr = parse_expression(deriv_expr_str)
+point_sym = parse_expression(tan_point_str) # Use parser to handle pi etc.
+if original_expr is not None and point_sym is not None:
+    try:
+        center = float(point_sym.evalf())
+    except (TypeError, ValueError):
+        st.error(f"Cannot evaluate tangent point '{tan_point_str}' to a number.")
+    else:
+        plot_min = center - plot_range_tan / 2
+        plot_max = center + plot_range_tan / 2
+        # Keyed on the inputs, so the slider resets to x₀ when they change
+        point_val = st.slider("Move x₀", plot_min, plot_max, center, step=plot_range_tan / 500,
+                              key=f"tan_move|{tan_point_str}|{plot_range_tan}")
+
+        with timed("limits_derivatives.evaluate"):
+            x_vals = np.linspace(plot_min, plot_max, TANGENT_POINTS)
+            (y_vals, slope_vals), err = values_and_slopes(deriv_expr_str, original_expr, deriv_var_str, x_vals)
+            (y0s, slopes), _ = values_and_slopes(deriv_expr_str, original_expr, deriv_var_str, [point_val])
+        if y_vals is None:
+            st.error(f"Could not evaluate the function: {err}")
+        elif not (np.isfinite(y0s[0]) and np.isfinite(slopes[0])):
+            st.error(f"Could not evaluate slope at x₀ = {point_val:.3f}. Is the function differentiable there?")
+        else:
+            y0, slope = float(y0s[0]), float(slopes[0])
+            # Tangent line: y - y₀ = m(x - x₀) => y = m(x - x₀) + y₀
+            tangent_expr = (slope * (sympy.symbols(deriv_var_str) - point_val) + y0).evalf(6)
+
+            st.write(f"**At point $x_0 \\approx {point_val:.4f}$:**")
+            st.latex(f"f(x_0) \\approx {y0:.4f}")
+            st.latex(f"f'(x_0) = \\text{{Slope }} m \\approx {slope:.4f}")
+            st.write("**Tangent Line Equation:**")
+            st.latex(f"y = {sympy.latex(tangent_expr)}")
+            if show_symbolic_derivative: # Only needed for display
+                derivative, err_deriv = compute_derivative(deriv_expr_str, deriv_var_str, 1)
+                if err_deriv:
+                    st.error(err_deriv)
+                else:
+                    st.latex(f"f'({deriv_var_str}) = {sympy.latex(derivative)}")
 
+            fig_combined = go.Figure()
+            fig_combined.add_trace(go.Scatter(x=x_vals, y=y_vals, mode='lines', name=f"f({deriv_var_str})"))
+            if show_derivative_curve:
+                fig_combined.add_trace(go.Scatter(x=x_vals, y=slope_vals, mode='lines', line=dict(dash='dot'),
+                                                  name=f"f′({deriv_var_str})"))
+            fig_combined.add_trace(go.Scatter(x=x_vals, y=y0 + slope * (x_vals - point_val), mode='lines',
+                                              line=dict(dash='dash'), name='Tangent Line'))
+            # Add point of tangency
+            fig_combined.add_trace(go.Scatter(x=[point_val], y=[y0], mode='markers', marker=dict(color='red', size=10), name='Point of Tangency'))
 
-if st.button("Plot Function and Tangent Line", key="tan_plot"):
-     original_expr = parse_expression(deriv_expr_str)
-     if original_expr is not None and deriv_order == 1:
-         try:
-             var_sym = sympy.symbols(deriv_var_str)
-             point_sym = parse_expression(tan_point_str) # Use parser to handle pi etc.
-             point_val = point_sym.evalf()
-
-             if not isinstance(point_val, (int, float, sympy.Float, sympy.Integer)):
-                  st.error(f"Cannot evaluate tangent point '{tan_point_str}' to a number.")
-             else:
-                 point_val = float(point_val) # Ensure float for numpy/plotly
-                 # Calculate derivative (order 1)
-                 deriv_expr, err_deriv = compute_derivative(deriv_expr_str, deriv_var_str, 1)
-                 if err_deriv:
-                      st.error(f"Could not compute derivative for tangent line: {err_deriv}")
-                 else:
-                     # Calculate slope m = f'(x₀)
-                     slope = deriv_expr.evalf(subs={var_sym: point_val})
-                     if not isinstance(slope, (int, float, sympy.Float, sympy.Integer)):
-                          st.error(f"Could not evaluate slope at x₀ = {point_val:.3f}. Is the function differentiable there?")
-                     else:
-                         slope = float(slope)
-                         # Calculate y-coordinate y₀ = f(x₀)
-                         y0 = original_expr.evalf(subs={var_sym: point_val})
-                         y0 = float(y0)
-
-                         # Tangent line equation: y - y₀ = m(x - x₀) => y = m(x - x₀) + y₀
-                         tangent_expr_str = f"{slope} * ({deriv_var_str} - {point_val}) + {y0}"
-                         tangent_expr_sym = parse_expression(tangent_expr_str)
-
-                         st.write("---")
-                         st.write(f"**At point $x_0 = {tan_point_str} \\approx {point_val:.4f}$:**")
-                         st.latex(f"f(x_0) \\approx {y0:.4f}")
-                         st.latex(f"f'(x_0) = \\text{{Slope }} m \\approx {slope:.4f}")
-                         st.write("**Tangent Line Equation:**")
-                         st.latex(f"y = {sympy.latex(tangent_expr_sym)}")
-
-                         # Plotting
-                         plot_min = point_val - plot_range_tan / 2
-                         plot_max = point_val + plot_range_tan / 2
-
-                         fig_main, err_main = plot_function(deriv_expr_str, deriv_var_str, plot_min, plot_max)
-                         fig_tan, err_tan = plot_function(tangent_expr_str, deriv_var_str, plot_min, plot_max)
-
-                         if err_main or err_tan:
-                              st.error(f"Plotting Error: Main: {err_main}, Tangent: {err_tan}")
-                         else:
-                              # Combine plots
-                              fig_combined = go.Figure(data=fig_main.data + fig_tan.data)
-                              # Add point of tangency
-                              fig_combined.add_trace(go.Scatter(x=[point_val], y=[y0], mode='markers', marker=dict(color='red', size=10), name='Point of Tangency'))
-
-                              fig_combined.update_layout(
-                                   title=f"Function $f({deriv_var_str})$ and Tangent Line at $x_0 \\approx {point_val:.3f}$",
-                                   xaxis_title=f"${deriv_var_str}$",
-                                   yaxis_title="y",
-                                   legend_title="Trace"
-                              )
-                              st.plotly_chart(fig_combined, use_container_width=True)
-
-         except Exception as e:
-             st.error(f"An error occurred during tangent line visualization: {e}")
-     elif deriv_order != 1:
-         st.warning("Tangent line visualization is only available for order 1 derivatives.")
-     else:
-         st.error("Could not parse the original function.")
\ No newline at end of file
+            # Keep the view on the curves; a steep tangent would otherwise stretch the y-axis
+            curves = np.concatenate([y_vals, slope_vals]) if show_derivative_curve else y_vals
+            finite = curves[np.isfinite(curves)]
+            if finite.size:
+                low, high = np.percentile(finite, [1, 99])
+                pad = 0.1 * (high - low) or 1.0
+                fig_combined.update_yaxes(range=[low - pad, high + pad])
+            fig_combined.update_layout(
+                 title=f"Function $f({deriv_var_str})$ and Tangent Line at $x_0 \\approx {point_val:.3f}$",
+                 xaxis_title=f"${deriv_var_str}$",
+                 yaxis_title="y",
+                 legend_title="Trace"
+            )
+            with timed("limits_derivatives.plotly_chart"):
+                st.plotly_chart(fig_combined, use_container_width=True)
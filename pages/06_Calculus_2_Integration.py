@@ -3,12 +3,17 @@ import sympy
 import numpy as np
 import plotly.graph_objects as go
 from utils.helpers import parse_expression, display_results, default_symbols, x, t, theta
-from utils.calculus_helpers import compute_integral
+from utils.calculus_helpers import compute_integral, parse_point
+from utils.numeric_helpers import estimate_integral, riemann_sums, RIEMANN_RULES, RIEMANN_MAX_EXPONENT
 from utils.plotting_helpers import plot_function
+from utils.metrics import timed
+from utils import progressive, workers
 
 st.set_page_config(page_title="Integration", layout="wide")
 st.title("∫ Calculus 2: Integration")
 
+INTEGRAL_TIME_LIMIT = 60 # seconds; symbolic integration runs in a worker process
+
 # --- Indefinite Integral ---
 st.header("Indefinite Integral Calculator")
 int_cols1 = st.columns([3, 1])
@@ -18,16 +23,31 @@ with int_cols1[1]:
     indef_var_str = st.text_input("Variable", "x", key="indef_var", max_chars=5)
 
 if st.button("Compute Indefinite Integral", key="indef_compute"):
-    integral_val, err = compute_integral(indef_expr_str, indef_var_str)
+    original_expr = parse_expression(indef_expr_str) # Reports parse errors itself
+    if original_expr is None:
+        progressive.clear("indef_job")
+    else:
+        progressive.start("indef_job", compute_integral, indef_expr_str, indef_var_str, time_limit=INTEGRAL_TIME_LIMIT,
+                          context={"expr": original_expr, "var": indef_var_str})
+
+
+def show_indefinite_heading(context):
+    st.write("---")
+    st.write(f"**Original Function $f({context['var']})$:**")
+    st.latex(sympy.latex(context["expr"]))
+
+
+def show_indefinite(job, result, error):
+    integral_val, err = result if result is not None else (None, error)
     if err:
         st.error(err)
-    else:
-        original_expr = parse_expression(indef_expr_str)
-        st.write("---")
-        st.write(f"**Original Function $f({indef_var_str})$:**")
-        st.latex(sympy.latex(original_expr))
-        st.write(f"**Indefinite Integral $\\int f({indef_var_str}) \\, d{indef_var_str}$:**")
-        st.latex(f"{sympy.latex(integral_val)} + C") # Remember the constant of integration!
+        return
+    show_indefinite_heading(job["context"])
+    st.write(f"**Indefinite Integral $\\int f({job['context']['var']}) \\, d{job['context']['var']}$:**")
+    st.latex(f"{sympy.latex(integral_val)} + C") # Remember the constant of integration!
+
+
+progressive.show("indef_job", show_indefinite, lambda job: show_indefinite_heading(job["context"]))
 
 st.divider()
 
@@ -43,80 +63,186 @@ with int_cols2[2]:
 with int_cols2[3]:
     def_upper_str = st.text_input("Upper Bound b", "2", key="def_upper")
 
-plot_def_integral = st.checkbox("Visualize Area under Curve", value=True, key="def_plot_check")
+def_check_cols = st.columns(2)
+with def_check_cols[0]:
+    plot_def_integral = st.checkbox("Visualize Area under Curve", value=True, key="def_plot_check")
+with def_check_cols[1]:
+    show_riemann = st.checkbox("Riemann Sums & Quadrature Rules", value=False, key="def_riemann_check")
 
 if st.button("Compute Definite Integral", key="def_compute"):
-    integral_val, err = compute_integral(def_expr_str, def_var_str, def_lower_str, def_upper_str)
-
-    if err:
-        st.error(err)
+    original_expr = parse_expression(def_expr_str) # Reports parse errors itself
+    if original_expr is None:
+        progressive.clear("def_job")
     else:
-        original_expr = parse_expression(def_expr_str)
-        st.write("---")
-        st.write(f"**Original Function $f({def_var_str})$:**")
-        st.latex(sympy.latex(original_expr))
-        st.write(f"**Definite Integral $\\int_{{{def_lower_str}}}^{{{def_upper_str}}} f({def_var_str}) \\, d{def_var_str}$:**")
-        st.latex(sympy.latex(integral_val))
         try:
-             st.write(f"**Numerical Value:** {integral_val.evalf():.6f}")
-        except AttributeError:
-             st.warning("Could not evaluate integral numerically (might be symbolic).")
+            preview = estimate_integral(original_expr, sympy.symbols(def_var_str), parse_point(def_lower_str), parse_point(def_upper_str))
+        except ValueError as e:
+            preview = (None, str(e))
+        # The exact integral runs in a worker; the quadrature estimate is shown until it arrives
+        progressive.start("def_job", compute_integral, def_expr_str, def_var_str, def_lower_str, def_upper_str,
+                          preview=preview, time_limit=INTEGRAL_TIME_LIMIT,
+                          context={"expr": original_expr, "expr_str": def_expr_str, "var": def_var_str, "lower": def_lower_str, "upper": def_upper_str})
 
 
-        # Plotting
-        if plot_def_integral:
-            try:
-                var_sym = sympy.symbols(def_var_str)
-                lower_bound = parse_expression(def_lower_str).evalf()
-                upper_bound = parse_expression(def_upper_str).evalf()
-                lower_bound = float(lower_bound)
-                upper_bound = float(upper_bound)
-
-                if lower_bound >= upper_bound:
-                    st.warning("Lower bound must be less than upper bound for standard area visualization.")
+def show_definite_heading(context):
+    st.write("---")
+    st.write(f"**Original Function $f({context['var']})$:**")
+    st.latex(sympy.latex(context["expr"]))
+    st.write(f"**Definite Integral $\\int_{{{context['lower']}}}^{{{context['upper']}}} f({context['var']}) \\, d{context['var']}$:**")
+
+
+def show_definite_preview(job):
+    estimate, estimate_err = job["preview"]
+    if estimate is not None:
+        value, quad_error = estimate
+        st.latex(f"\\approx {value:.10g}")
+        st.caption(f"Numeric estimate (tanh-sinh quadrature, error ≈ {quad_error:.1g}).")
+    elif estimate_err:
+        st.caption(estimate_err)
+
+
+def show_definite_preview_with_heading(job):
+    show_definite_heading(job["context"])
+    show_definite_preview(job)
+
+
+def show_definite(job, result, error):
+    integral_val, err = result if result is not None else (None, error)
+    if err and job["preview"][0] is None:
+        st.error(err)
+        return
+    show_definite_heading(job["context"])
+    if err:
+        st.warning(f"No exact value: {err}")
+        show_definite_preview(job)
+        return
+    st.latex(sympy.latex(integral_val))
+    try:
+         st.write(f"**Numerical Value:** {integral_val.evalf():.6f}")
+    except (AttributeError, TypeError):
+         st.warning("Could not evaluate integral numerically (might be symbolic).")
+
+
+def_job = progressive.show("def_job", show_definite, show_definite_preview_with_heading)
+
+if def_job is not None:
+    # The plot only needs the inputs, so it's drawn while the exact value is still computing
+    ctx = def_job["context"]
+    if plot_def_integral:
+        try:
+            var_sym = sympy.symbols(ctx["var"])
+            lower_bound = parse_expression(ctx["lower"]).evalf()
+            upper_bound = parse_expression(ctx["upper"]).evalf()
+            lower_bound = float(lower_bound)
+            upper_bound = float(upper_bound)
+
+            if lower_bound >= upper_bound:
+                st.warning("Lower bound must be less than upper bound for standard area visualization.")
+            else:
+                # Determine plot range (extend slightly beyond integration bounds)
+                padding = (upper_bound - lower_bound) * 0.2 + 0.5
+                plot_min = lower_bound - padding
+                plot_max = upper_bound + padding
+
+                fig_base, err_plot = plot_function(ctx["expr_str"], ctx["var"], plot_min, plot_max, points=500)
+
+                if err_plot:
+                    st.error(f"Plotting Error: {err_plot}")
                 else:
-                    # Determine plot range (extend slightly beyond integration bounds)
-                    padding = (upper_bound - lower_bound) * 0.2 + 0.5
-                    plot_min = lower_bound - padding
-                    plot_max = upper_bound + padding
-
-                    fig_base, err_plot = plot_function(def_expr_str, def_var_str, plot_min, plot_max, points=500)
-
-                    if err_plot:
-                        st.error(f"Plotting Error: {err_plot}")
-                    else:
-                        # Add shaded region for integral area
-                        # Generate points *within* the integration bounds for shading
-                        x_fill = np.linspace(lower_bound, upper_bound, 200)
-                        func_np = sympy.lambdify(var_sym, original_expr, modules=['numpy'])
+                    # Add shaded region for integral area
+                    # Generate points *within* the integration bounds for shading
+                    x_fill = np.linspace(lower_bound, upper_bound, 200)
+                    with timed("integration.lambdify"):
+                        func_np = sympy.lambdify(var_sym, ctx["expr"], modules=['numpy'])
+                    with timed("integration.evaluate"):
                         y_fill_complex = func_np(x_fill.astype(np.complex128))
-                        y_fill = np.real(y_fill_complex)
-                        # Ensure no NaNs/Infs in fill data
-                        valid_indices = ~np.isnan(y_fill) & ~np.isinf(y_fill)
-                        x_fill = x_fill[valid_indices]
-                        y_fill = y_fill[valid_indices]
-
-
-                        fig_base.add_trace(go.Scatter(
-                            x=np.concatenate([x_fill, x_fill[::-1]]), # x -> upper, x -> lower
-                            y=np.concatenate([y_fill, np.zeros(len(y_fill))]), # y -> upper, 0 -> lower
-                            fill='toself',
-                            fillcolor='rgba(0,100,80,0.2)',
-                            line=dict(color='rgba(255,255,255,0)'), # No border line for fill area
-                            hoverinfo="skip",
-                            showlegend=False,
-                            name='Integral Area'
-                        ))
-
-                        fig_base.update_layout(
-                             title=f"Area under $f({def_var_str}) = {sympy.latex(original_expr)}$ from {def_lower_str} to {def_upper_str}",
-                             xaxis_title=f"${def_var_str}$",
-                             yaxis_title=f"$f({def_var_str})$"
-                        )
+                    y_fill = np.real(y_fill_complex)
+                    # Ensure no NaNs/Infs in fill data
+                    valid_indices = ~np.isnan(y_fill) & ~np.isinf(y_fill)
+                    x_fill = x_fill[valid_indices]
+                    y_fill = y_fill[valid_indices]
+
+
+                    fig_base.add_trace(go.Scatter(
+                        x=np.concatenate([x_fill, x_fill[::-1]]), # x -> upper, x -> lower
+                        y=np.concatenate([y_fill, np.zeros(len(y_fill))]), # y -> upper, 0 -> lower
+                        fill='toself',
+                        fillcolor='rgba(0,100,80,0.2)',
+                        line=dict(color='rgba(255,255,255,0)'), # No border line for fill area
+                        hoverinfo="skip",
+                        showlegend=False,
+                        name='Integral Area'
+                    ))
+
+                    fig_base.update_layout(
+                         title=f"Area under $f({ctx['var']}) = {sympy.latex(ctx['expr'])}$ from {ctx['lower']} to {ctx['upper']}",
+                         xaxis_title=f"${ctx['var']}$",
+                         yaxis_title=f"$f({ctx['var']})$"
+                    )
+                    with timed("integration.plotly_chart"):
                         st.plotly_chart(fig_base, use_container_width=True)
 
-            except Exception as e:
-                 st.error(f"An error occurred during visualization: {e}")
+        except Exception as e:
+             st.error(f"An error occurred during visualization: {e}")
+
+
+def reference_value(job):
+    """The exact integral as a float when it is done and numeric, otherwise the quadrature estimate."""
+    if job["future"].done():
+        result, _ = workers.wait_result(job["future"])
+        integral_val, err = result if result is not None else (None, True)
+        if not err:
+            try:
+                return float(integral_val.evalf(20)), "exact value"
+            except (TypeError, ValueError):
+                pass
+    estimate, _ = job["preview"]
+    return (estimate[0], "quadrature estimate") if estimate is not None else (None, None)
+
+
+def show_riemann_sums(job):
+    ctx = job["context"]
+    st.subheader("Riemann Sums & Quadrature Rules")
+    max_exponent = st.slider("Largest n = 2^k", 1, RIEMANN_MAX_EXPONENT, 16, key="def_riemann_k")
+    try:
+        lower_bound = float(parse_expression(ctx["lower"]).evalf())
+        upper_bound = float(parse_expression(ctx["upper"]).evalf())
+    except (AttributeError, TypeError, ValueError):
+        lower_bound = upper_bound = np.inf
+    if not (np.isfinite(lower_bound) and np.isfinite(upper_bound)):
+        st.warning("Riemann sums need finite numeric bounds.")
+        return
+    # Always the full range: the cached finest grid serves every k
+    with timed("integration.riemann_sums"):
+        table, err = riemann_sums(ctx["expr"], sympy.symbols(ctx["var"]), lower_bound, upper_bound)
+    if err:
+        st.error(err)
+        return
+    rows = slice(0, max_exponent + 1)
+    n_vals = np.array(table["n"][rows])
+    st.dataframe({"n": n_vals, **{rule.capitalize(): [f"{v:.12g}" for v in table[rule][rows]] for rule in RIEMANN_RULES}},
+                 hide_index=True)
+
+    reference, source = reference_value(job)
+    if reference is None:
+        return
+    fig_error = go.Figure()
+    for rule in RIEMANN_RULES:
+        errors = np.abs(np.array(table[rule][rows]) - reference)
+        errors[errors == 0] = np.nan # Exact sums have no place on a log scale
+        fig_error.add_trace(go.Scatter(x=n_vals, y=errors, mode='lines+markers', name=rule.capitalize()))
+    fig_error.update_layout(
+        title=f"Error vs. n (against the {source})",
+        xaxis=dict(title="n (subintervals)", type="log"),
+        yaxis=dict(title="|error|", type="log", exponentformat="power"),
+    )
+    st.plotly_chart(fig_error, use_container_width=True)
+    st.caption("Left and right sums converge like 1/n, midpoint and trapezoid like 1/n², Simpson like 1/n⁴ "
+               "for smooth integrands; the errors flatten out at the reference value's own accuracy.")
+
+
+if def_job is not None and show_riemann:
+    show_riemann_sums(def_job)
 
 # TODO: Add Integration Techniques section (more advanced)
 # e.g., Show substitution steps, integration by parts setup.
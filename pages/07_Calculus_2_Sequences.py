@@ -3,13 +3,20 @@ import sympy
 import numpy as np
 import plotly.graph_objects as go
 from utils.helpers import parse_expression, display_results, default_symbols, x, t, theta
-from utils.calculus_helpers import compute_taylor_series
+from utils.calculus_helpers import compute_taylor_series, compute_series_sum
+from utils.numeric_helpers import estimate_series_sum
+from utils.series_tests import screen_series, run_convergence_test
 from utils.plotting_helpers import plot_function
+from utils.metrics import timed
+from utils import progressive, series_tests
 
 st.set_page_config(page_title="Sequences & Series", layout="wide")
 st.title("♾️ Calculus 2: Sequences & Series")
 
 n = sympy.symbols('n', integer=True, positive=True) # Common index variable
+SUMMATION_TIME_LIMIT = 60 # seconds; symbolic summation runs in a worker process
+CONVERGENCE_TEST_TIME_LIMIT = 20 # seconds per symbolic convergence test
+MAX_CONVERGENCE_TESTS = 3 # Tests tried in the pre-screen's order until one decides
 
 # --- Sequence Plotter ---
 st.header("Sequence Plotter")
@@ -33,7 +40,8 @@ if st.button("Plot Sequence Terms", key="seq_plot"):
             n_values = np.arange(seq_n_min, seq_n_max + 1)
             # Evaluate the sequence term for each n
             # Need to substitute n and evaluate numerically
-            terms = [seq_expr.subs({seq_var_sym: val}).evalf() for val in n_values]
+            with timed("sequences.evaluate_terms"):
+                terms = [seq_expr.subs({seq_var_sym: val}).evalf() for val in n_values]
             terms_float = [float(term) for term in terms] # Ensure numeric for plotting
 
             fig_seq = go.Figure()
@@ -41,7 +49,8 @@ if st.button("Plot Sequence Terms", key="seq_plot"):
 
             # Check limit as n -> oo (Divergence Test indicator)
             try:
-                 seq_limit = sympy.limit(seq_expr, seq_var_sym, sympy.oo)
+                 with timed("sequences.limit"):
+                     seq_limit = sympy.limit(seq_expr, seq_var_sym, sympy.oo)
                  st.write("**Limit as n → ∞:**")
                  st.latex(f"\\lim_{{n \\to \\infty}} ({sympy.latex(seq_expr)}) = {sympy.latex(seq_limit)}")
                  if seq_limit != 0:
@@ -58,7 +67,8 @@ if st.button("Plot Sequence Terms", key="seq_plot"):
                 yaxis_title="a_n",
                 xaxis=dict(dtick=max(1, seq_n_max // 10)) # Adjust tick spacing
             )
-            st.plotly_chart(fig_seq, use_container_width=True)
+            with timed("sequences.plotly_chart"):
+                st.plotly_chart(fig_seq, use_container_width=True)
 
         except Exception as e:
             st.error(f"Could not compute or plot sequence terms: {e}")
@@ -126,7 +136,8 @@ if st.button("Compute Taylor Series", key="taylor_compute"):
                          yaxis_title="y",
                          legend_title="Trace"
                     )
-                    st.plotly_chart(fig_combined, use_container_width=True)
+                    with timed("sequences.plotly_chart"):
+                        st.plotly_chart(fig_combined, use_container_width=True)
 
             except Exception as e:
                  st.error(f"An error occurred during plotting: {e}")
@@ -134,59 +145,135 @@ if st.button("Compute Taylor Series", key="taylor_compute"):
 
 st.divider()
 # --- Series Convergence ---
-st.header("Series Convergence (Basic Tests)")
+st.header("Series Convergence")
 conv_term_str = st.text_input("Series Term a_n (function of n)", "1/n**2", key="conv_term")
 
+
+def start_convergence_test(test, term_expr, screen):
+    p, decreasing = (screen["p"], screen["decreasing"]) if screen else (None, False)
+    progressive.start("conv_test_job", run_convergence_test, test, term_expr, n, p, decreasing,
+                      context={"test": test}, time_limit=CONVERGENCE_TEST_TIME_LIMIT)
+
+
 if st.button("Test Convergence", key="conv_test"):
+     progressive.clear("conv_sum_job")
+     progressive.clear("conv_test_job")
+     st.session_state.pop("conv_test_state", None)
      term_expr = parse_expression(conv_term_str, local_dict={'n': n}) # Use n as symbol
      if term_expr is None:
          st.error("Could not parse series term.")
+     elif term_expr.free_symbols - {n}:
+         st.error("The series term may only depend on n.")
+     else:
+         # 1. Numeric pre-screen (milliseconds) ranks the tests; only the most promising ones run
+         screen, screen_err = screen_series(term_expr, n)
+         tests = screen["tests"][:MAX_CONVERGENCE_TESTS] if screen else [series_tests.DIVERGENCE]
+         st.session_state["conv_test_state"] = {"term": term_expr, "screen": screen, "screen_error": screen_err,
+                                                "queue": tests[1:], "attempts": []}
+         start_convergence_test(tests[0], term_expr, screen)
+         if screen is None or screen["terms_vanish"]:
+             # 2. Exact summation runs in a worker; the accelerated numeric sum is shown until it arrives
+             progressive.start("conv_sum_job", compute_series_sum, term_expr, n,
+                               preview=estimate_series_sum(term_expr, n), time_limit=SUMMATION_TIME_LIMIT)
+
+
+def show_sum_preview(job):
+    estimate, estimate_err = job["preview"]
+    if estimate is not None:
+        st.latex(f"\\sum_{{n=1}}^{{\\infty}} a_n \\approx {estimate:.10g}")
+        st.caption("Numeric estimate (accelerated partial sums); not a proof of convergence.")
+    elif estimate_err:
+        st.caption(estimate_err)
+
+
+def show_sum(job, result, error):
+    summed, sum_error = result if result is not None else (None, error)
+    if sum_error:
+        st.warning(f"Could not compute symbolic sum or check convergence automatically: {sum_error}")
+        show_sum_preview(job)
+        st.info("This often happens for complex series. Try specific tests if applicable.")
+        return
+    inf_sum, is_conv = summed
+    st.write("Symbolic Sum Result:")
+    st.latex(sympy.latex(inf_sum))
+    if inf_sum.has(sympy.Sum) or inf_sum.has(sympy.oo) or inf_sum.has(sympy.zoo):
+         st.warning("SymPy could not find a finite symbolic sum.")
+         # Check convergence attribute if sum failed
+         st.write(f"SymPy's `is_convergent()` check: **{is_conv}**")
+         if is_conv == True:
+             st.success("SymPy suggests the series Converges.")
+             show_sum_preview(job)
+         elif is_conv == False:
+             st.error("SymPy suggests the series Diverges.")
+         else:
+             st.info("SymPy convergence check inconclusive.")
+             show_sum_preview(job)
+
+    elif inf_sum.is_finite:
+         st.success(f"Series Converges (Symbolic sum = {inf_sum.evalf():.6f}).")
+    else:
+         st.warning("Symbolic sum result is complex or not clearly finite/infinite.")
+         st.info("Try specific tests if applicable (not implemented automatically here).")
+
+
+def show_screen(screen):
+    p_text = f", |a(n)| ~ 1/n^{screen['p_estimate']:.3g}" if screen["p"] is not None else ""
+    st.caption(f"Numeric pre-screen at n ≈ 10⁶ ({screen['seconds'] * 1000:.0f} ms): "
+               f"|a(n+1)/a(n)| ≈ {screen['ratio']:.4g}, |a(n)|^(1/n) ≈ {screen['root']:.4g}{p_text}, "
+               f"signs {screen['sign']}. Tests to try: "
+               + ", ".join(series_tests.TEST_NAMES[t] for t in screen["tests"][:MAX_CONVERGENCE_TESTS]) + ".")
+
+
+def show_attempt(attempt):
+    name = series_tests.TEST_NAMES[attempt["test"]]
+    if attempt["error"]:
+        st.write(f"**{name}:** {attempt['error']}")
+        return
+    st.write(f"**{name}** ({attempt['seconds']:.2f} s): {attempt['verdict']}")
+    st.latex(attempt["detail"])
+
+
+def record_test(job, result, error):
+    # Runs once per finished job: record it and, if it didn't decide, queue the next test
+    if job["context"].get("recorded"):
+        return
+    job["context"]["recorded"] = True
+    state = st.session_state["conv_test_state"]
+    test = job["context"]["test"]
+    if result is not None and result[1] is not None:
+        result, error = None, result[1]
+    verdict, detail, seconds = result[0] if result is not None else (None, None, None)
+    state["attempts"].append({"test": test, "verdict": verdict, "detail": detail, "seconds": seconds,
+                              "error": error})
+    if verdict in (None, series_tests.INCONCLUSIVE) and state["queue"]:
+        start_convergence_test(state["queue"].pop(0), state["term"], state["screen"])
+        st.rerun()
+
+
+def show_test_running(job):
+    st.info(f"Running the {series_tests.TEST_NAMES[job['context']['test']]}...")
+
+
+conv_state = st.session_state.get("conv_test_state")
+if conv_state is not None:
+     term_expr = conv_state["term"]
+     st.write(f"Testing convergence of $\\sum_{{n=1}}^{{\\infty}} ({sympy.latex(term_expr)})$")
+     if conv_state["screen"] is not None:
+         show_screen(conv_state["screen"])
      else:
-         st.write(f"Testing convergence of $\\sum_{{n=1}}^{{\\infty}} ({sympy.latex(term_expr)})$")
+         st.caption(f"{conv_state['screen_error']} Trying the Divergence Test only.")
+     st.write("---")
+     progressive.show("conv_test_job", record_test, show_test_running)
+     for attempt in conv_state["attempts"]:
+         show_attempt(attempt)
+     decided = next((a for a in conv_state["attempts"] if a["verdict"] in (series_tests.CONVERGES, series_tests.DIVERGES)), None)
+     if decided is not None:
+         message = (f"Series {'Converges' if decided['verdict'] == series_tests.CONVERGES else 'Diverges'} "
+                    f"(decided by the {series_tests.TEST_NAMES[decided['test']]} in {decided['seconds']:.2f} s).")
+         (st.success if decided["verdict"] == series_tests.CONVERGES else st.error)(message)
+     elif not conv_state["queue"] and st.session_state["conv_test_job"]["future"].done():
+         st.info("The tests tried were inconclusive. See the summation check below, or apply a test by hand.")
+     if "conv_sum_job" in st.session_state:
          st.write("---")
-         # 1. Divergence Test
-         try:
-             term_limit = sympy.limit(term_expr, n, sympy.oo)
-             st.write("**1. Divergence Test:**")
-             st.latex(f"\\lim_{{n \\to \\infty}} a_n = \\lim_{{n \\to \\infty}} ({sympy.latex(term_expr)}) = {sympy.latex(term_limit)}")
-             if term_limit != 0:
-                 st.error("Series Diverges (Limit is non-zero).")
-                 # Stop testing if diverges
-             else:
-                 st.success("Limit is zero. Test is inconclusive. Proceeding...")
-                 st.write("---")
-                 # 2. Try SymPy's automatic summation (can be slow/fail)
-                 st.write("**2. SymPy Summation Check (Experimental):**")
-                 try:
-                     # Try to compute the sum symbolically
-                     inf_sum = sympy.summation(term_expr, (n, 1, sympy.oo))
-                     st.write("Symbolic Sum Result:")
-                     st.latex(sympy.latex(inf_sum))
-                     if inf_sum.has(sympy.Sum) or inf_sum.has(sympy.oo) or inf_sum.has(sympy.zoo):
-                          st.warning("SymPy could not find a finite symbolic sum.")
-                          # Check convergence attribute if sum failed
-                          is_conv = inf_sum.is_convergent()
-                          st.write(f"SymPy's `is_convergent()` check: **{is_conv}**")
-                          if is_conv == True:
-                              st.success("SymPy suggests the series Converges.")
-                          elif is_conv == False:
-                              st.error("SymPy suggests the series Diverges.")
-                          else:
-                              st.info("SymPy convergence check inconclusive.")
-
-                     elif inf_sum.is_finite:
-                          st.success(f"Series Converges (Symbolic sum = {inf_sum.evalf():.6f}).")
-                     else:
-                          st.warning("Symbolic sum result is complex or not clearly finite/infinite.")
-                          st.info("Try specific tests if applicable (not implemented automatically here).")
-
-                 except Exception as e_sum:
-                      st.warning(f"Could not compute symbolic sum or check convergence automatically: {e_sum}")
-                      st.info("This often happens for complex series. Try specific tests if applicable.")
-
-                 # TODO: Add buttons/logic for specific tests (Ratio, Root, Integral, Comparison)
-                 st.write("---")
-                 st.info("Further tests (Ratio, Root, Integral, Comparison) require specific implementation or manual application.")
-
-         except Exception as e_lim:
-              st.error(f"Could not compute limit for Divergence Test: {e_lim}")
\ No newline at end of file
+         st.write("**SymPy Summation Check (Experimental):**")
+         progressive.show("conv_sum_job", show_sum, show_sum_preview)
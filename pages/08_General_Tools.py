@@ -1,10 +1,14 @@
 import streamlit as st
 import sympy
 from utils.helpers import parse_expression, display_results, default_symbols
+from utils.metrics import timed
+from utils import coalesce, progressive, workers
 
 st.set_page_config(page_title="General Math Tools", layout="wide")
 st.title("🛠️ General Tools")
 
+SIMPLIFY_TIME_LIMIT = 60 # seconds; simplify runs in a worker process so it can't stall other users
+
 # --- Expression Simplifier ---
 st.header("Expression Simplifier")
 simp_expr_str = st.text_area("Enter Mathematical Expression", "(x**2 - 1) / (x - 1)", key="simp_expr_input")
@@ -17,43 +21,70 @@ original_expr_parsed = None
 if simp_expr_str:
     original_expr_parsed = parse_expression(simp_expr_str)
 
+# Simplify and Trig Simplify run in a worker and are shown progressively (the job is kept in the session);
+# the quick operations run inline and replace any running job
 with simp_cols[0]:
     if st.button("Simplify", key="simp_gen"):
         if original_expr_parsed:
-            simp_result = sympy.simplify(original_expr_parsed)
-            op_name = "General Simplify"
+            progressive.start("simp_job", coalesce.simplify, original_expr_parsed, time_limit=SIMPLIFY_TIME_LIMIT,
+                              context={"expr": original_expr_parsed, "op_name": "General Simplify"})
 
 with simp_cols[1]:
     if st.button("Expand", key="simp_exp"):
          if original_expr_parsed:
-            simp_result = sympy.expand(original_expr_parsed)
+            with timed("general_tools.expand"):
+                simp_result = sympy.expand(original_expr_parsed)
             op_name = "Expand"
+            progressive.clear("simp_job")
 
 with simp_cols[2]:
     if st.button("Factor", key="simp_fac"):
          if original_expr_parsed:
-            simp_result = sympy.factor(original_expr_parsed)
+            with timed("general_tools.factor"):
+                simp_result = sympy.factor(original_expr_parsed)
             op_name = "Factor"
+            progressive.clear("simp_job")
 
 with simp_cols[3]:
     if st.button("Trig Simplify", key="simp_trig"):
          if original_expr_parsed:
-            simp_result = sympy.trigsimp(original_expr_parsed)
-            op_name = "Trigonometric Simplify"
+            progressive.start("simp_job", coalesce.trigsimp, original_expr_parsed, time_limit=SIMPLIFY_TIME_LIMIT,
+                              context={"expr": original_expr_parsed, "op_name": "Trigonometric Simplify"})
 
 with simp_cols[4]:
     if st.button("Cancel", key="simp_can"):
          if original_expr_parsed:
-            simp_result = sympy.cancel(original_expr_parsed)
+            with timed("general_tools.cancel"):
+                simp_result = sympy.cancel(original_expr_parsed)
             op_name = "Cancel Terms"
+            progressive.clear("simp_job")
 
 # Add more buttons if needed (powsimp, combsimp, etc.)
 
+
+def show_simplified(job, result, error):
+    if error:
+        st.error(f"{job['context']['op_name']} did not finish: {error}")
+    else:
+        display_results(job["context"]["expr"], result, job["context"]["op_name"])
+
+
+def show_simplifying(job):
+    st.write("**Original Expression:**")
+    st.latex(sympy.latex(job["context"]["expr"]))
+    st.write(f"**{job['context']['op_name']}:**")
+
+
 st.write("---")
+simp_job = st.session_state.get("simp_job")
+if simp_job is not None and simp_job["context"]["expr"] != original_expr_parsed:
+    progressive.clear("simp_job") # The input changed since the job was started
 if original_expr_parsed is None and simp_expr_str:
     st.error("Could not parse the input expression.")
 elif simp_result is not None:
     display_results(original_expr_parsed, simp_result, op_name)
+elif "simp_job" in st.session_state:
+    progressive.show("simp_job", show_simplified, show_simplifying)
 elif original_expr_parsed:
      st.write("**Original Expression:**")
      st.latex(sympy.latex(original_expr_parsed))
@@ -87,9 +118,13 @@ if st.button("Check if Expressions are Equal", key="eq_check_button"):
 
         try:
             # Method 1: Simplify difference
-            diff_simplified = sympy.simplify(expr1 - expr2)
+            with st.spinner("Simplifying..."), timed("general_tools.simplify"):
+                diff_simplified, diff_error = workers.run(coalesce.simplify, expr1 - expr2, time_limit=SIMPLIFY_TIME_LIMIT)
             st.write("*Method 1: Simplify(Expression 1 - Expression 2)*")
-            st.latex(f"\\rightarrow {sympy.latex(diff_simplified)}")
+            if diff_error:
+                st.write(f"Simplify did not finish: {diff_error}")
+            else:
+                st.latex(f"\\rightarrow {sympy.latex(diff_simplified)}")
             if diff_simplified == 0:
                 st.success("Result: Expressions ARE equivalent (difference simplifies to 0).")
             else:
@@ -97,15 +132,20 @@ if st.button("Check if Expressions are Equal", key="eq_check_button"):
 
                 # Method 2: Using .equals() which applies more transformations
                 st.write("*Method 2: expr1.equals(expr2)*")
-                are_equal = expr1.equals(expr2)
+                with timed("general_tools.equals"):
+                    are_equal = expr1.equals(expr2)
                 st.write(f"Result: `{are_equal}`")
                 if are_equal:
                      st.success("Result: Expressions ARE equivalent (using `.equals()` method).")
                 else:
                      # Try simplifying both first
                      st.write("*Method 3: Simplify both and compare*")
-                     expr1_s = sympy.simplify(expr1)
-                     expr2_s = sympy.simplify(expr2)
+                     with st.spinner("Simplifying..."), timed("general_tools.simplify"):
+                         # Both are queued at once and run in parallel when workers are free
+                         futures = [workers.submit(coalesce.simplify, e, time_limit=SIMPLIFY_TIME_LIMIT) for e in (expr1, expr2)]
+                         (expr1_s, err1), (expr2_s, err2) = [workers.wait_result(f) for f in futures]
+                     if err1 or err2:
+                         raise RuntimeError(f"Simplify did not finish: {err1 or err2}")
                      st.latex(f"Simplify(Expr1) \\rightarrow {sympy.latex(expr1_s)}")
                      st.latex(f"Simplify(Expr2) \\rightarrow {sympy.latex(expr2_s)}")
                      if expr1_s.equals(expr2_s):
@@ -0,0 +1,26 @@
+"""Smoke tests for the Functions & Algebra page, run headless with Streamlit's AppTest."""
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+import utils.plotting_helpers as plotting_helpers
+
+PAGE = str(Path(__file__).resolve().parents[1] / "pages" / "04_Functions_Algebra.py")
+
+
+def test_plots_are_reused_on_unrelated_reruns(monkeypatch):
+    calls = []
+    for name in ("plot_function_2d", "plot_implicit"):
+        original = getattr(plotting_helpers, name)
+        monkeypatch.setattr(plotting_helpers, name,
+                            lambda *args, _name=name, _original=original, **kwargs: calls.append(_name) or _original(*args, **kwargs))
+    at = AppTest.from_file(PAGE, default_timeout=60).run()
+    assert not at.exception
+    first_run = len(calls)
+
+    at.text_input(key="log_exp_input").set_value("log(b**2)").run() # Unrelated widget
+    assert len(calls) == first_run
+    assert len(at.get("plotly_chart")) == 2
+
+    at.number_input(key="implicit_xmax").set_value(2.0).run()
+    assert calls[first_run:] == ["plot_implicit"]
@@ -0,0 +1,58 @@
+"""Smoke tests for the Limits & Derivatives page, run headless with Streamlit's AppTest."""
+from pathlib import Path
+
+import pytest
+import sympy
+from streamlit.testing.v1 import AppTest
+
+from utils.calculus_helpers import compute_limit
+from utils import planner
+
+PAGE = str(Path(__file__).resolve().parents[1] / "pages" / "05_Calculus_1_Limits.py")
+
+
+def run_with_function(expr_str):
+    at = AppTest.from_file(PAGE, default_timeout=60).run()
+    at.text_input(key="deriv_func").set_value(expr_str).run()
+    at.button(key="deriv_compute").click().run()
+    return at
+
+
+@pytest.mark.parametrize("expr_str", ["erf(x)", "gamma(x)", "loggamma(x)"])
+def test_special_functions_have_tangents(expr_str):
+    at = run_with_function(expr_str)
+    assert not at.exception
+    assert any("Tangent Line Equation" in m.value for m in at.markdown)
+
+
+def test_function_without_numeric_derivative_shows_error():
+    # No forward-mode rule and no NumPy implementation: reported, not raised
+    at = run_with_function("besselj(0, x)")
+    assert not at.exception
+    assert any("Could not evaluate" in e.value for e in at.error)
+
+
+def test_abs_derivative_values():
+    at = run_with_function("Abs(x)")
+    assert not at.exception
+    assert not at.error
+    assert list(at.dataframe[0].value["Value"]) == ["1", "1"]
+
+
+@pytest.mark.parametrize("expr_str, point_str, dir_str, expected", [
+    ("atan(1/x)", "0", "+", sympy.pi / 2),
+    ("atan(1/x)", "0", "-", -sympy.pi / 2),
+    ("acot(x)", "0", "+", sympy.pi / 2),
+    ("acot(x)", "0", "-", -sympy.pi / 2),
+    ("atan(tan(x))", "pi/2", "-", sympy.pi / 2),
+])
+def test_one_sided_limits_across_jumps(expr_str, point_str, dir_str, expected):
+    # The substitution shortcut must not answer these: the value at the point isn't the limit
+    limit_val, err = compute_limit(expr_str, "x", point_str, dir_str)
+    assert err is None
+    assert limit_val == expected
+
+
+def test_continuous_limit_uses_substitution():
+    x = sympy.Symbol('x')
+    assert planner.limit(x**2 + 1, x, 2, '+') == (5, "substitution")
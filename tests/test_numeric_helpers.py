@@ -0,0 +1,54 @@
+"""Tests for the numeric estimates in utils.numeric_helpers."""
+import math
+
+import pytest
+import sympy
+
+from utils.numeric_helpers import analyze_function, estimate_integral, estimate_limit
+
+x = sympy.Symbol('x')
+
+
+@pytest.mark.parametrize("expr_str, point, dir, exact", [
+    ("sin(x)/x", "0", "+-", 1.0),
+    ("(1 + 1/x)**x", "oo", "+", math.e),
+    ("x**x", "0", "+", 1.0),
+    ("x**sqrt(x)", "0", "+", 1.0),
+    ("log(x)/log(1 + x)", "oo", "+", 1.0),
+])
+def test_limit_error_estimate_covers_actual_error(expr_str, point, dir, exact):
+    estimate, err = estimate_limit(sympy.sympify(expr_str), x, sympy.sympify(point), dir)
+    assert err is None
+    assert abs(estimate.value - exact) <= max(estimate.error, 1e-15)
+
+
+@pytest.mark.parametrize("expr_str, confidence", [("sin(x)/x", "high"), ("x**x", "medium"), ("x**sqrt(x)", "low")])
+def test_limit_confidence(expr_str, confidence):
+    estimate, _ = estimate_limit(sympy.sympify(expr_str), x, sympy.S.Zero, "+")
+    assert estimate.confidence == confidence
+
+
+def test_integral_error_estimate_with_endpoint_singularity():
+    (value, error), err = estimate_integral(sympy.sympify("1/sqrt(x)"), x, sympy.S.Zero, sympy.S.One)
+    assert err is None
+    assert abs(value - 2) <= max(error, 1e-15)
+
+
+@pytest.mark.parametrize("expr_str, expected", [
+    ("Abs(x)", [(0.0, "min")]),         # Corner: f' jumps from -1 to 1, f'' is 0 or undefined
+    ("-Abs(x - 1)", [(1.0, "max")]),    # Off the grid: found by the jump in f'
+    ("x**3", [(0.0, "stationary")]),    # f' = 0 without a sign change
+    ("x**4", [(0.0, "min")]),           # f''(0) = 0, but f' changes sign
+    ("x**3 - 3*x", [(-1.0, "max"), (1.0, "min")]),
+])
+def test_critical_point_kinds(expr_str, expected):
+    analysis, err = analyze_function(sympy.sympify(expr_str), x, -3, 3)
+    assert err is None
+    found = [(x0, kind) for x0, _, kind in analysis["critical_points"]]
+    assert [kind for _, kind in found] == [kind for _, kind in expected]
+    assert [x0 for x0, _ in found] == pytest.approx([x0 for x0, _ in expected], abs=1e-6)
+
+
+def test_poles_are_not_critical_points():
+    analysis, _ = analyze_function(sympy.sympify("1/x**2"), x, -3, 3)
+    assert analysis["critical_points"] == []
@@ -0,0 +1,24 @@
+"""Tests for the Streamlit-free parsing core in utils.parsing."""
+import pytest
+import sympy
+
+from utils.parsing import SYNTAX, parse, x, y
+
+
+@pytest.mark.parametrize("expr_str, expected", [
+    ("x^2", x**2),
+    ("2^3", sympy.Integer(8)), # Not Python's xor, which gave 1
+    ("x^2 + y^2", x**2 + y**2),
+    ("2x^3", 2 * x**3),
+    ("x**2", x**2),
+])
+def test_caret_is_a_power(expr_str, expected):
+    result = parse(expr_str)
+    assert result.ok
+    assert result.expr == expected
+
+
+def test_syntax_error_position():
+    result = parse("sin(x")
+    assert result.error.kind == SYNTAX
+    assert result.error.position == 3
@@ -0,0 +1,34 @@
+"""Tests for the convergence-test selection in utils.series_tests."""
+import sympy
+
+from utils.series_tests import ALTERNATING, CONVERGES, INCONCLUSIVE, INTEGRAL, run_convergence_test, screen_series
+
+n = sympy.symbols('n', integer=True, positive=True)
+
+
+def test_alternating_series_with_decreasing_terms_converges():
+    term = (-1)**n / n
+    screen, err = screen_series(term, n)
+    assert err is None and screen["decreasing"]
+    assert ALTERNATING in screen["tests"]
+    (verdict, _, _), err = run_convergence_test(ALTERNATING, term, n, screen["p"], screen["decreasing"])
+    assert verdict == CONVERGES
+
+
+def test_alternating_series_needs_decreasing_terms():
+    # |a_n| -> 0 but rises at every even n; the series diverges
+    term = (-1)**n * (2 + (-1)**n) / n
+    screen, err = screen_series(term, n)
+    assert err is None and not screen["decreasing"]
+    assert ALTERNATING not in screen["tests"]
+    (verdict, _, _), err = run_convergence_test(ALTERNATING, term, n, screen["p"], screen["decreasing"])
+    assert verdict == INCONCLUSIVE
+
+
+def test_integral_test_needs_decreasing_terms():
+    term = (2 + sympy.sin(n)) / n**2
+    screen, _ = screen_series(term, n)
+    assert not screen["decreasing"]
+    assert INTEGRAL not in screen["tests"]
+    (verdict, _, _), _ = run_convergence_test(INTEGRAL, term, n, screen["p"], screen["decreasing"])
+    assert verdict == INCONCLUSIVE
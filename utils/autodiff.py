@@ -0,0 +1,150 @@
+"""
+Forward-mode automatic differentiation over parsed SymPy expressions.
+
+Evaluates f and f' together over a whole grid by walking the expression tree once with
+dual numbers: every node carries its value and its derivative as NumPy arrays, and each
+operation applies its own differentiation rule to both. No symbolic derivative is built,
+so moving a tangent point or redrawing an f' overlay only costs one pass over the grid.
+
+    (y, dy), err = value_and_derivative(expr, x, x_vals)
+
+Values are computed in complex arithmetic (like lambdify_real), and the results are real
+arrays with NaN where f or f' is complex, infinite or undefined. Subexpressions that don't
+depend on the variable are evaluated once with evalf; a repeated subexpression is evaluated
+once per pass.
+"""
+from typing import NamedTuple
+
+import mpmath
+import numpy as np
+import sympy
+
+from .metrics import instrumented
+from .numeric_helpers import real_part_or_nan
+
+
+class Dual(NamedTuple):
+    """A value and its derivative with respect to the variable (arrays or complex scalars)."""
+    val: object
+    der: object
+
+
+def _elementwise(f):
+    """An mpmath special function as a complex NumPy function (NumPy has none); NaN at poles."""
+    def scalar(z):
+        try:
+            return complex(f(z))
+        except (ValueError, ZeroDivisionError):
+            return complex(np.nan)
+    return np.vectorize(scalar, otypes=[np.complex128])
+
+
+_erf, _gamma, _loggamma, _digamma = map(_elementwise, (mpmath.erf, mpmath.gamma, mpmath.loggamma, mpmath.digamma))
+
+# Derivatives of one-argument functions in terms of the argument u (and the value v = f(u))
+UNARY = {
+    sympy.sin: (np.sin, lambda u, v: np.cos(u)),
+    sympy.cos: (np.cos, lambda u, v: -np.sin(u)),
+    sympy.tan: (np.tan, lambda u, v: 1 + v**2),
+    sympy.cot: (lambda u: 1 / np.tan(u), lambda u, v: -(1 + v**2)),
+    sympy.sec: (lambda u: 1 / np.cos(u), lambda u, v: v * np.tan(u)),
+    sympy.csc: (lambda u: 1 / np.sin(u), lambda u, v: -v / np.tan(u)),
+    sympy.asin: (np.arcsin, lambda u, v: 1 / np.sqrt(1 - u**2)),
+    sympy.acos: (np.arccos, lambda u, v: -1 / np.sqrt(1 - u**2)),
+    sympy.atan: (np.arctan, lambda u, v: 1 / (1 + u**2)),
+    sympy.sinh: (np.sinh, lambda u, v: np.cosh(u)),
+    sympy.cosh: (np.cosh, lambda u, v: np.sinh(u)),
+    sympy.tanh: (np.tanh, lambda u, v: 1 - v**2),
+    sympy.asinh: (np.arcsinh, lambda u, v: 1 / np.sqrt(u**2 + 1)),
+    sympy.acosh: (np.arccosh, lambda u, v: 1 / (np.sqrt(u - 1) * np.sqrt(u + 1))),
+    sympy.atanh: (np.arctanh, lambda u, v: 1 / (1 - u**2)),
+    sympy.exp: (np.exp, lambda u, v: v),
+    sympy.log: (np.log, lambda u, v: 1 / u),
+    sympy.erf: (_erf, lambda u, v: 2 / np.sqrt(np.pi) * np.exp(-u**2)),
+    sympy.erfc: (lambda u: 1 - _erf(u), lambda u, v: -2 / np.sqrt(np.pi) * np.exp(-u**2)),
+    sympy.gamma: (_gamma, lambda u, v: v * _digamma(u)),
+    sympy.loggamma: (_loggamma, lambda u, v: _digamma(u)),
+    # Real-valued on real input; the derivative is the real-variable one
+    sympy.Abs: (np.abs, lambda u, v: np.sign(np.real(u))),
+    sympy.sign: (lambda u: np.sign(np.real(u)), lambda u, v: 0),
+    sympy.floor: (lambda u: np.floor(np.real(u)), lambda u, v: 0),
+    sympy.ceiling: (lambda u: np.ceil(np.real(u)), lambda u, v: 0),
+}
+
+
+def _constant(expr):
+    value = complex(expr.evalf())
+    return Dual(value, 0)
+
+
+def _add(args):
+    val, der = args[0]
+    for a in args[1:]:
+        val, der = val + a.val, der + a.der
+    return Dual(val, der)
+
+
+def _mul(args):
+    val, der = args[0]
+    for a in args[1:]:
+        val, der = val * a.val, der * a.val + val * a.der
+    return Dual(val, der)
+
+
+def _pow(base, exponent, exponent_is_constant):
+    val = base.val ** exponent.val
+    if exponent_is_constant:
+        # d(u**c) = c*u**(c - 1)*du, written without dividing by u so u = 0 stays finite
+        return Dual(val, exponent.val * base.val ** (exponent.val - 1) * base.der)
+    return Dual(val, val * (exponent.der * np.log(base.val) + exponent.val * base.der / base.val))
+
+
+def _evaluate(expr, var, x_vals):
+    memo = {}
+    one = np.ones_like(x_vals)
+
+    def walk(e):
+        if e in memo:
+            return memo[e]
+        if e == var:
+            result = Dual(x_vals, one)
+        elif not e.has(var):
+            if e.free_symbols:
+                raise ValueError(f"Undefined symbol(s): {', '.join(sorted(map(str, e.free_symbols)))}")
+            result = _constant(e)
+        elif e.is_Add:
+            result = _add([walk(a) for a in e.args])
+        elif e.is_Mul:
+            result = _mul([walk(a) for a in e.args])
+        elif e.is_Pow:
+            result = _pow(walk(e.base), walk(e.exp), not e.exp.has(var))
+        elif e.func in UNARY and len(e.args) == 1:
+            u = walk(e.args[0])
+            func, derivative = UNARY[e.func]
+            val = func(u.val)
+            result = Dual(val, derivative(u.val, val) * u.der)
+        else:
+            raise NotImplementedError(f"No derivative rule for {e.func.__name__}")
+        memo[e] = result
+        return result
+
+    return walk(expr)
+
+
+@instrumented
+def value_and_derivative(expr, var, x_vals):
+    """
+    Evaluates expr and its derivative with respect to var over x_vals in one pass.
+    Returns ((values, derivatives), None) as real float arrays (NaN where complex, infinite
+    or undefined), or (None, error message) for unsupported functions or undefined symbols.
+    """
+    x_arr = np.asarray(x_vals, dtype=float)
+    try:
+        with np.errstate(all='ignore'):
+            result = _evaluate(sympy.sympify(expr), var, x_arr.astype(np.complex128))
+    except (NotImplementedError, ValueError, TypeError) as e:
+        return None, str(e) or type(e).__name__
+    values = real_part_or_nan(result.val, x_arr.shape)
+    derivatives = real_part_or_nan(result.der, x_arr.shape)
+    derivatives[np.isnan(values)] = np.nan  # No slope where f itself is undefined
+    return (values, derivatives), None
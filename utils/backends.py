@@ -0,0 +1,117 @@
+"""
+Evaluation backends for lambdified expressions.
+
+SymPy's NumPy lambdify evaluates an expression one operation at a time, allocating a
+temporary array per operation. The optional backends fuse the whole expression into a
+single loop:
+
+    numexpr  compiles the expression for numexpr's virtual machine, which evaluates it
+             in cache-sized blocks (pip install numexpr)
+    numba    JIT-compiles the expression into a NumPy ufunc; the first compile of an
+             expression takes 0.1-1s and is cached (pip install numba)
+
+Neither is required. When the package is missing, the expression uses a function the
+backend can't handle, or an evaluation fails (e.g. numba raises on complex division by
+zero), the NumPy lambdify is used instead, counted as 'backend.<name>.fallback'.
+
+    func = backends.lambdify([x], expr, backend="numexpr")
+    y = func(x_vals.astype(np.complex128))
+
+The default backend comes from STREAMLIT_MATH_EVAL_BACKEND (numpy, numexpr or numba;
+default: numpy).
+"""
+import functools
+import os
+
+import numpy as np
+import sympy
+
+from .metrics import increment
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKEND_ENV = "STREAMLIT_MATH_EVAL_BACKEND"
+
+NUMPY = "numpy"
+NUMEXPR = "numexpr"
+NUMBA = "numba"
+BACKENDS = (NUMPY, NUMEXPR, NUMBA)
+
+# Probe input for compiled functions: unsupported functions often only fail when called
+_PROBE = np.array([0.5 + 0j, 1.5 + 0j])
+
+
+def available_backends():
+    """The backends that can be used in this environment (NumPy always)."""
+    return [name for name, module in ((NUMPY, np), (NUMEXPR, numexpr), (NUMBA, numba)) if module is not None]
+
+
+def default_backend():
+    backend = os.environ.get(BACKEND_ENV, NUMPY).strip().lower()
+    return backend if backend in BACKENDS else NUMPY
+
+
+def _compile_numexpr(symbols, expr):
+    return sympy.lambdify(symbols, expr, modules=[NUMEXPR])
+
+
+def _compile_numba(symbols, expr):
+    # The NumPy lambdify source is valid numba code; vectorize turns it into a fused complex ufunc
+    source = sympy.lambdify(symbols, expr, modules=[NUMPY])
+    signature = f"complex128({', '.join(['complex128'] * len(symbols))})"
+    return numba.vectorize([signature])(source)
+
+
+@functools.lru_cache(maxsize=128)
+def _compile(symbols, expr, backend):
+    """Compiles and probes expr for a backend; returns None if the backend can't evaluate it."""
+    if backend == NUMEXPR and numexpr is not None:
+        func = _compile_numexpr(list(symbols), expr)
+    elif backend == NUMBA and numba is not None:
+        func = _compile_numba(list(symbols), expr)
+    else:
+        return None
+    try:
+        with np.errstate(all='ignore'):
+            func(*([_PROBE] * len(symbols)))
+    except Exception:
+        return None
+    return func
+
+
+def lambdify(symbols, expr, backend=None):
+    """
+    Like sympy.lambdify(symbols, expr, modules=['numpy']), evaluated with the given backend
+    (default: default_backend()) and falling back to NumPy where the backend can't be used.
+    The result accepts the same (complex) array arguments as the NumPy version.
+    """
+    symbols = list(symbols) if isinstance(symbols, (list, tuple)) else [symbols]
+    fallback = sympy.lambdify(symbols, expr, modules=[NUMPY])
+    backend = backend or default_backend()
+    if backend == NUMPY:
+        return fallback
+
+    try:
+        compiled = _compile(tuple(symbols), expr, backend)
+    except Exception:
+        compiled = None
+    if compiled is None:
+        increment(f"backend.{backend}.fallback")
+        return fallback
+
+    def evaluate(*args):
+        try:
+            return compiled(*args)
+        except Exception:
+            increment(f"backend.{backend}.fallback")
+            return fallback(*args)
+
+    return evaluate
@@ -0,0 +1,232 @@
+"""
+Headless batch computation over the utils helpers.
+
+Reads operations from a JSONL or CSV file, runs them on a process pool with a
+per-job timeout and streams one JSON result per line:
+
+    python -m utils.batch problems.jsonl -o answers.jsonl --workers 8 --timeout 20
+
+Each input record has an "op" field plus the operation's fields (an optional
+"id" is copied to the output):
+
+    limit       expr, var, point, dir ('+', '-' or '+-')
+    derivative  expr, var, order
+    integral    expr, var, lower, upper (omit the bounds for an indefinite integral)
+    taylor      expr, var, point, order
+    simplify    expr
+    triangle    type (sss, sas, asa, aas) and the matching a, b, c, alpha, beta, gamma
+
+e.g. {"id": "q1", "op": "integral", "expr": "x*exp(x)", "var": "x"}
+
+The same functionality is available as a library: run_job(job) and
+run_batch(jobs, workers=..., timeout=...).
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import sympy
+
+from .helpers import try_parse_expression
+from .calculus_helpers import compute_limit, compute_derivative, compute_integral, compute_taylor_series
+from .geometry_helpers import solve_sss, solve_sas, solve_asa, solve_aas
+from .workers import time_limit, WorkerTimeout
+from . import planner
+
+DEFAULT_TIMEOUT = 30.0  # seconds per job
+
+
+def _require(job, *fields):
+    missing = [f for f in fields if job.get(f) in (None, "")]
+    if missing:
+        raise ValueError(f"Missing field(s) for '{job.get('op')}': {', '.join(missing)}")
+
+
+def _run_limit(job):
+    _require(job, "expr", "point")
+    return compute_limit(job["expr"], job.get("var") or "x", str(job["point"]), dir_str=job.get("dir") or "+")
+
+
+def _run_derivative(job):
+    _require(job, "expr")
+    return compute_derivative(job["expr"], job.get("var") or "x", int(job.get("order") or 1))
+
+
+def _run_integral(job):
+    _require(job, "expr")
+    lower, upper = job.get("lower"), job.get("upper")
+    if lower in (None, "") and upper in (None, ""):
+        return compute_integral(job["expr"], job.get("var") or "x")
+    _require(job, "lower", "upper")
+    return compute_integral(job["expr"], job.get("var") or "x", str(lower), str(upper))
+
+
+def _run_taylor(job):
+    _require(job, "expr")
+    return compute_taylor_series(job["expr"], job.get("var") or "x", str(job.get("point") or "0"), int(job.get("order") or 5))
+
+
+def _run_simplify(job):
+    _require(job, "expr")
+    expr, error = try_parse_expression(job["expr"])
+    if expr is None:
+        return None, f"Parsing Error: {error}"
+    result, _ = planner.simplify(expr)
+    return result, None
+
+
+# Triangle solvers: (solver, input fields in call order, solved fields in result order)
+TRIANGLE_SOLVERS = {
+    "sss": (solve_sss, ("a", "b", "c"), ("alpha", "beta", "gamma")),
+    "sas": (solve_sas, ("b", "gamma", "a"), ("c", "alpha", "beta")),
+    "asa": (solve_asa, ("beta", "c", "alpha"), ("a", "b", "gamma")),
+    "aas": (solve_aas, ("alpha", "beta", "a"), ("b", "c", "gamma")),
+}
+
+
+def _run_triangle(job):
+    _require(job, "type")
+    solve_type = str(job["type"]).lower()
+    if solve_type not in TRIANGLE_SOLVERS:
+        raise ValueError(f"Unknown triangle type '{job['type']}' (expected one of: {', '.join(TRIANGLE_SOLVERS)})")
+    solver, inputs, outputs = TRIANGLE_SOLVERS[solve_type]
+    _require(job, *inputs)
+    values = [float(job[name]) for name in inputs]
+    solved = solver(*values)
+    # The solvers return their solved values followed by an error message
+    error = solved[-1] if isinstance(solved[-1], str) else None
+    if error:
+        return None, error
+    result = dict(zip(inputs, values))
+    result.update(zip(outputs, solved[:len(outputs)]))
+    return result, None
+
+
+OPERATIONS = {
+    "limit": _run_limit,
+    "derivative": _run_derivative,
+    "integral": _run_integral,
+    "taylor": _run_taylor,
+    "simplify": _run_simplify,
+    "triangle": _run_triangle,
+}
+
+
+def run_job(job, timeout=None):
+    """
+    Runs a single job dict and returns a JSON-serializable result dict with
+    status 'ok', 'error' or 'timeout'. The timeout is enforced by workers.time_limit
+    (SIGALRM; Unix, main thread only - always the case in pool workers).
+    """
+    result = {"id": job.get("id"), "op": job.get("op")}
+    start = time.perf_counter()
+    try:
+        operation = OPERATIONS.get(job.get("op"))
+        if operation is None:
+            raise ValueError(f"Unknown operation '{job.get('op')}' (expected one of: {', '.join(OPERATIONS)})")
+        with time_limit(timeout):
+            value, error = operation(job)
+        if error:
+            result.update(status="error", error=error)
+        elif isinstance(value, dict):
+            result.update(status="ok", result=value)
+        else:
+            result.update(status="ok", result=str(value), latex=sympy.latex(value))
+    except WorkerTimeout:
+        result.update(status="timeout", error=f"Exceeded {timeout:g}s time limit.")
+    except Exception as e:
+        result.update(status="error", error=f"{type(e).__name__}: {e}")
+    result["duration"] = round(time.perf_counter() - start, 6)
+    return result
+
+
+def run_batch(jobs, workers=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Runs jobs on a process pool and yields result dicts as they complete.
+    At most a few jobs per worker are in flight, so arbitrarily large inputs stream
+    with bounded memory. Each result carries the job's input position as 'index'.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2
+    # Parent-side guard for platforms without SIGALRM (or jobs stuck in C code).
+    # Generous, because a future counts as running while it still sits in the call queue.
+    grace = None if timeout is None else 2 * timeout + 5.0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}  # future -> [index, job, time first seen running]
+        job_iter = enumerate(jobs)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    index, job = next(job_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[pool.submit(run_job, job, timeout)] = [index, job, None]
+
+            done, _ = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, job, _ = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:  # Worker crashed (e.g. killed by the OS)
+                    result = {"id": job.get("id"), "op": job.get("op"), "status": "error", "error": f"Worker failed: {e}"}
+                result["index"] = index
+                yield result
+
+            if grace is not None:
+                now = time.monotonic()
+                for future, entry in list(pending.items()):
+                    if entry[2] is None:
+                        if future.running():
+                            entry[2] = now
+                    elif now - entry[2] > grace:
+                        # Can't interrupt the worker; report the job and stop waiting for it
+                        index, job, _ = pending.pop(future)
+                        yield {"id": job.get("id"), "op": job.get("op"), "index": index,
+                               "status": "timeout", "error": f"Exceeded {timeout:g}s time limit."}
+
+
+def read_jobs(path):
+    """Yields job dicts from a .jsonl or .csv file (CSV needs a header row; empty cells are ignored)."""
+    with open(path, newline="") as f:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield {k.strip(): v.strip() for k, v in row.items() if k and v is not None and v.strip() != ""}
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.batch", description="Run math operations in batch without Streamlit.")
+    parser.add_argument("input", help="Input file (.jsonl or .csv).")
+    parser.add_argument("-o", "--output", default=None, help="Output JSONL file (default: stdout).")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("-t", "--timeout", type=float, default=DEFAULT_TIMEOUT, help=f"Per-job timeout in seconds (default: {DEFAULT_TIMEOUT:g}).")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    counts = {}
+    try:
+        for result in run_batch(read_jobs(args.input), workers=args.workers, timeout=args.timeout):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"Done: {summary or 'no jobs'}.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,31 +1,45 @@
 import streamlit as st
 import sympy
-from .helpers import parse_expression, x, y, z, t, theta # Import default symbols and parser
+from .helpers import try_parse_expression, x, y, z, t, theta # Import default symbols and parser
+from .metrics import instrumented
+from .slowlog import recorded
+from .coalesce import coalesced, expression_key
+from . import planner
+from .derivatives import derivative_program
+
+
+def parse_point(point_str: str):
+    """Parses a limit point or integration bound; accepts inf/infinity/oo and their negatives."""
+    if point_str.lower() in ['inf', 'infinity', 'oo']: return sympy.oo
+    if point_str.lower() in ['-inf', '-infinity', '-oo']: return -sympy.oo
+    try:
+        return sympy.sympify(point_str) # Allows for numbers or symbolic points
+    except (SyntaxError, TypeError, ValueError, sympy.SympifyError):
+        raise ValueError(f"Invalid value: {point_str}")
 
+@instrumented
+@coalesced(keys={"expr_str": expression_key})
+@recorded
 def compute_limit(expr_str: str, var_str: str, point_str: str, dir_str='+'):
     """Computes the limit of an expression."""
-    expr = parse_expression(expr_str)
-    if expr is None: return None, "Parsing Error"
+    expr, parse_error = try_parse_expression(expr_str)
+    if expr is None: return None, f"Parsing Error: {parse_error}"
 
     try:
         var = sympy.symbols(var_str)
-        # Try converting point to number, handle infinity
-        if point_str.lower() in ['inf', 'infinity', 'oo']:
-            point = sympy.oo
-        elif point_str.lower() in ['-inf', '-infinity', '-oo']:
-            point = -sympy.oo
-        else:
-            point = sympy.sympify(point_str) # Allows for numbers or symbolic points
-
-        limit_val = sympy.limit(expr, var, point, dir=dir_str)
+        point = parse_point(point_str)
+        limit_val, _ = planner.limit(expr, var, point, dir=dir_str)
         return limit_val, None
     except Exception as e:
         return None, f"Could not compute limit: {e}"
 
+@instrumented
+@coalesced(keys={"expr_str": expression_key})
+@recorded
 def compute_derivative(expr_str: str, var_str: str, order: int = 1):
     """Computes the derivative of an expression."""
-    expr = parse_expression(expr_str)
-    if expr is None: return None, "Parsing Error"
+    expr, parse_error = try_parse_expression(expr_str)
+    if expr is None: return None, f"Parsing Error: {parse_error}"
 
     try:
         var = sympy.symbols(var_str)
@@ -36,33 +50,55 @@ def compute_derivative(expr_str: str, var_str: str, order: int = 1):
     except Exception as e:
         return None, f"Could not compute derivative: {e}"
 
+@instrumented
+@coalesced(keys={"expr_str": expression_key})
+@recorded
+def compute_derivative_program(expr_str: str, var_str: str, order: int = 1):
+    """
+    Computes the derivatives up to the given order as a shared-subexpression program
+    (utils.derivatives), for evaluating all orders together at high orders.
+    The variable is taken as real, so derivatives such as that of Abs(x) have a closed form.
+    """
+    expr, parse_error = try_parse_expression(expr_str)
+    if expr is None: return None, f"Parsing Error: {parse_error}"
+
+    try:
+        var = sympy.symbols(var_str)
+        if order < 1:
+            return None, "Order must be a positive integer."
+        real_var = sympy.Symbol(var.name, real=True)
+        program = derivative_program(expr.subs(var, real_var), real_var, order)
+        unevaluated = [value for _, value in program.assignments if isinstance(value, sympy.Derivative)]
+        if unevaluated: # e.g. floor(x); such a program could be displayed but not evaluated
+            term = unevaluated[0]
+            for s, value in reversed(program.assignments):
+                term = term.xreplace({s: value})
+            return None, f"Could not compute derivative: no closed form for the derivative of {term.expr}"
+        return program, None
+    except Exception as e:
+        return None, f"Could not compute derivative: {e}"
+
+@instrumented
+@coalesced(keys={"expr_str": expression_key})
+@recorded
 def compute_integral(expr_str: str, var_str: str, lower_bound_str=None, upper_bound_str=None):
     """Computes definite or indefinite integrals."""
-    expr = parse_expression(expr_str)
-    if expr is None: return None, "Parsing Error"
+    expr, parse_error = try_parse_expression(expr_str)
+    if expr is None: return None, f"Parsing Error: {parse_error}"
 
     try:
         var = sympy.symbols(var_str)
 
         if lower_bound_str is None and upper_bound_str is None:
             # Indefinite Integral
-            integral_val = sympy.integrate(expr, var)
+            integral_val, _ = planner.integrate(expr, var)
             return integral_val, None
         else:
             # Definite Integral
-            # Try converting bounds to numbers, handle infinity
-            def parse_bound(bound_str):
-                 if bound_str.lower() in ['inf', 'infinity', 'oo']: return sympy.oo
-                 if bound_str.lower() in ['-inf', '-infinity', '-oo']: return -sympy.oo
-                 try:
-                     return sympy.sympify(bound_str)
-                 except (SyntaxError, TypeError, ValueError):
-                     raise ValueError(f"Invalid bound: {bound_str}")
-
-            lower = parse_bound(lower_bound_str)
-            upper = parse_bound(upper_bound_str)
-
-            integral_val = sympy.integrate(expr, (var, lower, upper))
+            lower = parse_point(lower_bound_str)
+            upper = parse_point(upper_bound_str)
+
+            integral_val, _ = planner.integrate(expr, var, lower, upper)
             return integral_val, None
 
     except ValueError as e: # Catch invalid bounds specifically
@@ -71,10 +107,13 @@ def compute_integral(expr_str: str, var_str: str, lower_bound_str=None, upper_bo
         return None, f"Could not compute integral: {e}"
 
 
+@instrumented
+@coalesced(keys={"expr_str": expression_key})
+@recorded
 def compute_taylor_series(expr_str: str, var_str: str, point_str: str, order: int):
     """Computes the Taylor series expansion."""
-    expr = parse_expression(expr_str)
-    if expr is None: return None, "Parsing Error"
+    expr, parse_error = try_parse_expression(expr_str)
+    if expr is None: return None, f"Parsing Error: {parse_error}"
 
     try:
         var = sympy.symbols(var_str)
@@ -91,4 +130,25 @@ def compute_taylor_series(expr_str: str, var_str: str, point_str: str, order: in
     except Exception as e:
         return None, f"Could not compute Taylor series: {e}"
 
+@instrumented
+@coalesced
+@recorded
+def compute_series_sum(term_expr, var):
+    """
+    Sums term_expr for var = 1 .. oo. Returns ((sum, is_convergent), error message);
+    when no closed form is found the sum stays unevaluated and is_convergent is SymPy's
+    convergence verdict (True, False or None).
+    """
+    try:
+        inf_sum = sympy.summation(term_expr, (var, 1, sympy.oo))
+        is_convergent = None
+        if inf_sum.has(sympy.Sum) or inf_sum.has(sympy.oo) or inf_sum.has(sympy.zoo):
+            try:
+                is_convergent = sympy.Sum(term_expr, (var, 1, sympy.oo)).is_convergent()
+            except NotImplementedError:
+                pass
+        return (inf_sum, is_convergent), None
+    except Exception as e:
+        return None, f"Could not compute symbolic sum: {e}"
+
 # TODO: Add helpers for sequence plotting, series convergence tests:
\ No newline at end of file
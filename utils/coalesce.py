@@ -0,0 +1,129 @@
+"""
+Single-flight coalescing of identical in-flight computations.
+
+Streamlit sessions run as threads of one server process. When several sessions
+ask for the same computation at the same time (a projected problem, thirty
+students), only the first call runs; the others wait on its future and get the
+same result. Nothing is cached once the computation finishes.
+
+Keys are canonical: SymPy arguments use srepr, expression strings are compared
+by their parsed form, and other strings ignore spacing differences.
+Each coalesced call increments the 'coalesce.<operation>.coalesced' counter;
+computations that actually ran count under 'coalesce.<operation>.computed'.
+"""
+import functools
+import inspect
+import io
+import threading
+import tokenize
+from concurrent.futures import Future
+
+import sympy
+
+from .metrics import increment
+from . import planner
+from .parsing import parse
+from .slowlog import recorded
+
+_lock = threading.Lock()
+_in_flight = {}  # key -> Future of the running computation
+
+
+def _normalize_string(value):
+    """Re-joins the string's tokens with single spaces, so 'x**2+1' and 'x ** 2 + 1' match."""
+    try:
+        tokens = tokenize.generate_tokens(io.StringIO(value).readline)
+        return " ".join(tok.string for tok in tokens if tok.string.strip())
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return value.strip()
+
+
+def canonical(value):
+    """Canonical, hashable form of an argument."""
+    if isinstance(value, sympy.Basic):
+        return ("sympy", sympy.srepr(value))
+    if isinstance(value, str):
+        return ("str", _normalize_string(value))
+    if isinstance(value, (list, tuple)):
+        return tuple(canonical(v) for v in value)
+    return (type(value).__name__, repr(value))
+
+
+def expression_key(value):
+    """Canonical form of an expression string: its parsed form, so '1 + x**2' matches 'x**2+1'."""
+    result = parse(value)
+    if result.ok:
+        return ("sympy", sympy.srepr(result.expr))
+    return canonical(value)
+
+
+def run_once(key, func, *args, **kwargs):
+    """
+    Runs func(*args, **kwargs), unless a call with the same key is already running,
+    in which case it waits for that call and returns its result (or raises its exception).
+    """
+    with _lock:
+        future = _in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _in_flight[key] = future
+    if not leader:
+        increment(f"coalesce.{key[0]}.coalesced")
+        return future.result()
+
+    increment(f"coalesce.{key[0]}.computed")
+    try:
+        result = func(*args, **kwargs)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _lock:
+            del _in_flight[key]
+
+
+def coalesced(operation=None, keys=None):
+    """
+    Decorator that coalesces concurrent calls with equal (canonical) arguments.
+    `keys` maps parameter names to custom canonicalizers, e.g. {"expr_str": expression_key}.
+    Usable bare (@coalesced) or with an explicit operation name.
+    Only for functions whose results are safe to share (SymPy objects are immutable).
+    """
+    def decorator(func):
+        name = operation or func.__name__
+        signature = inspect.signature(func)
+        custom = keys or {}
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (name,) + tuple((param, custom.get(param, canonical)(value)) for param, value in bound.arguments.items())
+            return run_once(key, func, *args, **kwargs)
+        return wrapper
+
+    if callable(operation):  # Used bare: @coalesced
+        func, operation = operation, None
+        return decorator(func)
+    return decorator
+
+
+# Shared simplification entry points for the pages (slow calls go to the slow log once, not per waiter)
+
+@coalesced
+@recorded
+def simplify(expr):
+    """Simplifies expr with the cheapest sufficient strategy, coalesced across sessions."""
+    result, _ = planner.simplify(expr)
+    return result
+
+
+@coalesced
+@recorded
+def trigsimp(expr):
+    """sympy.trigsimp, coalesced across sessions."""
+    return sympy.trigsimp(expr)
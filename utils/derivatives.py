@@ -0,0 +1,154 @@
+"""
+High-order derivatives in common-subexpression form.
+
+sympy.diff(expr, x, n) returns a single expression tree, and the product and chain rules
+copy every subtree they touch, so order 10+ derivatives of e.g. tan(sin(x)) are slow to
+build and to lambdify. Here the expression is instead kept as a straight-line program with
+one assignment per operation, where an operation that occurs more than once (on the same
+operands) is assigned only once - common-subexpression elimination by construction:
+
+    c0 = 1/x
+    c1 = sin(x)
+    c2 = exp(c1)
+    c3 = c0*c2          # f = exp(sin(x))/x
+
+Each derivative is taken through the program with the chain rule: every intermediate c gets
+one new assignment for dc/dx, built from the partial derivatives of c's own (one-operation)
+definition and the slopes of its operands. All orders f, f', ..., f^(n) are outputs of the
+same program, so they are evaluated together with their shared intermediates:
+
+    program = derivative_program(expr, x, 12)
+    evaluate = lambdify_derivatives(program)
+    values = evaluate(x_vals)          # (13, len(x_vals)) array
+    expanded(program, 12)              # single expression tree, for display only
+"""
+from typing import NamedTuple
+
+import numpy as np
+import sympy
+
+from .metrics import instrumented
+from .numeric_helpers import real_part_or_nan
+
+
+class DerivativeProgram(NamedTuple):
+    """
+    A straight-line program for f and its derivatives: `assignments` is an ordered list of
+    (symbol, value) pairs, each value using only `var` and earlier symbols, and
+    `derivatives[k]` is f^(k) in terms of those symbols (derivatives[0] is f itself).
+    """
+    var: sympy.Symbol
+    assignments: list
+    derivatives: list
+
+    @property
+    def order(self):
+        return len(self.derivatives) - 1
+
+
+def _linearizer(names, assignments):
+    """
+    Returns linearize(e): adds one assignment per operation of e to `assignments` (reusing an
+    existing symbol when the same operation on the same operands was assigned before) and
+    returns the symbol, or atom, holding e's value.
+    """
+    table = {value: s for s, value in assignments}
+
+    def linearize(e):
+        if e.is_Atom:
+            return e
+        node = e.func(*[linearize(arg) for arg in e.args])
+        if node.is_Atom:
+            return node
+        if node not in table:
+            table[node] = next(names)
+            assignments.append((table[node], node))
+        return table[node]
+
+    return linearize
+
+
+@instrumented
+def derivative_program(expr, var, order):
+    """Builds the DerivativeProgram of expr with respect to var up to the given order."""
+    if order < 0:
+        raise ValueError("Order must be a non-negative integer.")
+    # Intermediates of a real variable are real too, so Abs and sign of them have closed-form derivatives
+    names = sympy.numbered_symbols('c', exclude=expr.free_symbols, real=var.is_real)
+    assignments = []
+    linearize = _linearizer(names, assignments)
+    slope = {}  # intermediate symbol -> symbol or atom holding its derivative
+    # DiracDelta terms (e.g. from Abs) vanish away from isolated points and can't be lambdified
+    no_delta = lambda e: e.replace(sympy.DiracDelta, lambda *args: sympy.S.Zero)
+
+    def derivative(e):
+        # d/dvar of a symbol or atom of the program, assigning the slopes it needs on the way
+        if not isinstance(e, sympy.Symbol) or e == var or e not in values:
+            return no_delta(sympy.diff(e, var))
+        pending = [e]
+        while pending:
+            s = pending[-1]
+            missing = [u for u in values[s].free_symbols if u in values and u not in slope]
+            if missing:
+                pending.extend(missing)
+                continue
+            pending.pop()
+            if s in slope:
+                continue
+            value = values[s]
+            d = sympy.diff(value, var)
+            for u in value.free_symbols & values.keys():
+                d += sympy.diff(value, u) * slope[u]
+            slope[s] = linearize(no_delta(d))
+            values.update((t, v) for t, v in assignments[len(values):])
+        return slope[e]
+
+    derivatives = [linearize(sympy.sympify(expr))]
+    values = dict(assignments)
+    for _ in range(order):
+        derivatives.append(derivative(derivatives[-1]))
+    return DerivativeProgram(var, assignments, derivatives)
+
+
+def used_assignments(program, orders=None):
+    """The assignments the given derivative orders (default: all) depend on, in program order."""
+    targets = program.derivatives if orders is None else [program.derivatives[k] for k in orders]
+    needed = set().union(*(e.free_symbols for e in targets))
+    used = []
+    for s, value in reversed(program.assignments):
+        if s in needed:
+            used.append((s, value))
+            needed |= value.free_symbols
+    return used[::-1]
+
+
+def expanded(program, k):
+    """
+    f^(k) as a single expression tree, for display. Substituting the assignments back would
+    copy every shared intermediate into each place it is used, so f is rebuilt and
+    differentiated with sympy.diff instead, which collects like terms as it goes.
+    """
+    f = program.derivatives[0]
+    for s, value in reversed(used_assignments(program, [0])):
+        f = f.xreplace({s: value})
+    return sympy.diff(f, program.var, k) if k else f
+
+
+def lambdify_derivatives(program, orders=None):
+    """
+    Compiles the program into one NumPy function evaluating the requested derivative orders
+    (default: all) with shared intermediates. Returns a function giving a real
+    (len(orders), n) array, with NaN where a value is complex or infinite.
+    """
+    orders = list(range(program.order + 1)) if orders is None else list(orders)
+    outputs = [program.derivatives[k] for k in orders]
+    steps = used_assignments(program, orders)
+    func = sympy.lambdify(program.var, outputs, modules=['numpy'], cse=lambda exprs: (steps, exprs))
+
+    def evaluate(x_vals):
+        x_arr = np.asarray(x_vals, dtype=float)
+        with np.errstate(all='ignore'):
+            values = func(x_arr.astype(np.complex128))
+        return np.stack([real_part_or_nan(v, x_arr.shape) for v in values])
+
+    return evaluate
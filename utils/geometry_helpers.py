@@ -1,9 +1,12 @@
 import math
+import time
 import numpy as np
 import streamlit as st
+from .metrics import instrumented
 
 # --- Triangle Solving Logic ---
 
+@instrumented
 def solve_sss(a, b, c):
     """Solves a triangle given three sides (SSS). Returns angles in degrees."""
     # Validate input
@@ -28,6 +31,7 @@ def solve_sss(a, b, c):
     except Exception as e:
         return None, None, None, f"An unexpected error occurred: {e}"
 
+@instrumented
 def solve_sas(b, gamma_deg, a):
     """Solves a triangle given two sides and the included angle (SAS)."""
     # Validate input
@@ -54,6 +58,7 @@ def solve_sas(b, gamma_deg, a):
     except Exception as e:
         return None, None, None, None, None, f"An unexpected error occurred: {e}"
 
+@instrumented
 def solve_asa(beta_deg, c, alpha_deg):
     """Solves a triangle given two angles and the included side (ASA)."""
     # Validate input
@@ -74,6 +79,7 @@ def solve_asa(beta_deg, c, alpha_deg):
     except Exception as e:
         return None, None, None, None, None, f"An unexpected error occurred: {e}"
 
+@instrumented
 def solve_aas(alpha_deg, beta_deg, a):
     """Solves a triangle given two angles and a non-included side (AAS)."""
      # Validate input
@@ -95,30 +101,229 @@ def solve_aas(alpha_deg, beta_deg, a):
         return None, None, None, None, None, f"An unexpected error occurred: {e}"
 
 
-# --- Bearing Calculation Helper (Example) ---
-def calculate_endpoint_from_bearing(start_lat, start_lon, bearing_deg, distance_km):
+# --- Vectorized Triangle Solving & Measurement Uncertainty ---
+# Array versions of the solvers above for many triangles at once. Like the *_many
+# elevation solvers they return (values, valid): a tuple of arrays, NaN where the triangle
+# is invalid, and the validity mask.
+
+def _acos_degrees(cos_value):
+    return np.degrees(np.arccos(np.clip(cos_value, -1.0, 1.0)))
+
+
+def solve_sss_many(a, b, c):
+    """SSS for arrays of sides. Returns ((alpha, beta, gamma), valid)."""
+    a, b, c = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (a, b, c)))
+    valid = (a > 0) & (b > 0) & (c > 0) & (a + b > c) & (a + c > b) & (b + c > a)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        alpha = _acos_degrees((b**2 + c**2 - a**2) / (2 * b * c))
+        beta = _acos_degrees((a**2 + c**2 - b**2) / (2 * a * c))
+    gamma = 180 - alpha - beta
+    return tuple(np.where(valid, v, np.nan) for v in (alpha, beta, gamma)), valid
+
+
+def solve_sas_many(b, gamma_deg, a):
+    """SAS for arrays of inputs. Returns ((c, alpha, beta), valid)."""
+    b, gamma_deg, a = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (b, gamma_deg, a)))
+    valid = (a > 0) & (b > 0) & (gamma_deg > 0) & (gamma_deg < 180)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        c = np.sqrt(a**2 + b**2 - 2 * a * b * np.cos(np.radians(gamma_deg)))
+        alpha = _acos_degrees((b**2 + c**2 - a**2) / (2 * b * c))
+    beta = 180 - alpha - gamma_deg
+    return tuple(np.where(valid, v, np.nan) for v in (c, alpha, beta)), valid
+
+
+def solve_asa_many(beta_deg, c, alpha_deg):
+    """ASA for arrays of inputs. Returns ((a, b, gamma), valid)."""
+    beta_deg, c, alpha_deg = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (beta_deg, c, alpha_deg)))
+    gamma_deg = 180 - alpha_deg - beta_deg
+    valid = (c > 0) & (alpha_deg > 0) & (beta_deg > 0) & (gamma_deg > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = c / np.sin(np.radians(gamma_deg)) # Law of Sines: side / sin(opposite angle)
+    a = scale * np.sin(np.radians(alpha_deg))
+    b = scale * np.sin(np.radians(beta_deg))
+    return tuple(np.where(valid, v, np.nan) for v in (a, b, gamma_deg)), valid
+
+
+def solve_aas_many(alpha_deg, beta_deg, a):
+    """AAS for arrays of inputs. Returns ((b, c, gamma), valid)."""
+    alpha_deg, beta_deg, a = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (alpha_deg, beta_deg, a)))
+    gamma_deg = 180 - alpha_deg - beta_deg
+    valid = (a > 0) & (alpha_deg > 0) & (beta_deg > 0) & (gamma_deg > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = a / np.sin(np.radians(alpha_deg))
+    b = scale * np.sin(np.radians(beta_deg))
+    c = scale * np.sin(np.radians(gamma_deg))
+    return tuple(np.where(valid, v, np.nan) for v in (b, c, gamma_deg)), valid
+
+
+# Same layout as utils.batch.TRIANGLE_SOLVERS: (solver, input names, output names)
+TRIANGLE_SOLVERS_MANY = {
+    "SSS": (solve_sss_many, ("a", "b", "c"), ("alpha", "beta", "gamma")),
+    "SAS": (solve_sas_many, ("b", "gamma", "a"), ("c", "alpha", "beta")),
+    "ASA": (solve_asa_many, ("beta", "c", "alpha"), ("a", "b", "gamma")),
+    "AAS": (solve_aas_many, ("alpha", "beta", "a"), ("b", "c", "gamma")),
+}
+ANGLE_NAMES = ("alpha", "beta", "gamma")
+UNCERTAINTY_SAMPLES = 200_000
+HISTOGRAM_BINS = 60
+
+
+@instrumented
+def propagate_triangle_uncertainty(solve_type, given, sigmas, samples=UNCERTAINTY_SAMPLES, confidence=0.95, seed=None):
+    """
+    Propagates independent Gaussian measurement errors (standard deviations `sigmas`, angles in
+    degrees) in the `given` inputs of a triangle case ("SSS", "SAS", "ASA" or "AAS", inputs in
+    the solver's order) to its unknowns, two ways:
+
+    - Monte Carlo: solves `samples` perturbed triangles in one vectorized batch, giving each
+      unknown's mean, standard deviation, central `confidence` interval and histogram.
+      Draws that give an invalid triangle are dropped and counted.
+    - Linearized: first-order propagation through a central-difference Jacobian at the
+      measured values, std = sqrt(sum((dx/dm * sigma_m)**2)).
+
+    Returns (report, None) with a dict per unknown under "unknowns", or (None, error message).
+    """
+    start = time.perf_counter()
+    if solve_type not in TRIANGLE_SOLVERS_MANY:
+        return None, f"Unknown triangle type '{solve_type}'."
+    solver, inputs, outputs = TRIANGLE_SOLVERS_MANY[solve_type]
+    given = np.asarray(given, dtype=float)
+    sigmas = np.asarray(sigmas, dtype=float)
+    if given.shape != (len(inputs),) or sigmas.shape != given.shape:
+        return None, f"{solve_type} needs {len(inputs)} measurements and one standard deviation for each."
+    if (sigmas < 0).any():
+        return None, "Standard deviations must be non-negative."
+    nominal, valid = solver(*given)
+    if not valid:
+        return None, "The measured values don't form a valid triangle."
+
+    # Linearized: all 2k perturbed inputs in one call
+    steps = np.maximum(np.abs(given), 1.0) * 1e-6
+    shifted = np.repeat(given[None, :], 2 * len(given), axis=0)
+    shifted[0::2] += np.diag(steps)
+    shifted[1::2] -= np.diag(steps)
+    shifted_values, _ = solver(*shifted.T)
+    jacobian = np.stack([(v[0::2] - v[1::2]) / (2 * steps) for v in shifted_values]) # (outputs, inputs)
+    linear_std = np.sqrt(((jacobian * sigmas)**2).sum(axis=1))
+
+    # Monte Carlo
+    rng = np.random.default_rng(seed)
+    draws = given + sigmas * rng.standard_normal((samples, len(given)))
+    values, valid = solver(*draws.T)
+    if not valid.any():
+        return None, "None of the perturbed measurements form a valid triangle."
+    tail = (1 - confidence) / 2 * 100
+    unknowns = {}
+    for name, nominal_value, v, lin in zip(outputs, nominal, values, linear_std):
+        v = v[valid]
+        lower, upper = np.percentile(v, [tail, 100 - tail])
+        counts, edges = np.histogram(v, bins=HISTOGRAM_BINS)
+        unknowns[name] = {
+            "nominal": float(nominal_value), "mean": float(v.mean()), "std": float(v.std()),
+            "lower": float(lower), "upper": float(upper), "linear_std": float(lin),
+            "histogram": (counts, edges),
+        }
+    return {
+        "unknowns": unknowns, "samples": samples, "invalid": int(samples - valid.sum()),
+        "confidence": confidence, "seconds": time.perf_counter() - start,
+    }, None
+
+
+# --- Great-Circle Navigation (vectorized) ---
+# Positions are (latitude, longitude) in degrees on a sphere of radius EARTH_RADIUS_KM and
+# bearings are degrees clockwise from north. The functions broadcast like NumPy ufuncs, so a
+# whole fleet of legs is one call; NaN inputs give NaN outputs.
+EARTH_RADIUS_KM = 6371.0
+
+
+def destination_points(lat_deg, lon_deg, bearing_deg, distance_km, radius=EARTH_RADIUS_KM):
+    """End points of legs from (lat, lon) along an initial bearing. Returns (lat, lon) arrays, lon in [-180, 180)."""
+    lat1 = np.radians(lat_deg)
+    lon1 = np.radians(lon_deg)
+    bearing = np.radians(bearing_deg)
+    d_r = np.asarray(distance_km, dtype=float) / radius # Angular distance
+    sin_lat2 = np.sin(lat1) * np.cos(d_r) + np.cos(lat1) * np.sin(d_r) * np.cos(bearing)
+    lat2 = np.arcsin(np.clip(sin_lat2, -1.0, 1.0))
+    lon2 = lon1 + np.arctan2(np.sin(bearing) * np.sin(d_r) * np.cos(lat1), np.cos(d_r) - np.sin(lat1) * sin_lat2)
+    return np.degrees(lat2), (np.degrees(lon2) + 180.0) % 360.0 - 180.0
+
+
+def initial_bearings(lat1_deg, lon1_deg, lat2_deg, lon2_deg):
+    """Initial great-circle bearings from the first points to the second, in [0, 360) degrees."""
+    lat1, lat2 = np.radians(lat1_deg), np.radians(lat2_deg)
+    d_lon = np.radians(np.subtract(lon2_deg, lon1_deg))
+    y = np.sin(d_lon) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(d_lon)
+    return np.degrees(np.arctan2(y, x)) % 360.0
+
+
+def great_circle_distances(lat1_deg, lon1_deg, lat2_deg, lon2_deg, radius=EARTH_RADIUS_KM):
+    """Great-circle distances between point pairs (haversine formula), in km."""
+    lat1, lat2 = np.radians(lat1_deg), np.radians(lat2_deg)
+    d_lat = lat2 - lat1
+    d_lon = np.radians(np.subtract(lon2_deg, lon1_deg))
+    h = np.sin(d_lat / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(d_lon / 2)**2
+    return 2 * radius * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def great_circle_paths(lat1_deg, lon1_deg, lat2_deg, lon2_deg, points=32):
+    """
+    Intermediate points on the great circles between point pairs, end points included.
+    Returns (lat, lon) arrays with a trailing axis of length `points`.
+    """
+    lat1, lon1 = np.asarray(lat1_deg, dtype=float)[..., None], np.asarray(lon1_deg, dtype=float)[..., None]
+    bearing = initial_bearings(lat1_deg, lon1_deg, lat2_deg, lon2_deg)[..., None]
+    distance = great_circle_distances(lat1_deg, lon1_deg, lat2_deg, lon2_deg)[..., None]
+    return destination_points(lat1, lon1, bearing, distance * np.linspace(0.0, 1.0, points))
+
+
+@instrumented
+def solve_routes(start_lats, start_lons, bearings, distances_km):
     """
-    Calculates the end coordinates given start coordinates, bearing, and distance.
-    Uses the Haversine formula principles.
-    
-    NOTE: For typical pre-calc problems NOT on a sphere, simpler plane trig is used.
-          This is a placeholder for geographic bearings if needed later.
-          For simple plane trig: dx = dist * sin(bearing_rad), dy = dist * cos(bearing_rad)
+    Follows routes of consecutive legs. start_lats/start_lons have one entry per route and
+    bearings/distances_km one row per route and one column per leg (NaN-padded for shorter
+    routes). Returns ((lats, lons), None) with the waypoints of each route, start included,
+    as (routes, legs + 1) arrays; or (None, error message).
     """
-    R = 6371 # Earth radius in km
-    bearing_rad = math.radians(bearing_deg)
-    lat1_rad = math.radians(start_lat)
-    lon1_rad = math.radians(start_lon)
-    d_R = distance_km / R # Angular distance
+    try:
+        start_lats = np.atleast_1d(np.asarray(start_lats, dtype=float))
+        start_lons = np.atleast_1d(np.asarray(start_lons, dtype=float))
+        bearings = np.atleast_2d(np.asarray(bearings, dtype=float))
+        distances_km = np.atleast_2d(np.asarray(distances_km, dtype=float))
+    except (TypeError, ValueError) as e:
+        return None, f"Invalid route data: {e}"
+    if bearings.shape != distances_km.shape or bearings.shape[0] != start_lats.shape[0] or start_lats.shape != start_lons.shape:
+        return None, "Each route needs a start point and one bearing per distance."
+    if not (np.isfinite(start_lats).all() and np.isfinite(start_lons).all()):
+        return None, "Start coordinates must be numbers."
+    if (np.abs(start_lats) > 90).any():
+        return None, "Latitudes must be between -90 and 90 degrees."
+    if (distances_km < 0).any():
+        return None, "Distances must be non-negative."
+
+    lats = np.full((bearings.shape[0], bearings.shape[1] + 1), np.nan)
+    lons = np.full_like(lats, np.nan)
+    lats[:, 0], lons[:, 0] = start_lats, start_lons
+    # Legs depend on the previous waypoint, so the loop is over legs, vectorized over routes
+    for k in range(bearings.shape[1]):
+        lats[:, k + 1], lons[:, k + 1] = destination_points(lats[:, k], lons[:, k], bearings[:, k], distances_km[:, k])
+    return (lats, lons), None
 
-    lat2_rad = math.asin(math.sin(lat1_rad)*math.cos(d_R) +
-                         math.cos(lat1_rad)*math.sin(d_R)*math.cos(bearing_rad))
-    lon2_rad = lon1_rad + math.atan2(math.sin(bearing_rad)*math.sin(d_R)*math.cos(lat1_rad),
-                                     math.cos(d_R)-math.sin(lat1_rad)*math.sin(lat2_rad))
 
-    return math.degrees(lat2_rad), math.degrees(lon2_rad)
+@instrumented
+def calculate_endpoint_from_bearing(start_lat, start_lon, bearing_deg, distance_km):
+    """
+    Calculates the end coordinates given start coordinates, bearing, and distance on the
+    Earth's sphere. Scalar version of destination_points().
+
+    NOTE: For typical pre-calc problems NOT on a sphere, simpler plane trig is used:
+          dx = dist * sin(bearing_rad), dy = dist * cos(bearing_rad)
+    """
+    lat2, lon2 = destination_points(start_lat, start_lon, bearing_deg, distance_km)
+    return float(lat2), float(lon2)
 
 # --- Angle of Elevation/Depression Helper ---
+@instrumented
 def solve_angle_elevation(distance, height):
     """ Calculates angle of elevation given horizontal distance and height. """
     if distance <= 0: return None, "Distance must be positive."
@@ -128,6 +333,7 @@ def solve_angle_elevation(distance, height):
     except Exception as e:
         return None, f"An unexpected error occurred: {e}"
 
+@instrumented
 def solve_height_from_elevation(distance, angle_deg):
     """ Calculates height given horizontal distance and angle of elevation. """
     if distance <= 0 or angle_deg <= 0 or angle_deg >= 90:
@@ -139,4 +345,26 @@ def solve_height_from_elevation(distance, angle_deg):
     except Exception as e:
         return None, f"An unexpected error occurred: {e}"
 
+
+# Array versions: one call for many scenarios. Instead of an error message they return a
+# validity mask alongside the values (NaN where the scenario is invalid).
+@instrumented
+def solve_angle_elevation_many(distances, heights):
+    """Angles of elevation (degrees) for arrays of distances and heights. Returns (angles, valid)."""
+    distances, heights = np.broadcast_arrays(np.asarray(distances, dtype=float), np.asarray(heights, dtype=float))
+    valid = (distances > 0) & np.isfinite(heights)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        angles = np.degrees(np.arctan(heights / distances))
+    return np.where(valid, angles, np.nan), valid
+
+
+@instrumented
+def solve_height_from_elevation_many(distances, angles_deg):
+    """Heights for arrays of distances and angles of elevation (degrees). Returns (heights, valid)."""
+    distances, angles_deg = np.broadcast_arrays(np.asarray(distances, dtype=float), np.asarray(angles_deg, dtype=float))
+    valid = (distances > 0) & (angles_deg > 0) & (angles_deg < 90)
+    with np.errstate(invalid='ignore'):
+        heights = distances * np.tan(np.radians(angles_deg))
+    return np.where(valid, heights, np.nan), valid
+
 # Add more geometry solvers as needed:
\ No newline at end of file
@@ -1,47 +1,41 @@
 import streamlit as st
 import sympy
-from sympy.parsing.sympy_parser import parse_expr, standard_transformations, implicit_multiplication_application
+from .metrics import instrumented
+# Common symbols and the Streamlit-free parsing core live in utils.parsing (re-exported here for the pages)
+from .parsing import parse, format_error_location, EMPTY, UNEXPECTED, x, y, z, t, theta, a, b, c, k, default_symbols
 
-# Define common symbols
-x, y, z, t, theta = sympy.symbols('x y z t theta')
-a, b, c, k = sympy.symbols('a b c k') # Common constants or variables
-
-# Add more symbols as needed
-default_symbols = {
-    'x': x, 'y': y, 'z': z, 't': t, 'theta': theta,
-    'a': a, 'b': b, 'c': c, 'k': k,
-    'sin': sympy.sin, 'cos': sympy.cos, 'tan': sympy.tan,
-    'csc': sympy.csc, 'sec': sympy.sec, 'cot': sympy.cot,
-    'asin': sympy.asin, 'acos': sympy.acos, 'atan': sympy.atan,
-    'log': sympy.log, 'ln': sympy.ln, 'exp': sympy.exp,
-    'sqrt': sympy.sqrt, 'pi': sympy.pi, 'e': sympy.E, 'I': sympy.I
-}
+def try_parse_expression(expr_str: str, local_dict=None):
+    """
+    Parses a string into a SymPy expression without any Streamlit output.
+    Returns (expression, None) on success or (None, error message) on failure,
+    so it can be used from batch jobs and worker processes.
+    """
+    result = parse(expr_str, local_dict)
+    return result.expr, (result.error.message if result.error else None)
 
+@instrumented
 def parse_expression(expr_str: str, local_dict=None):
     """
     Parses a string into a SymPy expression with error handling.
-    Includes standard transformations and implicit multiplication.
+    Thin Streamlit wrapper around utils.parsing.parse that reports problems in the app.
     """
-    if local_dict is None:
-        local_dict = default_symbols
+    result = parse(expr_str, local_dict)
+    if result.ok:
+        return result.expr
 
-    transformations = standard_transformations + (implicit_multiplication_application,)
-
-    if not expr_str:
-        st.warning("Input expression cannot be empty.")
+    error = result.error
+    if error.kind == EMPTY:
+        st.warning(error.message)
         return None
-    try:
-        # Safely parse the expression
-        parsed_expr = parse_expr(expr_str, local_dict=local_dict, transformations=transformations)
-        return parsed_expr
-    except (SyntaxError, TypeError, ValueError, NameError) as e:
-        st.error(f"Invalid expression: {e}")
+    st.error(error.message)
+    location = format_error_location(expr_str, error)
+    if location:
+        st.code(location, language=None)
+    if error.kind != UNEXPECTED:
         st.error(f"Please use standard mathematical notation (e.g., 'x^2 + sin(theta)', 'log(x, 10)', 'exp(a*t)'). Ensure all variables are defined or standard (x, y, z, t, theta, a, b, c, k).")
-        return None
-    except Exception as e:
-        st.error(f"An unexpected parsing error occurred: {e}")
-        return None
+    return None
 
+@instrumented
 def display_results(original_expr, result_expr, operation_name="Result"):
     """Formats and displays original and resulting expressions."""
     st.write(f"**Original Expression:**")
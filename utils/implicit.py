@@ -0,0 +1,222 @@
+"""
+Implicit curves F(x, y) = 0 by marching squares, vectorized over cells.
+
+    curve, err = implicit_curve(func, (x0, x1), (y0, y1))
+    curve["x"], curve["y"]          # one polyline, with NaN between the pieces
+
+func is a NumPy-lambdified F(x, y) taking complex arrays, like the functions from
+plotting_helpers.compile_parameterized. The curve is found in three steps:
+
+1. F is evaluated on a coarse grid of resolution x resolution cells in one broadcast call.
+2. Cells whose corners change sign are refined: each is split into factor x factor subcells
+   and F is evaluated at the corners of all of them in one call. This repeats `levels` times,
+   so only the cells the curve passes through reach the finest size.
+3. Marching squares on the finest cells: each cell gets a segment between the zero crossings
+   on its edges (two for saddle cells, resolved by the average of the corners). Each crossed
+   edge is bisected a few times, all edges in one call per step, before interpolating the
+   crossing. Segments are then chained into polylines through the edges they share.
+
+Cells with a corner where F is undefined, complex or infinite are skipped. A sign change
+across a pole (e.g. tan(x) = y) is told apart from a root by the bisection: |F| grows
+towards a pole, and the segment is dropped. A closed piece of curve smaller than a coarse
+cell can be missed when it changes no coarse corner's sign; a higher resolution finds it.
+"""
+import time
+
+import numpy as np
+
+from .metrics import instrumented
+from .numeric_helpers import real_part_or_nan
+
+# Edges of a cell: 0 bottom, 1 right, 2 top, 3 left. Corner bits: 1 bottom-left,
+# 2 bottom-right, 4 top-right, 8 top-left set where F > 0. SEGMENTS[case] lists the edge pairs
+# joined in that case; 16 and 17 are the saddle cases 5 and 10 with a positive centre.
+SEGMENTS = {
+    1: [(3, 0)], 2: [(0, 1)], 3: [(3, 1)], 4: [(1, 2)], 5: [(3, 0), (1, 2)], 6: [(0, 2)], 7: [(3, 2)],
+    8: [(3, 2)], 9: [(0, 2)], 10: [(0, 1), (2, 3)], 11: [(1, 2)], 12: [(3, 1)], 13: [(0, 1)], 14: [(3, 0)],
+    16: [(0, 1), (2, 3)], 17: [(3, 0), (1, 2)],
+}
+BISECTION_STEPS = 6 # Per crossed edge: sharpens the crossing and tells roots from poles
+
+_FIRST = np.full((18, 2), -1)
+_SECOND = np.full((18, 2), -1)
+for _case, _pairs in SEGMENTS.items():
+    _FIRST[_case] = _pairs[0]
+    if len(_pairs) > 1:
+        _SECOND[_case] = _pairs[1]
+
+
+def _evaluate(func, x, y):
+    """Real F(x, y) for broadcastable x and y, NaN where complex or infinite."""
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    with np.errstate(all='ignore'):
+        values = func(x.astype(np.complex128), y.astype(np.complex128))
+    return real_part_or_nan(values, x.shape)
+
+
+def _crossing_cells(corners):
+    """Mask of cells whose four (finite) corners don't all have the same sign."""
+    positive = corners > 0
+    return np.isfinite(corners).all(axis=0) & positive.any(axis=0) & ~positive.all(axis=0)
+
+
+def _refine(func, x0, y0, dx, dy, ci, cj, factor):
+    """
+    Splits cells (ci, cj) of size dx x dy into factor x factor subcells. Returns the subcells
+    that still change sign, as (ci, cj, corners) at the finer level.
+    """
+    steps = np.arange(factor + 1)
+    fx, fy = dx / factor, dy / factor
+    gi = ci[:, None] * factor + steps[None, :]
+    gj = cj[:, None] * factor + steps[None, :]
+    values = _evaluate(func, x0 + gi[:, None, :] * fx, y0 + gj[:, :, None] * fy) # (cells, rows, cols)
+    corners = np.stack([values[:, :-1, :-1], values[:, :-1, 1:], values[:, 1:, 1:], values[:, 1:, :-1]])
+    keep = _crossing_cells(corners)
+    cell, b, a = np.nonzero(keep)
+    return gi[cell, a], gj[cell, b], corners[:, keep]
+
+
+def _bisect_edges(func, start, stop, f_start, f_stop, steps=BISECTION_STEPS):
+    """
+    Narrows the sign change on each edge (start -> stop points, F values f_start, f_stop) by
+    bisection, all edges at once. Returns (points, is_root): the interpolated crossing in the
+    final bracket, and whether |F| shrank towards it (a root) rather than grew (a pole).
+    """
+    scale = np.maximum(np.abs(f_start), np.abs(f_stop))
+    for _ in range(steps):
+        middle = (start + stop) / 2
+        f_middle = _evaluate(func, middle[:, 0], middle[:, 1])
+        same = (np.sign(f_middle) == np.sign(f_start))[:, None] # Crossing in the upper half
+        start, stop = np.where(same, middle, start), np.where(same, stop, middle)
+        f_start, f_stop = np.where(same[:, 0], f_middle, f_start), np.where(same[:, 0], f_stop, f_middle)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        points = start + (f_start / (f_start - f_stop))[:, None] * (stop - start)
+    is_root = np.maximum(np.abs(f_start), np.abs(f_stop)) < scale
+    return points, is_root
+
+
+def _segments(func, x0, y0, dx, dy, ci, cj, corners, width):
+    """
+    Marching-squares segments of the given cells. Returns (keys, points): keys is an (n, 2)
+    array of the global ids of the two edges each segment joins and points an (n, 2, 2) array
+    of their end points. Each crossed edge is refined once, however many cells share it.
+    """
+    f00, f10, f11, f01 = corners
+    case = (f00 > 0) * 1 + (f10 > 0) * 2 + (f11 > 0) * 4 + (f01 > 0) * 8
+    centre_positive = corners.mean(axis=0) > 0
+    case = np.where((case == 5) & centre_positive, 16, case)
+    case = np.where((case == 10) & centre_positive, 17, case)
+
+    xl, yb = x0 + ci * dx, y0 + cj * dy
+    p00, p10 = np.stack([xl, yb], axis=-1), np.stack([xl + dx, yb], axis=-1)
+    p11, p01 = np.stack([xl + dx, yb + dy], axis=-1), np.stack([xl, yb + dy], axis=-1)
+    # Edges as (start, stop) corners: bottom, right, top, left; always left->right or bottom->top,
+    # so a shared edge gets the same bracket from both of its cells
+    edge_start = np.stack([p00, p10, p01, p00], axis=1) # (cells, 4, 2)
+    edge_stop = np.stack([p10, p11, p11, p01], axis=1)
+    value_start = np.stack([f00, f10, f01, f00], axis=1)
+    value_stop = np.stack([f10, f11, f11, f01], axis=1)
+    # Horizontal edge from lattice point (i, j): 2*(j*width + i); vertical: 2*(j*width + i) + 1
+    edge_keys = np.stack([2 * (cj * width + ci), 2 * (cj * width + ci + 1) + 1,
+                          2 * ((cj + 1) * width + ci), 2 * (cj * width + ci) + 1], axis=1)
+
+    cells, sides = [], []
+    for table in (_FIRST, _SECOND):
+        pairs = table[case]
+        present = np.nonzero(pairs[:, 0] >= 0)[0]
+        cells.append(present)
+        sides.append(pairs[present])
+    cells, sides = np.concatenate(cells), np.concatenate(sides)
+    keys = edge_keys[cells[:, None], sides] # (segments, 2)
+
+    unique_keys, first = np.unique(keys.ravel(), return_index=True)
+    cell_of, side_of = np.repeat(cells, 2)[first], sides.ravel()[first]
+    crossings, is_root = _bisect_edges(func, edge_start[cell_of, side_of], edge_stop[cell_of, side_of],
+                                       value_start[cell_of, side_of], value_stop[cell_of, side_of])
+    index = np.searchsorted(unique_keys, keys)
+    keep = is_root[index].all(axis=1)
+    return keys[keep], crossings[index[keep]]
+
+
+def _chain(keys, points):
+    """Joins segments that share an edge into polylines; returns (x, y, pieces) with NaN between pieces."""
+    unique_keys, nodes = np.unique(keys, return_inverse=True)
+    nodes = nodes.reshape(-1, 2) # Segment i joins nodes[i, 0] and nodes[i, 1]
+    node_points = np.empty((len(unique_keys), 2))
+    node_points[nodes.ravel()] = points.reshape(-1, 2)
+
+    # Each node (edge crossing) belongs to at most two segments
+    incident = np.full((len(unique_keys), 2), -1)
+    order = np.argsort(nodes.ravel(), kind='stable')
+    sorted_nodes = nodes.ravel()[order]
+    first = np.r_[True, sorted_nodes[1:] != sorted_nodes[:-1]]
+    incident[sorted_nodes[first], 0] = order[first] // 2
+    second = ~first
+    incident[sorted_nodes[second], 1] = order[second] // 2
+
+    ends, links = nodes.tolist(), incident.tolist()
+    used = bytearray(len(ends))
+
+    def walk(node):
+        # Follows unused segments from node until the curve ends or closes
+        path = []
+        while True:
+            a, b = links[node]
+            segment = a if a >= 0 and not used[a] else b if b >= 0 and not used[b] else -1
+            if segment < 0:
+                return path
+            used[segment] = 1
+            u, v = ends[segment]
+            node = v if u == node else u
+            path.append(node)
+
+    path = []
+    pieces = 0
+    for segment in range(len(ends)):
+        if used[segment]:
+            continue
+        used[segment] = 1
+        u, v = ends[segment]
+        forward = walk(v)
+        backward = walk(u)
+        path.extend(backward[::-1] + [u, v] + forward + [-1])
+        pieces += 1
+    path = np.array(path[:-1])
+    coords = node_points[path]
+    coords[path < 0] = np.nan
+    return coords[:, 0], coords[:, 1], pieces
+
+
+@instrumented
+def implicit_curve(func, x_range, y_range, resolution=100, factor=4, levels=2):
+    """
+    Traces F(x, y) = 0 over x_range x y_range (see the module docstring). Returns (curve, None)
+    where curve has the polyline ("x", "y", NaN-separated), the number of "pieces" and
+    "segments", F "evaluations" and "seconds"; or (None, error message).
+    """
+    start = time.perf_counter()
+    (x0, x1), (y0, y1) = x_range, y_range
+    if not (x0 < x1 and y0 < y1):
+        return None, "Each range needs min < max."
+    try:
+        dx, dy = (x1 - x0) / resolution, (y1 - y0) / resolution
+        grid = _evaluate(func, x0 + np.arange(resolution + 1)[None, :] * dx, y0 + np.arange(resolution + 1)[:, None] * dy)
+        evaluations = grid.size
+        corners = np.stack([grid[:-1, :-1], grid[:-1, 1:], grid[1:, 1:], grid[1:, :-1]])
+        keep = _crossing_cells(corners)
+        cj, ci = np.nonzero(keep)
+        corners = corners[:, keep]
+        for _ in range(levels):
+            evaluations += len(ci) * (factor + 1)**2
+            ci, cj, corners = _refine(func, x0, y0, dx, dy, ci, cj, factor)
+            dx, dy = dx / factor, dy / factor
+        width = resolution * factor**levels + 1 # Lattice points per row at the finest level
+        keys, points = _segments(func, x0, y0, dx, dy, ci, cj, corners, width)
+        evaluations += len(np.unique(keys)) * BISECTION_STEPS
+    except Exception as e:
+        return None, f"Could not evaluate the relation: {e}"
+    if not len(keys):
+        return None, "No points of the curve found in this range."
+    xs, ys, pieces = _chain(keys, points)
+    return {"x": xs, "y": ys, "pieces": pieces, "segments": len(keys), "evaluations": evaluations,
+            "seconds": time.perf_counter() - start}, None
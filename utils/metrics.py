@@ -0,0 +1,201 @@
+import functools
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency histogram bucket upper bounds (seconds), Prometheus-style.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, math.inf)
+
+METRIC_PREFIX = "streamlit_math"
+
+# Set STREAMLIT_MATH_METRICS_FILE to have the Prometheus text file refreshed automatically
+# (e.g. for node_exporter's textfile collector). The admin view can also export on demand.
+METRICS_FILE_ENV = "STREAMLIT_MATH_METRICS_FILE"
+AUTO_EXPORT_INTERVAL = 15.0  # seconds between automatic exports
+
+# Registry is process-wide, so it aggregates over all Streamlit sessions.
+_lock = threading.Lock()
+_timings = {}   # operation -> {'count', 'errors', 'sum', 'max', 'buckets'}
+_counters = {}  # event name -> count
+_gauges = {}    # gauge name -> current value
+_last_export = 0.0
+
+
+def observe(operation, seconds, error=False):
+    """Records one latency sample for an operation."""
+    with _lock:
+        stats = _timings.get(operation)
+        if stats is None:
+            stats = {'count': 0, 'errors': 0, 'sum': 0.0, 'max': 0.0, 'buckets': [0] * len(BUCKETS)}
+            _timings[operation] = stats
+        stats['count'] += 1
+        stats['sum'] += seconds
+        stats['max'] = max(stats['max'], seconds)
+        if error:
+            stats['errors'] += 1
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                stats['buckets'][i] += 1
+                break
+    _maybe_auto_export()
+
+
+def increment(event, amount=1):
+    """Increments a plain event counter."""
+    with _lock:
+        _counters[event] = _counters.get(event, 0) + amount
+
+
+def set_gauge(name, value):
+    """Sets a gauge (a value that goes up and down, e.g. a queue depth)."""
+    with _lock:
+        _gauges[name] = value
+
+
+def gauges():
+    """Returns a copy of the current gauge values."""
+    with _lock:
+        return dict(_gauges)
+
+
+@contextmanager
+def timed(operation):
+    """Context manager that records the latency of the enclosed block under `operation`."""
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        observe(operation, time.perf_counter() - start, error=error)
+
+
+def instrumented(operation=None):
+    """
+    Decorator that records the latency of every call.
+    Usable bare (@instrumented) or with an explicit name (@instrumented("name")).
+    Defaults to '<module>.<function>', e.g. 'calculus_helpers.compute_limit'.
+    """
+    def decorator(func):
+        name = operation or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    if callable(operation):  # Used bare: @instrumented
+        func, operation = operation, None
+        return decorator(func)
+    return decorator
+
+
+def snapshot():
+    """Returns a copy of the current metrics: (timings, counters)."""
+    with _lock:
+        timings = {op: dict(stats, buckets=list(stats['buckets'])) for op, stats in _timings.items()}
+        counters = dict(_counters)
+    return timings, counters
+
+
+def reset():
+    """Clears all recorded metrics."""
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+        # Gauges describe current state, so they are kept
+
+
+def estimate_quantile(stats, q):
+    """Estimates a latency quantile (seconds) from the histogram by linear interpolation within a bucket."""
+    if stats['count'] == 0:
+        return None
+    target = q * stats['count']
+    cumulative = 0
+    lower = 0.0
+    for bound, count in zip(BUCKETS, stats['buckets']):
+        if cumulative + count >= target and count > 0:
+            upper = bound if bound != math.inf else stats['max']
+            return lower + (upper - lower) * (target - cumulative) / count
+        cumulative += count
+        lower = bound
+    return stats['max']
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus():
+    """Renders all metrics in the Prometheus text exposition format."""
+    timings, counters = snapshot()
+    name = f"{METRIC_PREFIX}_operation_seconds"
+    lines = [
+        f"# HELP {name} Latency of instrumented operations.",
+        f"# TYPE {name} histogram",
+    ]
+    for op in sorted(timings):
+        stats = timings[op]
+        label = f'operation="{_escape_label(op)}"'
+        cumulative = 0
+        for bound, count in zip(BUCKETS, stats['buckets']):
+            cumulative += count
+            le = "+Inf" if bound == math.inf else repr(bound)
+            lines.append(f'{name}_bucket{{{label},le="{le}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{label}}} {stats['sum']!r}")
+        lines.append(f"{name}_count{{{label}}} {stats['count']}")
+
+    errors_name = f"{METRIC_PREFIX}_operation_errors_total"
+    lines.append(f"# HELP {errors_name} Instrumented operations that raised an exception.")
+    lines.append(f"# TYPE {errors_name} counter")
+    for op in sorted(timings):
+        lines.append(f'{errors_name}{{operation="{_escape_label(op)}"}} {timings[op]["errors"]}')
+
+    events_name = f"{METRIC_PREFIX}_events_total"
+    lines.append(f"# HELP {events_name} Event counters.")
+    lines.append(f"# TYPE {events_name} counter")
+    for event in sorted(counters):
+        lines.append(f'{events_name}{{event="{_escape_label(event)}"}} {counters[event]}')
+
+    current = gauges()
+    gauges_name = f"{METRIC_PREFIX}_gauge"
+    lines.append(f"# HELP {gauges_name} Current values (queue depths, running jobs).")
+    lines.append(f"# TYPE {gauges_name} gauge")
+    for gauge in sorted(current):
+        lines.append(f'{gauges_name}{{name="{_escape_label(gauge)}"}} {current[gauge]!r}')
+    return "\n".join(lines) + "\n"
+
+
+def export_prometheus(path=None):
+    """
+    Writes the metrics to a Prometheus text file and returns its path.
+    The file is replaced atomically so scrapers never read a partial file.
+    """
+    if path is None:
+        path = os.environ.get(METRICS_FILE_ENV, "metrics.prom")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+    return path
+
+
+def _maybe_auto_export():
+    global _last_export
+    path = os.environ.get(METRICS_FILE_ENV)
+    if not path:
+        return
+    now = time.monotonic()
+    with _lock:
+        if now - _last_export < AUTO_EXPORT_INTERVAL:
+            return
+        _last_export = now
+    try:
+        export_prometheus(path)
+    except OSError:
+        pass  # Metrics export must never break a computation
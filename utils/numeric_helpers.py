@@ -0,0 +1,661 @@
+import functools
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+import mpmath
+import numpy as np
+import sympy
+from .metrics import instrumented
+from . import backends
+
+EVAL_THREADS_ENV = "STREAMLIT_MATH_EVAL_THREADS"
+CHUNK_SIZE = 1 << 16 # Points per block: a complex128 temporary is 1 MiB, so a block's temporaries stay cache-resident
+PARALLEL_THRESHOLD = 4 * CHUNK_SIZE # Smaller grids are evaluated in one call; threads wouldn't pay off
+
+# --- Scalar root refinement ---
+
+def brentq(f, xa, xb, xtol=2e-12, rtol=4 * np.finfo(float).eps, maxiter=100):
+    """
+    Finds a root of f in [xa, xb] with Brent's method (bisection + secant + inverse quadratic).
+    f(xa) and f(xb) must have opposite signs. Port of the classic Brent-Dekker algorithm.
+    """
+    xpre, xcur = float(xa), float(xb)
+    fpre, fcur = float(f(xpre)), float(f(xcur))
+    if fpre == 0:
+        return xpre
+    if fcur == 0:
+        return xcur
+    if np.sign(fpre) == np.sign(fcur):
+        raise ValueError("f(xa) and f(xb) must have opposite signs.")
+
+    xblk = fblk = spre = scur = 0.0
+    for _ in range(maxiter):
+        if fpre != 0 and fcur != 0 and np.sign(fpre) != np.sign(fcur):
+            xblk, fblk = xpre, fpre
+            spre = scur = xcur - xpre
+        if abs(fblk) < abs(fcur):
+            xpre, xcur, xblk = xcur, xblk, xcur
+            fpre, fcur, fblk = fcur, fblk, fcur
+
+        delta = (xtol + rtol * abs(xcur)) / 2
+        sbis = (xblk - xcur) / 2
+        if fcur == 0 or abs(sbis) < delta:
+            return xcur
+
+        if abs(spre) > delta and abs(fcur) < abs(fpre):
+            if xpre == xblk:
+                stry = -fcur * (xcur - xpre) / (fcur - fpre) # Secant step
+            else:
+                dpre = (fpre - fcur) / (xpre - xcur)
+                dblk = (fblk - fcur) / (xblk - xcur)
+                stry = -fcur * (fblk * dblk - fpre * dpre) / (dblk * dpre * (fblk - fpre)) # Inverse quadratic step
+            if 2 * abs(stry) < min(abs(spre), 3 * abs(sbis) - delta):
+                spre, scur = scur, stry # Accept interpolation
+            else:
+                spre, scur = sbis, sbis # Fall back to bisection
+        else:
+            spre, scur = sbis, sbis
+
+        xpre, fpre = xcur, fcur
+        xcur += scur if abs(scur) > delta else (delta if sbis > 0 else -delta)
+        fcur = float(f(xcur))
+    return xcur
+
+
+def minimize_scalar_bounded(f, xa, xb, xtol=1e-12, maxiter=200):
+    """Golden-section search for a minimum of f on [xa, xb]. Returns (x_min, f_min)."""
+    inv_phi = (math.sqrt(5) - 1) / 2
+    a, b = float(xa), float(xb)
+    c = b - inv_phi * (b - a)
+    d = a + inv_phi * (b - a)
+    fc, fd = f(c), f(d)
+    for _ in range(maxiter):
+        if abs(b - a) < xtol * (1 + abs(a) + abs(b)):
+            break
+        if fc < fd:
+            b, d, fd = d, c, fc
+            c = b - inv_phi * (b - a)
+            fc = f(c)
+        else:
+            a, c, fc = c, d, fd
+            d = a + inv_phi * (b - a)
+            fd = f(d)
+    x_min = (a + b) / 2
+    return x_min, f(x_min)
+
+
+# --- Vectorized evaluation ---
+
+def real_part_or_nan(values, shape=None, out=None):
+    """
+    Real part of complex evaluation results as floats, with NaN where a value is complex or infinite.
+    Constant results are broadcast to `shape`; with `out` (a float array) the result is written into
+    it instead of a new array.
+    """
+    values = np.asarray(values)
+    if out is None:
+        out = np.empty(values.shape if shape is None else shape)
+    values = np.broadcast_to(values, out.shape) # Constant expressions evaluate to a scalar
+    np.copyto(out, values.real, casting='unsafe')
+    gaps = np.isinf(out)
+    if np.iscomplexobj(values):
+        # Relative tolerance: fused backends can leave rounding noise in the imaginary part
+        gaps |= np.abs(values.imag) > 1e-12 * np.maximum(1.0, np.abs(out))
+    out[gaps] = np.nan
+    return out
+
+
+def lambdify_real(var, expr, backend=None):
+    """
+    Lambdifies expr for NumPy (or another evaluation backend, see utils.backends) and returns
+    a function giving real float arrays: complex results become NaN and infinities become NaN.
+    """
+    func = backends.lambdify(var, expr, backend=backend)
+
+    def evaluate(x_vals):
+        x_arr = np.asarray(x_vals, dtype=float)
+        with np.errstate(all='ignore'):
+            values = func(x_arr.astype(np.complex128))
+        return real_part_or_nan(values, x_arr.shape)
+
+    return evaluate
+
+
+def lambdify_real_many(var, exprs):
+    """
+    Like lambdify_real, but for several expressions compiled into one function
+    (sharing common subexpressions). Returns a function giving a (len(exprs), n) array.
+    """
+    func = sympy.lambdify(var, list(exprs), modules=['numpy'], cse=True)
+
+    def evaluate(x_vals):
+        x_arr = np.asarray(x_vals, dtype=float)
+        with np.errstate(all='ignore'):
+            values = func(x_arr.astype(np.complex128))
+        return np.stack([real_part_or_nan(v, x_arr.shape) for v in values])
+
+    return evaluate
+
+
+def eval_threads():
+    """Threads for chunked grid evaluation: STREAMLIT_MATH_EVAL_THREADS, or the CPU count."""
+    try:
+        return max(1, int(os.environ.get(EVAL_THREADS_ENV, "")))
+    except ValueError:
+        return os.cpu_count() or 1
+
+
+_eval_pool = None
+_eval_pool_lock = threading.Lock()
+
+
+def get_eval_pool():
+    """The shared thread pool for grid evaluation, created on first use."""
+    global _eval_pool
+    with _eval_pool_lock:
+        if _eval_pool is None:
+            _eval_pool = ThreadPoolExecutor(max_workers=eval_threads(), thread_name_prefix="grid-eval")
+        return _eval_pool
+
+
+def evaluate_chunked(func, x_vals, *args, chunk_size=CHUNK_SIZE, threads=None):
+    """
+    Evaluates a NumPy-lambdified func(x, *args) over a 1-D grid (on complex input, like the plots)
+    and returns real floats, NaN where the result is complex or infinite.
+    Large grids are split into blocks evaluated on a shared thread pool (NumPy ufuncs release
+    the GIL); each block writes into its slice of one preallocated output array and is masked
+    in place, so no full-size temporaries are created.
+    threads=1 evaluates the blocks sequentially on the calling thread.
+    """
+    x_vals = np.asarray(x_vals, dtype=float)
+    out = np.empty(x_vals.shape)
+
+    def evaluate_block(start, stop):
+        with np.errstate(all='ignore'):
+            block = np.asarray(func(x_vals[start:stop].astype(np.complex128), *args))
+        real_part_or_nan(block, out=out[start:stop])
+
+    total = len(x_vals)
+    if total <= PARALLEL_THRESHOLD:
+        evaluate_block(0, total)
+        return out
+    starts = range(0, total, chunk_size)
+    if (threads or eval_threads()) == 1:
+        for start in starts:
+            evaluate_block(start, min(start + chunk_size, total))
+    else:
+        # list() waits for every block and re-raises the first evaluation error
+        list(get_eval_pool().map(lambda start: evaluate_block(start, min(start + chunk_size, total)), starts))
+    return out
+
+
+def dedupe_sorted(values, tol):
+    """Merges sorted values closer than tol (relative to magnitude)."""
+    merged = []
+    for v in values:
+        if merged and abs(v - merged[-1]) <= tol * (1 + abs(v)):
+            continue
+        merged.append(v)
+    return merged
+
+
+def refine_roots_on_grid(f_scalar, x_vals, y_vals, touch_tol=1e-9, touching=True):
+    """
+    Finds roots from samples (x_vals, y_vals) of a function:
+    - sign changes between neighbours are refined with Brent's method;
+    - local minima of |f| without a sign change (touching roots such as sin(x) = 1)
+      are refined with a bounded minimization and kept if |f| is (numerically) zero.
+      Pass touching=False to only report sign changes.
+    Brackets that straddle a pole (|f| large at the refined point) are discarded.
+    Touching (even-multiplicity) roots are only accurate to about sqrt(machine epsilon).
+    """
+    finite = np.isfinite(y_vals)
+    scale = np.nanmax(np.abs(y_vals[finite])) if finite.any() else 1.0
+    scale = max(scale, 1.0)
+    roots = []
+    if touching:
+        roots.extend(x_vals[finite & (y_vals == 0)])
+        # Endpoints can't be bracketed or be interior minima, e.g. sin(x) at x = 2*pi (float).
+        # The neighbour must be much larger, so a function decaying towards 0 (exp(-x**2)) doesn't count.
+        for i, j in ((0, 1), (len(y_vals) - 1, len(y_vals) - 2)):
+            if (j >= 0 and finite[i] and finite[j] and abs(y_vals[i]) <= touch_tol * scale
+                    and abs(y_vals[i]) <= 1e-3 * abs(y_vals[j])):
+                roots.append(x_vals[i])
+    else:
+        # Exact zeros only count where the sign changes across them
+        for i in np.nonzero(finite & (y_vals == 0))[0]:
+            if 0 < i < len(y_vals) - 1 and y_vals[i - 1] * y_vals[i + 1] < 0:
+                roots.append(x_vals[i])
+
+    y_left, y_right = y_vals[:-1], y_vals[1:]
+    both_finite = finite[:-1] & finite[1:]
+    brackets = np.nonzero(both_finite & (np.sign(y_left) * np.sign(y_right) < 0))[0]
+    for i in brackets:
+        try:
+            root = brentq(f_scalar, x_vals[i], x_vals[i + 1])
+        except (ValueError, ZeroDivisionError, FloatingPointError):
+            continue
+        value = f_scalar(root)
+        # A sign change across a pole (e.g. tan at pi/2) refines to a huge |f|
+        if np.isfinite(value) and abs(value) <= 1e-6 * scale:
+            roots.append(root)
+
+    if touching and len(y_vals) >= 3:
+        abs_y = np.abs(y_vals)
+        mid = abs_y[1:-1]
+        is_min = (finite[1:-1] & finite[:-2] & finite[2:] & (mid <= abs_y[:-2]) & (mid <= abs_y[2:])
+                  & ((mid < abs_y[:-2]) | (mid < abs_y[2:])) & (mid > 0)) # Strict on one side: skip plateaus
+        # No sign change around the minimum (those were handled by brackets)
+        same_sign = (np.sign(y_vals[:-2]) == np.sign(y_vals[1:-1])) & (np.sign(y_vals[1:-1]) == np.sign(y_vals[2:]))
+        for j in np.nonzero(is_min & same_sign)[0] + 1:
+            x_min, f_min = minimize_scalar_bounded(lambda v: abs(f_scalar(v)), x_vals[j - 1], x_vals[j + 1])
+            if np.isfinite(f_min) and f_min <= touch_tol * scale:
+                roots.append(x_min)
+
+    step = abs(x_vals[1] - x_vals[0]) if len(x_vals) > 1 else 1.0
+    return dedupe_sorted(sorted(float(r) for r in roots), tol=max(1e-9, 1e-6 * step))
+
+
+@instrumented
+def find_roots_numeric(expr, var, lower, upper, points=4000):
+    """
+    Finds all real roots of expr (or of lhs - rhs for an Eq) in [lower, upper] numerically.
+    One vectorized pass over a grid locates sign changes and near-zero minima, each of which
+    is refined with Brent's method. Returns (sorted list of roots, error message).
+    """
+    try:
+        if isinstance(expr, sympy.Equality):
+            expr = expr.lhs - expr.rhs
+        if var not in expr.free_symbols:
+            return None, f"Equation does not depend on {var}."
+        if len(expr.free_symbols) > 1:
+            others = ", ".join(sorted(str(s) for s in expr.free_symbols - {var}))
+            return None, f"Numeric solving needs a single variable (also found: {others})."
+
+        lower, upper = float(lower), float(upper)
+        f_vec = lambdify_real(var, expr)
+        f_scalar = lambda v: float(f_vec(np.array([v]))[0])
+
+        x_vals = np.linspace(lower, upper, points)
+        y_vals = f_vec(x_vals)
+        return refine_roots_on_grid(f_scalar, x_vals, y_vals), None
+    except Exception as e:
+        return None, f"Could not solve numerically: {e}"
+
+
+def _corners(f_scalar, d1_scalar, x_vals, y_vals, d1_vals):
+    """
+    Points where f' jumps across 0 while f stays bounded (abs(x) at 0), which refine_roots_on_grid
+    discards as poles of f'. Returns their x positions, located with Brent's method on f'.
+    """
+    finite = np.isfinite(y_vals) & np.isfinite(d1_vals)
+    scale = max(np.nanmax(np.abs(y_vals[finite])), 1.0) if finite.any() else 1.0
+    corners = []
+    for i in np.nonzero(finite[:-1] & finite[1:] & (np.sign(d1_vals[:-1]) * np.sign(d1_vals[1:]) < 0))[0]:
+        try:
+            x0 = brentq(d1_scalar, x_vals[i], x_vals[i + 1])
+        except (ValueError, ZeroDivisionError, FloatingPointError):
+            continue
+        slope = d1_scalar(x0)
+        # Not a zero of f' (those are refined elsewhere), and f bounded there (not a pole like 1/x**2)
+        if not (np.isfinite(slope) and abs(slope) <= 1e-6 * max(1.0, np.nanmax(np.abs(d1_vals[finite])))):
+            value = f_scalar(x0)
+            if np.isfinite(value) and abs(value) <= 10 * scale:
+                corners.append(float(x0))
+    return corners
+
+
+def _extremum_kind(d1_scalar, d2_scalar, x0, step):
+    """
+    'min', 'max' or 'stationary' for a critical point x0, from the signs of f' a step either side.
+    The sign of f'' only decides when f' vanishes or is undefined on a side.
+    """
+    left, right = d1_scalar(x0 - step), d1_scalar(x0 + step)
+    if left < 0 < right:
+        return "min"
+    if left > 0 > right:
+        return "max"
+    if left * right > 0: # No sign change, e.g. x**3 at 0
+        return "stationary"
+    curvature = d2_scalar(x0)
+    return "min" if curvature > 1e-9 else "max" if curvature < -1e-9 else "stationary"
+
+
+@instrumented
+def analyze_function(expr, var, lower, upper, points=500):
+    """
+    Locates the roots, critical points and inflection points of expr on [lower, upper].
+    f, f' and f'' are compiled together and evaluated on the plotting grid in one batched
+    pass; each candidate is then refined with Brent's method on that grid's brackets.
+    Returns (analysis dict, error message). The dict holds the function and its derivatives
+    (in terms of 'variable', a real symbol of the same name) and lists of
+    (x, f(x)) for 'roots' and 'inflection_points', and (x, f(x), kind) for 'critical_points'
+    with kind 'min', 'max' or 'stationary'.
+    """
+    try:
+        if var not in expr.free_symbols:
+            return None, f"Expression does not depend on {var}."
+        if len(expr.free_symbols) > 1:
+            others = ", ".join(sorted(str(s) for s in expr.free_symbols - {var}))
+            return None, f"Analysis needs a single variable (also found: {others})."
+
+        # A real symbol keeps derivatives such as that of Abs(x) in closed form
+        real_var = sympy.Symbol(var.name, real=True)
+        expr = expr.subs(var, real_var)
+        var = real_var
+
+        # DiracDelta terms (e.g. from Abs) vanish away from isolated points and can't be lambdified
+        no_delta = lambda e: e.replace(sympy.DiracDelta, lambda *args: sympy.S.Zero)
+        first = no_delta(sympy.diff(expr, var))
+        second = no_delta(sympy.diff(first, var))
+        evaluate = lambdify_real_many(var, (expr, first, second))
+        scalar = lambda i: (lambda v: float(evaluate(np.array([v]))[i][0]))
+        f_scalar, d1_scalar, d2_scalar = scalar(0), scalar(1), scalar(2)
+
+        x_vals = np.linspace(float(lower), float(upper), points)
+        y_vals, d1_vals, d2_vals = evaluate(x_vals)
+
+        roots = refine_roots_on_grid(f_scalar, x_vals, y_vals)
+
+        critical_points = []
+        if not first.is_number: # f' constant: no isolated critical points
+            candidates = refine_roots_on_grid(d1_scalar, x_vals, d1_vals) + _corners(f_scalar, d1_scalar, x_vals, y_vals, d1_vals)
+            step = (x_vals[1] - x_vals[0]) / 2
+            for x0 in dedupe_sorted(sorted(candidates), tol=1e-9):
+                critical_points.append((x0, f_scalar(x0), _extremum_kind(d1_scalar, d2_scalar, x0, step)))
+
+        # Inflection points need f'' to change sign (x**4 has f''(0) = 0 but none)
+        inflection_points = []
+        if not second.is_number:
+            inflection_points = [(x0, f_scalar(x0)) for x0 in refine_roots_on_grid(d2_scalar, x_vals, d2_vals, touching=False)]
+
+        return {
+            "variable": var,
+            "function": expr,
+            "derivative": first,
+            "second_derivative": second,
+            "roots": [(x0, f_scalar(x0)) for x0 in roots],
+            "critical_points": [p for p in critical_points if np.isfinite(p[1])],
+            "inflection_points": [p for p in inflection_points if np.isfinite(p[1])],
+        }, None
+    except Exception as e:
+        return None, f"Could not analyze function: {e}"
+
+
+# --- Quick numeric estimates (previews shown while the exact result is computed) ---
+
+def _real_mpf(value):
+    """Returns value as a real mpf, or None if it is complex or not finite."""
+    value = mpmath.mpmathify(value)
+    if isinstance(value, mpmath.mpc):
+        if abs(value.imag) > 1e-12 * max(1, abs(value.real)):
+            return None
+        value = value.real
+    return value if mpmath.isfinite(value) else None
+
+
+LIMIT_SAMPLES = 14 # Samples per side, at t = 2**-4 ... 2**-17 from the point (or x = 1/t towards oo)
+CHECK_DROP = 2 # The error estimate compares with the extrapolation of all but the last CHECK_DROP samples
+
+
+class LimitEstimate(NamedTuple):
+    """
+    A numeric limit estimate. `value` is the limit, or None when the one-sided estimates differ
+    (`left`/`right` then hold them). `confidence` is 'high', 'medium' or 'low', `error` the
+    estimated absolute error, and `method` the extrapolation that produced the value.
+    """
+    value: Optional[float]
+    confidence: str
+    left: Optional[float]
+    right: Optional[float]
+    error: float
+    method: str
+
+
+# Relative error thresholds for the confidence levels
+CONFIDENCE_LEVELS = (("high", 1e-10), ("medium", 1e-6), ("low", 1e-3))
+CONFIDENCE_RANK = {"high": 2, "medium": 1, "low": 0}
+
+
+def _richardson(samples):
+    """
+    Richardson extrapolation of samples at t = 2**-k, assuming an error expansion in integer
+    powers of t. Returns (estimate, error estimate) from the table's diagonal.
+    """
+    table = [samples[0]]  # Current row of the Richardson table
+    diagonal = [samples[0]]
+    for i in range(1, len(samples)):
+        row = [samples[i]]
+        for j in range(1, i + 1):
+            factor = mpmath.mpf(2) ** j
+            row.append((factor * row[j - 1] - table[j - 1]) / (factor - 1))
+        table = row
+        diagonal.append(row[-1])
+    # The last step must be small, and the one before it not much larger
+    return diagonal[-1], max(abs(diagonal[-1] - diagonal[-2]), abs(diagonal[-2] - diagonal[-3]) / 100)
+
+
+def _wynn_epsilon(samples):
+    """
+    Wynn's epsilon algorithm: accelerates sequences whose error behaves like a sum of geometric
+    terms, which on t = 2**-k samples covers fractional powers (sqrt(t)) and alternating
+    signs that Richardson's integer powers miss. Returns (estimate, error estimate) from the even
+    column whose last two entries agree best.
+    """
+    best = (samples[-1], abs(samples[-1] - samples[-2]))
+    previous, current = [mpmath.mpf(0)] * (len(samples) + 1), list(samples)
+    for k in range(1, len(samples)):
+        differences = [current[i + 1] - current[i] for i in range(len(current) - 1)]
+        if any(d == 0 for d in differences):
+            break # Converged exactly (or stalled): the table can't go further
+        previous, current = current, [previous[i + 1] + 1 / d for i, d in enumerate(differences)]
+        if k % 2 == 0 and len(current) >= 2:
+            error = abs(current[-1] - current[-2])
+            if error < best[1]:
+                best = (current[-1], error)
+    return best
+
+
+def _extrapolate_one_side(g, steps=LIMIT_SAMPLES):
+    """
+    Estimates lim g(t) as t -> 0+ from samples at t = 2**-4 ... 2**-(steps+3) with Richardson and
+    Wynn extrapolation, whichever settles better. The chosen method is repeated one order lower,
+    without the last CHECK_DROP samples, and the error is at least the difference: an
+    extrapolation that fits the samples without matching the function's error terms (t*log(t),
+    logarithms towards oo) keeps moving between orders. Returns (estimate, error, method,
+    confidence), or None if neither settles or the samples don't approach the estimate
+    (divergent or oscillating functions).
+    """
+    samples = []
+    for k in range(4, 4 + steps):
+        value = _real_mpf(g(mpmath.mpf(2) ** -k))
+        if value is None:
+            return None
+        samples.append(value)
+
+    estimate, error, method = min([(*_richardson(samples), "richardson"), (*_wynn_epsilon(samples), "wynn")], key=lambda c: c[1])
+    lower_order, _ = (_richardson if method == "richardson" else _wynn_epsilon)(samples[:-CHECK_DROP])
+    error = max(error, abs(estimate - lower_order))
+    scale = max(1, abs(estimate))
+    approaching = abs(samples[-1] - estimate) < abs(samples[0] - estimate) or abs(samples[-1] - estimate) <= 1e-9 * scale
+    confidence = next((level for level, tol in CONFIDENCE_LEVELS if error <= tol * scale), None)
+    if not approaching or confidence is None:
+        return None
+    return estimate, error, method, confidence
+
+
+def _snap(value):
+    """float(value), with the ~1e-25 noise extrapolation leaves at zero limits removed."""
+    return 0.0 if abs(value) < 1e-15 else float(value)
+
+
+@instrumented
+def estimate_limit(expr, var, point, dir='+'):
+    """
+    Numeric estimate of a limit by Richardson and Wynn extrapolation of samples approaching the
+    point along a geometric sequence, from each side requested (dir is '+', '-' or '+-').
+    Returns (LimitEstimate, None), or (None, error message) when no side gives an estimate.
+    """
+    try:
+        if var not in expr.free_symbols:
+            return None, "Expression does not depend on the variable."
+        if len(expr.free_symbols) > 1:
+            return None, "Numeric estimate needs a single variable."
+        f = sympy.lambdify(var, expr, modules=['mpmath'])
+        infinite = point in (sympy.oo, -sympy.oo)
+        if not infinite and not point.is_number:
+            return None, "Numeric estimate needs a numeric point."
+
+        with mpmath.workdps(30): # Extra digits: samples close to the point cancel heavily
+            if infinite:
+                sign = 1 if point == sympy.oo else -1
+                # Towards +oo the samples lie to the left of "infinity", towards -oo to the right
+                sides = {('-' if sign > 0 else '+'): _extrapolate_one_side(lambda t: f(sign / t))}
+            else:
+                p = mpmath.mpf(sympy.N(point, 30))
+                sides = {side: _extrapolate_one_side(lambda t, s=s: f(p + s * t))
+                         for side, s in (('+', 1), ('-', -1)) if side in dir}
+
+        if any(e is None for e in sides.values()):
+            return None, "No numeric estimate (the function may diverge or oscillate)."
+        right, left = sides.get('+'), sides.get('-')
+        estimates = [e for e in (right, left) if e is not None]
+        confidence = min((e[3] for e in estimates), key=CONFIDENCE_RANK.get)
+        error = max(e[1] for e in estimates)
+        estimate = estimates[0]
+        value = estimate[0]
+        if len(estimates) == 2:
+            scale = max(1, abs(right[0]))
+            if abs(right[0] - left[0]) > max(10 * error, 1e-6 * scale):
+                value = None # The one-sided limits differ: no two-sided limit
+            elif right[1] > left[1]:
+                estimate = left # The better-converged side
+                value = left[0]
+        return LimitEstimate(None if value is None else _snap(value), confidence,
+                             None if left is None else _snap(left[0]), None if right is None else _snap(right[0]),
+                             float(error), estimate[2]), None
+    except Exception as e:
+        return None, f"No numeric estimate: {str(e) or type(e).__name__}"
+
+
+@instrumented
+def estimate_integral(expr, var, lower, upper):
+    """
+    Numeric estimate of a definite integral with adaptive (tanh-sinh) quadrature, which also
+    copes with integrable endpoint singularities and infinite bounds.
+    Returns ((estimate, error estimate), error message).
+    """
+    try:
+        if len(expr.free_symbols - {var}) > 0:
+            return None, "Numeric estimate needs a single variable."
+        bounds = []
+        for bound in (lower, upper):
+            if bound in (sympy.oo, -sympy.oo):
+                bounds.append(mpmath.inf if bound == sympy.oo else -mpmath.inf)
+            elif bound.is_number:
+                bounds.append(mpmath.mpf(sympy.N(bound, 20)))
+            else:
+                return None, "Numeric estimate needs numeric bounds."
+        f = sympy.lambdify(var, expr, modules=['mpmath'])
+        # Extra digits: near an endpoint singularity (1/sqrt(x)) the nodes' values lose precision,
+        # and at working precision quad's error estimate understates the actual error
+        with mpmath.workdps(30):
+            value, error = mpmath.quad(f, bounds, error=True)
+        value = _real_mpf(value)
+        if value is None:
+            return None, "No numeric estimate (the integrand is complex or unbounded)."
+        if error > 1e-6 * max(1, abs(value)):
+            return None, "Quadrature did not converge (the integral may diverge or oscillate)."
+        return (float(value), float(error)), None
+    except Exception as e:
+        return None, f"No numeric estimate: {str(e) or type(e).__name__}"
+
+
+# --- Riemann sums and quadrature rules ---
+
+RIEMANN_RULES = ("left", "right", "midpoint", "trapezoid", "simpson")
+RIEMANN_MAX_EXPONENT = 20 # Up to n = 2**20 subintervals: one 2**21 + 1 point evaluation
+
+
+@functools.lru_cache(maxsize=2) # 16 MiB per grid at the default size
+def _integrand_grid(expr, var, lower, upper, intervals):
+    """
+    f at the 2*intervals + 1 equally spaced points of [lower, upper] (the endpoints and midpoints
+    of the finest subdivision), read-only. Cached: every coarser rule is a strided view of it.
+    """
+    x_vals = np.linspace(lower, upper, 2 * intervals + 1)
+    values = evaluate_chunked(backends.lambdify(var, expr), x_vals)
+    values.setflags(write=False)
+    return values
+
+
+@instrumented
+def riemann_sums(expr, var, lower, upper, max_exponent=RIEMANN_MAX_EXPONENT):
+    """
+    Left, right, midpoint, trapezoid and Simpson approximations of the integral of expr over
+    [lower, upper] for n = 1, 2, 4, ..., 2**max_exponent subintervals.
+    The integrand is evaluated once, on the finest grid; the points of a coarser subdivision are
+    every step-th sample of it, so each sum is taken over a strided view without copying.
+    Returns ({"n": [...], rule: [...] for each rule}, None); a sum touching a point where f is
+    undefined is NaN.
+    """
+    try:
+        if len(expr.free_symbols - {var}) > 0:
+            return None, "Riemann sums need a single variable."
+        lower, upper = float(lower), float(upper)
+        if not (np.isfinite(lower) and np.isfinite(upper)) or lower == upper:
+            return None, "Riemann sums need distinct, finite bounds."
+        finest = 2 ** max_exponent
+        values = _integrand_grid(expr, var, lower, upper, finest)
+
+        table = {"n": [], **{rule: [] for rule in RIEMANN_RULES}}
+        for k in range(max_exponent + 1):
+            n = 2 ** k
+            step = 2 * finest // n # Grid points per subinterval
+            h = (upper - lower) / n
+            endpoints = values[::step] # n + 1 views into the cached grid
+            left = h * endpoints[:-1].sum()
+            right = h * endpoints[1:].sum()
+            midpoint = h * values[step // 2::step].sum()
+            trapezoid = (left + right) / 2
+            table["n"].append(n)
+            table["left"].append(left)
+            table["right"].append(right)
+            table["midpoint"].append(midpoint)
+            table["trapezoid"].append(trapezoid)
+            # Simpson's rule on each subinterval with its midpoint: (T + 2M)/3
+            table["simpson"].append((trapezoid + 2 * midpoint) / 3)
+        return table, None
+    except Exception as e:
+        return None, f"Could not compute Riemann sums: {str(e) or type(e).__name__}"
+
+
+@instrumented
+def estimate_series_sum(term, var, start=1, partial_terms=1000):
+    """
+    Numeric estimate of sum(term, (var, start, oo)) with convergence acceleration (mpmath.nsum).
+    Partial sums are checked first: if their increments over successive doublings don't shrink,
+    the series is reported as apparently divergent instead of being "summed".
+    Returns (float estimate, error message).
+    """
+    try:
+        if len(term.free_symbols - {var}) > 0:
+            return None, "Numeric estimate needs a single variable."
+        terms = lambdify_real(var, term)(np.arange(start, start + 4 * partial_terms, dtype=float))
+        if not np.all(np.isfinite(terms)):
+            return None, "No numeric estimate (some terms are not finite)."
+        partial = np.cumsum(terms)
+        first = partial[2 * partial_terms - 1] - partial[partial_terms - 1]
+        second = partial[4 * partial_terms - 1] - partial[2 * partial_terms - 1]
+        if abs(first) > 1e-12 and abs(second) > 0.9 * abs(first):
+            return None, "Partial sums are still growing; no reliable numeric estimate."
+
+        f = sympy.lambdify(var, term, modules=['mpmath'])
+        value = _real_mpf(mpmath.nsum(f, [start, mpmath.inf]))
+        if value is None:
+            return None, "No numeric estimate."
+        return float(value), None
+    except Exception as e:
+        return None, f"No numeric estimate: {str(e) or type(e).__name__}"
@@ -0,0 +1,120 @@
+"""
+Pure expression parsing core.
+
+Nothing here touches Streamlit, so it is safe to call from worker processes,
+background threads and batch jobs. Errors come back as data (ParseResult /
+ParseError) instead of being displayed; utils.helpers.parse_expression is the
+thin Streamlit-facing wrapper.
+"""
+from tokenize import TokenError
+from typing import NamedTuple, Optional
+
+import sympy
+from sympy.parsing.sympy_parser import parse_expr, standard_transformations, implicit_multiplication_application, convert_xor
+
+# Define common symbols
+x, y, z, t, theta = sympy.symbols('x y z t theta')
+a, b, c, k = sympy.symbols('a b c k') # Common constants or variables
+
+# Add more symbols as needed
+default_symbols = {
+    'x': x, 'y': y, 'z': z, 't': t, 'theta': theta,
+    'a': a, 'b': b, 'c': c, 'k': k,
+    'sin': sympy.sin, 'cos': sympy.cos, 'tan': sympy.tan,
+    'csc': sympy.csc, 'sec': sympy.sec, 'cot': sympy.cot,
+    'asin': sympy.asin, 'acos': sympy.acos, 'atan': sympy.atan,
+    'log': sympy.log, 'ln': sympy.ln, 'exp': sympy.exp,
+    'sqrt': sympy.sqrt, 'pi': sympy.pi, 'e': sympy.E, 'I': sympy.I
+}
+
+TRANSFORMATIONS = standard_transformations + (convert_xor, implicit_multiplication_application) # '^' is a power, as in the examples
+
+# Error kinds
+EMPTY = "empty"
+SYNTAX = "syntax"
+TYPE = "type"
+VALUE = "value"
+NAME = "name"
+UNEXPECTED = "unexpected"
+
+
+class ParseError(NamedTuple):
+    """A parsing failure. `position` is a 0-based offset into the input when it can be located."""
+    kind: str
+    message: str
+    position: Optional[int] = None
+
+
+class ParseResult(NamedTuple):
+    """Either a parsed expression or a ParseError (never both)."""
+    expr: Optional[sympy.Basic]
+    error: Optional[ParseError]
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _locate_syntax_error(expr_str):
+    """
+    Finds the offset of a syntax error in the user's input.
+    SymPy reports offsets into its transformed code, so the input is re-checked directly:
+    first for unbalanced brackets, then with Python's own parser.
+    """
+    pairs = {')': '(', ']': '[', '}': '{'}
+    stack = []
+    for i, ch in enumerate(expr_str):
+        if ch in '([{':
+            stack.append((ch, i))
+        elif ch in pairs:
+            if not stack or stack[-1][0] != pairs[ch]:
+                return i # Unmatched closing bracket
+            stack.pop()
+    if stack:
+        return stack[-1][1] # Unclosed opening bracket
+
+    try:
+        compile(expr_str, '<input>', 'eval')
+    except SyntaxError as e:
+        try:
+            compile(expr_str + " 0", '<input>', 'eval')
+            return len(expr_str.rstrip()) # Incomplete input, e.g. a trailing operator
+        except SyntaxError:
+            pass
+        if e.offset is not None:
+            return min(max(e.offset - 1, 0), len(expr_str))
+    return None
+
+
+def parse(expr_str: str, local_dict=None):
+    """
+    Parses a string into a SymPy expression.
+    Includes standard transformations, implicit multiplication and '^' as a power.
+    Returns a ParseResult; never raises for bad input.
+    """
+    if local_dict is None:
+        local_dict = default_symbols
+
+    if not expr_str or not expr_str.strip():
+        return ParseResult(None, ParseError(EMPTY, "Input expression cannot be empty."))
+    try:
+        return ParseResult(parse_expr(expr_str, local_dict=local_dict, transformations=TRANSFORMATIONS), None)
+    except (SyntaxError, TokenError) as e:
+        position = _locate_syntax_error(expr_str)
+        detail = "unbalanced brackets" if isinstance(e, TokenError) else e.msg
+        return ParseResult(None, ParseError(SYNTAX, f"Invalid expression: {detail}", position))
+    except TypeError as e:
+        return ParseResult(None, ParseError(TYPE, f"Invalid expression: {e}"))
+    except ValueError as e:
+        return ParseResult(None, ParseError(VALUE, f"Invalid expression: {e}"))
+    except NameError as e:
+        return ParseResult(None, ParseError(NAME, f"Invalid expression: {e}"))
+    except Exception as e:
+        return ParseResult(None, ParseError(UNEXPECTED, f"An unexpected parsing error occurred: {e}"))
+
+
+def format_error_location(expr_str, error):
+    """Returns the input with a caret under the error position, or None if the position is unknown."""
+    if error is None or error.position is None:
+        return None
+    return f"{expr_str}\n{' ' * error.position}^"
@@ -0,0 +1,183 @@
+"""
+Cost-based strategy planner for symbolic operations.
+
+Inspects the parsed expression (polynomial? rational? only exp/log? only trig?)
+and tries the cheapest routine that can give a complete answer before falling
+back to the general SymPy routine:
+
+    result, strategy = planner.integrate(expr, x)
+    result, strategy = planner.limit(expr, x, 0, '+')
+    result, strategy = planner.simplify(expr)
+
+Every attempt is timed as 'planner.<operation>.<strategy>' and the strategy that
+produced the answer is counted as 'planner.<operation>.won.<strategy>', so the
+rules can be tuned from the admin view or the Prometheus export.
+"""
+import sympy
+from sympy.core.function import AppliedUndef
+from sympy.integrals.rationaltools import ratint
+from sympy.integrals.risch import risch_integrate, NonElementaryIntegral
+from sympy.series.gruntz import gruntz
+
+from .metrics import increment, timed
+
+# Functions whose value at a point isn't necessarily the limit there
+DISCONTINUOUS = (sympy.floor, sympy.ceiling, sympy.sign, sympy.Heaviside, sympy.Piecewise,
+                 sympy.frac, sympy.DiracDelta, sympy.re, sympy.im, sympy.arg,
+                 sympy.acot) # acot jumps from -pi/2 to pi/2 at 0
+TRIG_FUNCTIONS = (sympy.sin, sympy.cos, sympy.tan, sympy.csc, sympy.sec, sympy.cot)
+
+
+def run_plan(operation, strategies):
+    """
+    Tries (name, attempt) strategies in order; an attempt returns None when it doesn't apply
+    or can't give a complete answer. Returns (result, name of the strategy that produced it).
+    The last strategy should be the general routine: its errors propagate, while a failing
+    shortcut just hands over to the next strategy.
+    """
+    for index, (name, attempt) in enumerate(strategies):
+        with timed(f"planner.{operation}.{name}"):
+            try:
+                result = attempt()
+            except Exception:
+                if index == len(strategies) - 1:
+                    raise
+                result = None
+        if result is not None:
+            increment(f"planner.{operation}.won.{name}")
+            return result, name
+    raise ValueError(f"No strategy could compute {operation}.")
+
+
+def _function_types(expr):
+    return {type(f) for f in expr.atoms(sympy.Function)}
+
+
+def _only_functions(expr, allowed):
+    return all(issubclass(f, allowed) for f in _function_types(expr))
+
+
+# --- Integration ---
+
+def integrate(expr, var, lower=None, upper=None):
+    """Indefinite integral, or definite when both bounds are given. Returns (result, strategy)."""
+    definite = lower is not None and upper is not None
+    single_variable = expr.free_symbols <= {var}
+
+    def polynomial():
+        if not expr.is_polynomial(var):
+            return None
+        antiderivative = sympy.Poly(expr, var).integrate().as_expr()
+        if not definite:
+            return antiderivative
+        if not (lower.is_finite and upper.is_finite):
+            return None # Improper: leave divergence handling to integrate
+        return sympy.expand(antiderivative.subs(var, upper) - antiderivative.subs(var, lower))
+
+    def rational():
+        # Indefinite only: a definite integral would need the poles located first
+        if definite or not single_variable or not expr.is_rational_function(var):
+            return None
+        return ratint(expr, var)
+
+    def risch():
+        # Decides elementary integrability of exp/log integrands outright
+        if definite or not single_variable or not _only_functions(expr, (sympy.exp, sympy.log)):
+            return None
+        if any(not p.exp.is_Integer for p in expr.atoms(sympy.Pow) if p.base.has(var)):
+            return None # Algebraic extensions (roots) aren't supported
+        result = risch_integrate(expr, var)
+        if isinstance(result, NonElementaryIntegral) or result.has(sympy.Integral):
+            return None # No elementary antiderivative; integrate may still find a special-function one
+        return result
+
+    def general():
+        return sympy.integrate(expr, (var, lower, upper)) if definite else sympy.integrate(expr, var)
+
+    return run_plan("integrate", [("poly", polynomial), ("ratint", rational), ("risch", risch), ("integrate", general)])
+
+
+# --- Limits ---
+
+def limit(expr, var, point, dir='+'):
+    """Limit of expr as var -> point from dir ('+', '-' or '+-'). Returns (result, strategy)."""
+    infinite_point = point in (sympy.oo, -sympy.oo)
+    rational_function = expr.is_rational_function(var)
+
+    def substitution():
+        # Continuous at a finite point: the limit is the value there
+        if infinite_point or expr.has(*DISCONTINUOUS) or expr.atoms(AppliedUndef):
+            return None
+        # A singular argument makes even a bounded function (atan(1/x) at 0) take different one-sided limits
+        arguments = [a for f in expr.atoms(sympy.Function, sympy.Pow) for a in f.args if a.has(var)]
+        if any(not a.subs(var, point).is_finite for a in arguments):
+            return None
+        value = expr.subs(var, point)
+        if value.has(sympy.nan, sympy.zoo, sympy.oo, -sympy.oo, sympy.AccumBounds) or not value.is_finite:
+            return None
+        if not value.is_real and value.free_symbols == set():
+            return None # e.g. sqrt(x) at a negative point: not a real-valued neighbourhood
+        return value
+
+    def cancelled():
+        # Removable singularity of a rational function, e.g. (x**2 - 1)/(x - 1) at 1
+        if infinite_point or not rational_function:
+            return None
+        value = sympy.cancel(expr).subs(var, point)
+        if value.has(sympy.nan, sympy.zoo, sympy.oo, -sympy.oo) or not value.is_finite:
+            return None
+        return value
+
+    def leading_terms():
+        # Rational function at infinity: compare degrees of numerator and denominator
+        if not infinite_point or not rational_function:
+            return None
+        numerator, denominator = sympy.fraction(sympy.cancel(expr))
+        num_poly, den_poly = sympy.Poly(numerator, var), sympy.Poly(denominator, var)
+        if num_poly.degree() < den_poly.degree():
+            return sympy.S.Zero
+        if num_poly.degree() == den_poly.degree():
+            return sympy.simplify(num_poly.LC() / den_poly.LC())
+        return None # Diverges; the sign needs the general routine
+
+    def gruntz_at_infinity():
+        # The heuristics in sympy.limit add little for exp/log expressions at infinity
+        if not infinite_point or not _only_functions(expr, (sympy.exp, sympy.log)):
+            return None
+        return gruntz(expr, var, point)
+
+    def general():
+        return sympy.limit(expr, var, point, dir=dir)
+
+    return run_plan("limit", [("substitution", substitution), ("cancel", cancelled),
+                              ("leading_terms", leading_terms), ("gruntz", gruntz_at_infinity), ("limit", general)])
+
+
+# --- Simplification ---
+
+def simplify(expr):
+    """Simplified form of expr. Returns (result, strategy)."""
+    simpler = lambda *candidates: min(candidates, key=sympy.count_ops)
+
+    def polynomial():
+        if not isinstance(expr, sympy.Expr) or not expr.is_polynomial():
+            return None
+        return simpler(sympy.expand(expr), sympy.factor(expr))
+
+    def rational():
+        if not isinstance(expr, sympy.Expr) or not expr.is_rational_function():
+            return None
+        cancelled = sympy.cancel(expr)
+        return simpler(cancelled, sympy.factor(cancelled))
+
+    def trig():
+        # Only accepted when it helps; otherwise the general simplify gets a go
+        if not _function_types(expr) or not _only_functions(expr, TRIG_FUNCTIONS):
+            return None
+        result = sympy.trigsimp(expr)
+        return result if sympy.count_ops(result) < sympy.count_ops(expr) else None
+
+    def general():
+        return sympy.simplify(expr)
+
+    return run_plan("simplify", [("poly", polynomial), ("rational", rational), ("trigsimp", trig), ("simplify", general)])
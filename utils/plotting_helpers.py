@@ -1,14 +1,28 @@
+import functools
+import re
+import plotly.colors
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import numpy as np
 import sympy
 import math
-from .helpers import parse_expression, default_symbols # Import parser and default symbols
-
-def plot_function(expr_str: str, var_str: str = 'x', min_val: float = -10, max_val: float = 10, points: int = 500):
-    """Plots a 1-variable function using Plotly."""
-    expr = parse_expression(expr_str)
+from .helpers import try_parse_expression, default_symbols # Import parser and default symbols
+from .metrics import instrumented, timed
+from .trig_helpers import REFERENCE_ANGLES
+from .numeric_helpers import evaluate_chunked, real_part_or_nan, eval_threads, get_eval_pool
+from .geometry_helpers import great_circle_paths
+from .implicit import implicit_curve
+from . import backends
+
+@instrumented
+def plot_function(expr_str: str, var_str: str = 'x', min_val: float = -10, max_val: float = 10, points: int = 500, backend: str = None):
+    """
+    Plots a 1-variable function using Plotly. Safe to call off the script thread (no Streamlit output).
+    backend selects the evaluation backend (see utils.backends; default from STREAMLIT_MATH_EVAL_BACKEND).
+    """
+    expr, parse_error = try_parse_expression(expr_str)
     if expr is None:
-        return go.Figure(), "Parsing Error: Could not parse the function."
+        return go.Figure(), f"Parsing Error: {parse_error}"
 
     try:
         var = sympy.symbols(var_str)
@@ -22,38 +36,298 @@ def plot_function(expr_str: str, var_str: str = 'x', min_val: float = -10, max_v
                 return go.Figure(), f"Expression '{expr}' does not seem to depend on variable '{var}'."
         else:
              # Lambdify the expression for numerical evaluation
-             func = sympy.lambdify(var, expr, modules=['numpy'])
+             with timed("plot_function.lambdify"):
+                 func = backends.lambdify(var, expr, backend=backend)
 
              # Generate x values
              x_vals = np.linspace(min_val, max_val, points)
 
-             # Evaluate the function, handle potential discontinuities carefully
-             # Use complex type to potentially catch issues during evaluation (like sqrt(-1))
-             y_vals_complex = func(x_vals.astype(np.complex128))
+             with timed("plot_function.evaluate"):
+                 # Evaluate the function, handle potential discontinuities carefully
+                 # Complex input catches issues during evaluation (like sqrt(-1)); those points become gaps.
+                 # Large (export-size) grids are evaluated in blocks on a thread pool.
+                 y_vals = evaluate_chunked(func, x_vals)
 
-             # Filter out complex results if we expect real output, set them to NaN
-             y_vals = np.real(y_vals_complex)
-             y_vals[np.iscomplex(y_vals_complex)] = np.nan # Show gaps where function is complex
 
-             # Handle infinities by replacing with NaN
-             y_vals[np.isinf(y_vals)] = np.nan
+        with timed("plot_function.figure"):
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=x_vals, y=y_vals, mode='lines', name=f'f({var_str}) = {sympy.latex(expr)}'))
 
+            fig.update_layout(
+                title=f"Plot of ${sympy.latex(expr)}$",
+                xaxis_title=f"${var_str}$",
+                yaxis_title=f"$f({var_str})$",
+                legend_title="Function"
+            )
+        return fig, None # Return figure and no error message
 
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=x_vals, y=y_vals, mode='lines', name=f'f({var_str}) = {sympy.latex(expr)}'))
+    except Exception as e:
+        return go.Figure(), f"Could not plot function: {e}"
+
+
+@functools.lru_cache(maxsize=32)
+def compile_parameterized(expr_str: str, var_str: str = 'x', params: tuple = (), backend: str = None):
+    """
+    Parses expr_str and lambdifies it once as f(var, *params), so a family of curves can be
+    re-evaluated for new parameter values without re-parsing (cached per expression, variable,
+    parameter names and evaluation backend). Returns (func, expr, error message).
+    """
+    expr, parse_error = try_parse_expression(expr_str)
+    if expr is None:
+        return None, None, f"Parsing Error: {parse_error}"
+    symbols = [sympy.symbols(name) for name in (var_str,) + tuple(params)]
+    unknown = expr.free_symbols - set(symbols)
+    if unknown:
+        return None, expr, f"Undefined symbol(s): {', '.join(sorted(map(str, unknown)))}"
+    with timed("compile_parameterized.lambdify"):
+        func = backends.lambdify(symbols, expr, backend=backend)
+    return func, expr, None
+
+
+# --- Two-variable plots, evaluated in tiles ---
+# The plane is divided into square-sample tiles of SURFACE_TILE x SURFACE_TILE points on a
+# power-of-two lattice: at level (ex, ey) tile (i, j) covers [i, i + 1) * 2**ex by
+# [j, j + 1) * 2**ey. A view picks the level that gives about `resolution` samples across it
+# and stitches the tiles covering it, so
+#   - peak memory beyond the output is one tile's temporaries per thread,
+#   - tiles are cached: panning only evaluates the newly exposed tiles, and a coarse preview
+#     costs a few tiles of a coarser level,
+#   - zooming in moves to a finer level, so detail is refined instead of interpolated.
+SURFACE_TILE = 128 # Samples per tile side (complex temporaries of 256 KiB)
+SURFACE_KINDS = ("heatmap", "contour", "surface")
+MAX_SURFACE_RESOLUTION = {"heatmap": 1000, "contour": 1000, "surface": 400} # Surfaces are WebGL meshes
+PREVIEW_RESOLUTION = 128
+
+
+@functools.lru_cache(maxsize=256) # 128 KiB per tile
+def _surface_tile(expr_str, x_var, y_var, backend, x_exp, y_exp, i, j):
+    """Read-only samples of f(x, y) on tile (i, j) of level (x_exp, y_exp); rows are y."""
+    func, _, err = compile_parameterized(expr_str, x_var, (y_var,), backend)
+    if err:
+        raise ValueError(err)
+    offsets = np.arange(SURFACE_TILE) / SURFACE_TILE
+    x = (i + offsets) * 2.0**x_exp
+    y = (j + offsets) * 2.0**y_exp
+    tile = np.empty((SURFACE_TILE, SURFACE_TILE))
+    with np.errstate(all='ignore'):
+        block = np.asarray(func(x[None, :].astype(np.complex128), y[:, None].astype(np.complex128)))
+    real_part_or_nan(block, out=tile)
+    tile.flags.writeable = False
+    return tile
+
+
+def clear_surface_cache():
+    """Drops the cached two-variable tiles, e.g. to time cold evaluations."""
+    _surface_tile.cache_clear()
+
+
+def _tile_level(span, resolution):
+    """
+    Exponent of the tile span giving about `resolution` samples across span, and never more:
+    the nearest power-of-two spacing, or the next coarser one when that would exceed it.
+    """
+    level = round(math.log2(span * SURFACE_TILE / resolution))
+    if math.floor(span * SURFACE_TILE / 2.0**level) + 1 > resolution: # Samples in the closed range
+        level += 1
+    return level
+
+
+@instrumented
+def evaluate_surface(expr_str: str, x_range, y_range, resolution: int = 500, x_var: str = 'x', y_var: str = 'y', backend: str = None):
+    """
+    Samples f(x, y) over x_range x y_range with about (at most) `resolution` points per axis,
+    from cached tiles (see above). Returns ((x_vals, y_vals, z), None) with z[row, col] = f(x_vals[col], y_vals[row])
+    and NaN where f is complex or infinite, or (None, error message).
+    """
+    (x0, x1), (y0, y1) = x_range, y_range
+    if not (x0 < x1 and y0 < y1):
+        return None, "Each range needs min < max."
+    func, _, err = compile_parameterized(expr_str, x_var, (y_var,), backend)
+    if err:
+        return None, err
+
+    x_exp, y_exp = _tile_level(x1 - x0, resolution), _tile_level(y1 - y0, resolution)
+    x_step, y_step = 2.0**x_exp, 2.0**y_exp
+    i0, i1 = math.floor(x0 / x_step), math.floor(x1 / x_step) + 1
+    j0, j1 = math.floor(y0 / y_step), math.floor(y1 / y_step) + 1
+    keys = [(i, j) for j in range(j0, j1) for i in range(i0, i1)]
+
+    def tile(key):
+        return _surface_tile(expr_str, x_var, y_var, backend, x_exp, y_exp, *key)
+
+    try:
+        with timed("evaluate_surface.tiles"):
+            if len(keys) > 1 and eval_threads() > 1:
+                tiles = list(get_eval_pool().map(tile, keys))
+            else:
+                tiles = [tile(key) for key in keys]
+    except Exception as e:
+        return None, f"Could not evaluate function: {e}"
+
+    # Crop the covering tiles to the view while copying them into the output
+    x_all = (i0 + np.arange((i1 - i0) * SURFACE_TILE) / SURFACE_TILE) * x_step
+    y_all = (j0 + np.arange((j1 - j0) * SURFACE_TILE) / SURFACE_TILE) * y_step
+    cx0, cx1 = np.searchsorted(x_all, x0, side='left'), np.searchsorted(x_all, x1, side='right')
+    cy0, cy1 = np.searchsorted(y_all, y0, side='left'), np.searchsorted(y_all, y1, side='right')
+    z = np.empty((cy1 - cy0, cx1 - cx0))
+    for (i, j), t in zip(keys, tiles):
+        tx, ty = (i - i0) * SURFACE_TILE, (j - j0) * SURFACE_TILE
+        sx0, sx1 = max(cx0, tx), min(cx1, tx + SURFACE_TILE)
+        sy0, sy1 = max(cy0, ty), min(cy1, ty + SURFACE_TILE)
+        if sx0 < sx1 and sy0 < sy1:
+            z[sy0 - cy0:sy1 - cy0, sx0 - cx0:sx1 - cx0] = t[sy0 - ty:sy1 - ty, sx0 - tx:sx1 - tx]
+    return (x_all[cx0:cx1], y_all[cy0:cy1], z), None
+
+
+@instrumented
+def plot_function_2d(expr_str: str, x_range, y_range, kind: str = "heatmap", resolution: int = 500,
+                     x_var: str = 'x', y_var: str = 'y', backend: str = None):
+    """
+    Plots f(x, y) as a heatmap, contour or 3-D surface, sampled by evaluate_surface.
+    resolution is capped per kind by MAX_SURFACE_RESOLUTION. Returns (fig, error message).
+    """
+    if kind not in SURFACE_KINDS:
+        return go.Figure(), f"Unknown plot type '{kind}' (expected one of: {', '.join(SURFACE_KINDS)})."
+    sampled, err = evaluate_surface(expr_str, x_range, y_range, min(resolution, MAX_SURFACE_RESOLUTION[kind]),
+                                    x_var, y_var, backend)
+    if err:
+        return go.Figure(), err
+    x_vals, y_vals, z = sampled
+    if not np.isfinite(z).any():
+        return go.Figure(), "The function has no real values in this range."
+    z = z.astype(np.float32) # Half the payload; plenty for a colour scale
+
+    with timed("plot_function_2d.figure"):
+        if kind == "surface":
+            fig = go.Figure(go.Surface(x=x_vals, y=y_vals, z=z, colorscale="Viridis"))
+            fig.update_layout(scene=dict(xaxis_title=x_var, yaxis_title=y_var, zaxis_title=f"f({x_var}, {y_var})"))
+        else:
+            trace = go.Heatmap if kind == "heatmap" else go.Contour
+            fig = go.Figure(trace(x=x_vals, y=y_vals, z=z, colorscale="Viridis"))
+            fig.update_layout(xaxis_title=f"${x_var}$", yaxis_title=f"${y_var}$")
+        expr, _ = try_parse_expression(expr_str)
+        fig.update_layout(title=f"Plot of ${sympy.latex(expr)}$ ({len(x_vals)} × {len(y_vals)} samples)")
+    return fig, None
+
+
+IMPLICIT_RESOLUTIONS = (50, 100, 200) # Coarse cells per axis; each crossing cell is refined 16x
+
+
+def _relation_difference(relation_str: str):
+    """'lhs = rhs' as the expression string '(lhs) - (rhs)'; a bare expression means expression = 0."""
+    if any(op in relation_str for op in ("<", ">", "!=")):
+        return None, "Only equations can be plotted, not inequalities."
+    sides = relation_str.replace("==", "=").split("=")
+    if len(sides) > 2 or not all(side.strip() for side in sides):
+        return None, "Enter one equation, e.g. 'x^2 + y^2 = 1'."
+    if len(sides) == 1:
+        return sides[0], None
+    return f"({sides[0]}) - ({sides[1]})", None
+
+
+@instrumented
+def plot_implicit(relation_str: str, x_range, y_range, resolution: int = 100, x_var: str = 'x', y_var: str = 'y',
+                  backend: str = None):
+    """
+    Plots the curve of an equation in x and y (e.g. 'x^2 + y^2 = 1') traced by
+    utils.implicit.implicit_curve, as one line trace with NaN breaks between its pieces.
+    Returns (fig, error message).
+    """
+    difference_str, err = _relation_difference(relation_str)
+    if err:
+        return go.Figure(), err
+    func, _, err = compile_parameterized(difference_str, x_var, (y_var,), backend)
+    if err:
+        return go.Figure(), err
+    curve, err = implicit_curve(func, x_range, y_range, resolution=resolution)
+    if err:
+        return go.Figure(), err
+
+    with timed("plot_implicit.figure"):
+        fig = go.Figure(go.Scatter(x=curve["x"], y=curve["y"], mode='lines', name=relation_str,
+                                   hovertemplate=f"{x_var} = %{{x:.6g}}<br>{y_var} = %{{y:.6g}}<extra></extra>"))
+        # Plain-text title: Plotly can't mix LaTeX with the statistics line (and title.subtitle needs Plotly 5.23+)
+        fig.update_layout(
+            title=f"Plot of {relation_str}<br><sup>{curve['pieces']} piece(s), {curve['segments']:,} segments, "
+                  f"{curve['evaluations']:,} evaluations, {curve['seconds'] * 1000:.0f} ms</sup>",
+            xaxis=dict(title=f"${x_var}$", range=list(x_range)),
+            yaxis=dict(title=f"${y_var}$", range=list(y_range), scaleanchor="x", scaleratio=1),
+        )
+    return fig, None
+
+
+@instrumented
+def plot_parameterized(expr_str: str, values: dict, var_str: str = 'x', min_val: float = -10, max_val: float = 10,
+                       points: int = 500, animate: str = None, sweep=None, backend: str = None):
+    """
+    Plots expr_str with the parameters set to `values` (name -> number), using the cached compiled
+    function from compile_parameterized, so moving a parameter slider costs one NumPy evaluation.
+    With animate=<parameter name> and sweep=<its values>, every curve of the sweep is evaluated in one
+    broadcast call and shipped as Plotly frames with a client-side slider for that parameter.
+    Returns (fig, error message).
+    """
+    params = tuple(values)
+    func, expr, err = compile_parameterized(expr_str, var_str, params, backend)
+    if err:
+        return go.Figure(), err
+
+    try:
+        x_vals = np.linspace(min_val, max_val, points)
+        with timed("plot_parameterized.evaluate"):
+            y_vals = evaluate_chunked(func, x_vals, *values.values())
 
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=x_vals, y=y_vals, mode='lines', name=f'f({var_str})'))
         fig.update_layout(
             title=f"Plot of ${sympy.latex(expr)}$",
             xaxis_title=f"${var_str}$",
             yaxis_title=f"$f({var_str})$",
             legend_title="Function"
         )
-        return fig, None # Return figure and no error message
+        if animate is None:
+            return fig, None
+
+        sweep = np.asarray(sweep, dtype=float)
+        args = [sweep[:, None] if name == animate else value for name, value in values.items()]
+        with timed("plot_parameterized.evaluate_frames"):
+            # One row per frame: broadcasting x (1, points) against the swept parameter (frames, 1)
+            curves = real_part_or_nan(func(x_vals[None, :].astype(np.complex128), *args), (len(sweep), points))
+
+        labels = [f"{value:.3g}" for value in sweep]
+        fig.frames = [dict(name=label, data=[dict(type='scatter', x=x_vals, y=curve)]) for label, curve in zip(labels, curves)]
+        start = int(np.argmin(np.abs(sweep - values[animate]))) # Slider starts at the current value
+        fig.data[0].y = curves[start]
+        still = dict(mode="immediate", frame=dict(duration=0, redraw=False), transition=dict(duration=0))
+        finite = curves[np.isfinite(curves)]
+        if finite.size:
+            low, high = np.percentile(finite, [1, 99]) # Fixed y-range across frames, ignoring asymptote spikes
+            pad = 0.1 * (high - low) + 0.1
+            fig.update_yaxes(range=[low - pad, high + pad])
+        fig.update_layout(sliders=[dict(active=start, currentvalue=dict(prefix=f"{animate} = "), pad=dict(t=50),
+                                        steps=[dict(method="animate", label=label, args=[[label], still]) for label in labels])])
+        return fig, None
 
     except Exception as e:
         return go.Figure(), f"Could not plot function: {e}"
 
 
+def add_analysis_markers(fig, analysis):
+    """Adds markers for the roots, extrema and inflection points from numeric_helpers.analyze_function."""
+    groups = [
+        ("Roots", analysis["roots"], dict(color='black', symbol='circle')),
+        ("Maxima", [p for p in analysis["critical_points"] if p[2] == "max"], dict(color='red', symbol='triangle-up')),
+        ("Minima", [p for p in analysis["critical_points"] if p[2] == "min"], dict(color='green', symbol='triangle-down')),
+        ("Stationary Points", [p for p in analysis["critical_points"] if p[2] == "stationary"], dict(color='orange', symbol='diamond')),
+        ("Inflection Points", analysis["inflection_points"], dict(color='purple', symbol='x')),
+    ]
+    for name, points, marker in groups:
+        if points:
+            fig.add_trace(go.Scatter(x=[p[0] for p in points], y=[p[1] for p in points], mode='markers',
+                                     name=name, marker=dict(size=10, **marker)))
+    return fig
+
+
+@instrumented
 def plot_unit_circle(angle_rad_float=None, highlight_ref_angle=None):
     """Creates an interactive Plotly figure for the unit circle."""
     fig = go.Figure()
@@ -114,6 +388,109 @@ def plot_unit_circle(angle_rad_float=None, highlight_ref_angle=None):
     return fig, None
 
 
+def _exact(value):
+    """REFERENCE_ANGLES mixes SymPy values with floats like 1/2; makes them all exact."""
+    return sympy.Rational(value).limit_denominator(1000) if isinstance(value, float) else sympy.sympify(value)
+
+
+def _short_exact(value):
+    """Compact plain-text form of an exact value for labels, e.g. sqrt(3)/2 -> √3/2."""
+    return re.sub(r"sqrt\((\d+)\)", r"√\1", sympy.sstr(value))
+
+
+def _reference_angle_labels():
+    """Exact 'sin, cos, tan' label lines for the reference angles, keyed by whole degree."""
+    labels = {}
+    for deg, data in REFERENCE_ANGLES.items():
+        sin_exact, cos_exact = _exact(data['sin']), _exact(data['cos'])
+        tan_exact = "undefined" if cos_exact == 0 else _short_exact(sin_exact / cos_exact)
+        labels[deg] = (f"θ = {deg}° = {_short_exact(_exact(data['rad']))}".replace("*pi", "π").replace("pi", "π"),
+                       f"exact: sin = {_short_exact(sin_exact)}, cos = {_short_exact(cos_exact)}, tan = {tan_exact}")
+    return labels
+
+
+@functools.lru_cache(maxsize=4)
+@instrumented
+def plot_unit_circle_animation(steps=360, radians=False):
+    """
+    Unit circle with a precomputed sweep of `steps` angles per turn, played back by Plotly in the
+    browser (slider and play button), so exploring the circle needs no server round-trips.
+    Every frame (radius, point, triangle, values label) is computed up front with NumPy.
+    The figure is cached and shared between sessions: render it, don't modify it.
+    """
+    fig, _ = plot_unit_circle()
+
+    # All angles at once; the sweep includes the full turn so the slider ends at 360° / 2π
+    angles = np.linspace(0.0, 2 * np.pi, steps + 1)
+    degrees = np.degrees(angles)
+    cos_vals, sin_vals = np.cos(angles), np.sin(angles)
+    cos_vals[np.abs(cos_vals) < 1e-12] = 0.0 # Exact zeros, so tan/sec show as undefined
+    sin_vals[np.abs(sin_vals) < 1e-12] = 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        reciprocal = {
+            'tan': np.where(cos_vals != 0, sin_vals / cos_vals, np.nan),
+            'csc': np.where(sin_vals != 0, 1 / sin_vals, np.nan),
+            'sec': np.where(cos_vals != 0, 1 / cos_vals, np.nan),
+            'cot': np.where(sin_vals != 0, cos_vals / sin_vals, np.nan),
+        }
+    fmt = lambda v: "undefined" if np.isnan(v) else f"{v:.4f}"
+
+    # Reference angles hit by the sweep (whole degrees within floating-point tolerance)
+    exact_labels = _reference_angle_labels()
+    whole = np.round(degrees)
+    on_reference = np.isclose(degrees, whole, atol=1e-9) & np.isin(whole, list(exact_labels))
+
+    def label(i):
+        if on_reference[i]:
+            title, exact = exact_labels[int(whole[i])]
+        else:
+            title, exact = f"θ = {degrees[i]:.1f}° = {angles[i]:.4f} rad", ""
+        values = (f"sin = {sin_vals[i]:.4f}, cos = {cos_vals[i]:.4f}, tan = {fmt(reciprocal['tan'][i])}<br>"
+                  f"csc = {fmt(reciprocal['csc'][i])}, sec = {fmt(reciprocal['sec'][i])}, cot = {fmt(reciprocal['cot'][i])}")
+        return "<br>".join(part for part in (title, values, exact) if part)
+
+    def frame_data(i):
+        # Plain dicts: validating hundreds of go.Scatter objects would dominate the build time
+        c, s = float(cos_vals[i]), float(sin_vals[i])
+        ref = ([c], [s]) if on_reference[i] else ([], [])
+        return [
+            dict(type='scatter', x=[0, c], y=[0, s]),
+            dict(type='scatter', x=[c], y=[s]),
+            dict(type='scatter', x=[0, c, c, 0], y=[0, 0, s, 0]),
+            dict(type='scatter', x=ref[0], y=ref[1]),
+            dict(type='scatter', text=[label(i)]),
+        ]
+
+    # Animated traces, drawn at angle 0; each frame replaces their data
+    first = len(fig.data)
+    fig.add_trace(go.Scatter(mode='lines', line=dict(color='red', width=2), name='Radius'))
+    fig.add_trace(go.Scatter(mode='markers', marker=dict(color='red', size=10), name='Point'))
+    fig.add_trace(go.Scatter(mode='lines', line=dict(color='orange', dash='dot'), name='Triangle'))
+    fig.add_trace(go.Scatter(mode='markers', marker=dict(color='green', size=12, symbol='star'), name='Reference Angle'))
+    fig.add_trace(go.Scatter(x=[-1.45], y=[1.45], mode='text', textposition='bottom right', showlegend=False, hoverinfo='skip'))
+    animated = list(range(first, len(fig.data)))
+    for index, trace in zip(animated, frame_data(0)):
+        fig.data[index].update(trace)
+
+    names = [str(i) for i in range(len(angles))]
+    fig.frames = [dict(name=names[i], data=frame_data(i), traces=animated) for i in range(len(angles))]
+
+    still = dict(mode="immediate", frame=dict(duration=0, redraw=False), transition=dict(duration=0))
+    slider_labels = [f"{a:.3f}" for a in angles] if radians else [f"{d:.0f}°" for d in degrees]
+    fig.update_layout(
+        title="Unit Circle (animated sweep)",
+        sliders=[dict(active=0, currentvalue=dict(prefix="θ = "), pad=dict(t=40),
+                      steps=[dict(method="animate", label=slider_labels[i], args=[[names[i]], still]) for i in range(len(angles))])],
+        updatemenus=[dict(type="buttons", showactive=False, x=0, y=-0.05, xanchor="left", yanchor="top", direction="left",
+                          buttons=[dict(label="▶ Play", method="animate",
+                                        args=[None, dict(mode="immediate", fromcurrent=True, frame=dict(duration=30, redraw=False), transition=dict(duration=0))]),
+                                   dict(label="⏸ Pause", method="animate", args=[[None], still])])],
+        height=700,
+    )
+    return fig, None
+
+
+@instrumented
 def plot_solved_triangle(a, b, c, alpha, beta, gamma):
     """Plots the solved triangle using Plotly."""
     if not all(val is not None for val in [a, b, c, alpha, beta, gamma]):
@@ -182,6 +559,7 @@ def plot_solved_triangle(a, b, c, alpha, beta, gamma):
         return go.Figure(), f"Could not plot triangle: {e}"
 
 
+@instrumented
 def plot_angle_elevation(distance, height, angle_deg):
     """Plots the angle of elevation scenario."""
     if not all(val is not None and isinstance(val, (int, float)) for val in [distance, height, angle_deg]):
@@ -225,4 +603,88 @@ def plot_angle_elevation(distance, height, angle_deg):
     )
     return fig, None
 
-# TODO: Add plotting functions for Bearings (still requires drawing compass lines / North reference)
\ No newline at end of file
+@instrumented
+def plot_uncertainty_histograms(report, labels=None):
+    """
+    Plots the Monte Carlo distribution of each unknown from propagate_triangle_uncertainty,
+    one panel per unknown, with the measured-value solution and the confidence bounds marked.
+    The histograms are binned server-side, so the figure stays small whatever the sample count.
+    """
+    unknowns = report["unknowns"]
+    labels = labels or {}
+    names = list(unknowns)
+    fig = make_subplots(rows=1, cols=len(names), subplot_titles=[labels.get(n, n) for n in names])
+    for col, name in enumerate(names, start=1):
+        u = unknowns[name]
+        counts, edges = u["histogram"]
+        fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), marker_color='steelblue',
+                             name=labels.get(name, name), hovertemplate="%{x:.4g}: %{y}<extra></extra>"), row=1, col=col)
+        fig.add_vline(x=u["nominal"], line=dict(color='black'), row=1, col=col)
+        for bound in (u["lower"], u["upper"]):
+            fig.add_vline(x=bound, line=dict(color='red', dash='dash'), row=1, col=col)
+    fig.update_layout(title=f"Monte Carlo distributions ({report['confidence']:.0%} bounds dashed)",
+                      showlegend=False, bargap=0, height=320)
+    return fig, None
+
+
+@instrumented
+def plot_elevation_sweep(distances, values, valid, quantity, fixed_label):
+    """
+    Plots a solved quantity (e.g. "Angle (°)") against horizontal distance for a sweep
+    computed by the *_many solvers; invalid scenarios are left as gaps.
+    """
+    distances = np.asarray(distances, dtype=float)
+    values = np.where(valid, values, np.nan)
+    if not np.any(valid):
+        return go.Figure(), "No valid scenarios in the sweep."
+    fig = go.Figure(go.Scattergl(x=distances, y=values, mode='lines', name=quantity,
+                                 hovertemplate=f"Distance %{{x:.4g}}<br>{quantity} %{{y:.4g}}<extra></extra>"))
+    fig.update_layout(title=f"{quantity} vs. Horizontal Distance ({fixed_label})",
+                      xaxis_title="Horizontal Distance", yaxis_title=quantity, showlegend=False)
+    return fig, None
+
+
+MAX_ROUTE_TRACES = 12 # Larger fleets are drawn as a single trace without a per-route legend
+
+
+@instrumented
+def plot_routes(route_lats, route_lons, labels=None, path_points=32):
+    """
+    Plots routes (rows of waypoint latitudes/longitudes, NaN-padded) on a globe, each leg
+    drawn along its great circle. Every route is one trace, whatever its number of legs;
+    more than MAX_ROUTE_TRACES routes share a single trace, separated by gaps.
+    """
+    lats = np.atleast_2d(np.asarray(route_lats, dtype=float))
+    lons = np.atleast_2d(np.asarray(route_lons, dtype=float))
+    if lats.shape != lons.shape or lats.shape[1] < 2:
+        return go.Figure(), "Routes need at least a start point and one leg."
+    labels = list(labels) if labels is not None else [f"Route {i + 1}" for i in range(lats.shape[0])]
+
+    # (routes, legs, path_points) -> one row per route with a NaN gap after it
+    path_lats, path_lons = great_circle_paths(lats[:, :-1], lons[:, :-1], lats[:, 1:], lons[:, 1:], path_points)
+    gap = np.full((lats.shape[0], 1), np.nan)
+    path_lats = np.hstack([path_lats.reshape(lats.shape[0], -1), gap])
+    path_lons = np.hstack([path_lons.reshape(lats.shape[0], -1), gap])
+
+    fig = go.Figure()
+    if lats.shape[0] <= MAX_ROUTE_TRACES:
+        palette = plotly.colors.qualitative.Plotly
+        for i, (label, p_lat, p_lon, w_lat, w_lon) in enumerate(zip(labels, path_lats, path_lons, lats, lons)):
+            color = palette[i % len(palette)]
+            fig.add_trace(go.Scattergeo(lat=p_lat, lon=p_lon, mode='lines', name=label, legendgroup=label,
+                                        line=dict(color=color), hoverinfo='skip'))
+            fig.add_trace(go.Scattergeo(lat=w_lat, lon=w_lon, mode='markers', name=label, legendgroup=label,
+                                        showlegend=False, marker=dict(size=6, color=color),
+                                        hovertemplate="%{lat:.4f}°, %{lon:.4f}°"))
+    else:
+        fig.add_trace(go.Scattergeo(lat=path_lats.ravel(), lon=path_lons.ravel(), mode='lines', name='Routes',
+                                    line=dict(width=1), hoverinfo='skip'))
+        fig.add_trace(go.Scattergeo(lat=lats.ravel(), lon=lons.ravel(), mode='markers', name='Waypoints',
+                                    marker=dict(size=3), hovertemplate="%{lat:.4f}°, %{lon:.4f}°"))
+    fig.add_trace(go.Scattergeo(lat=lats[:, 0], lon=lons[:, 0], mode='markers', name='Start',
+                                marker=dict(size=9, symbol='star', color='black'), text=labels,
+                                hovertemplate="%{text}: %{lat:.4f}°, %{lon:.4f}°<extra></extra>"))
+    fig.update_geos(projection_type="natural earth", showcountries=True, showland=True, landcolor="rgb(235, 235, 225)",
+                    lataxis_showgrid=True, lonaxis_showgrid=True, fitbounds="locations")
+    fig.update_layout(title="Routes (great circles)", margin=dict(l=0, r=0, t=40, b=0))
+    return fig, None
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Progressive results for the Streamlit pages: show a quick numeric preview at once,
+and the exact symbolic answer when the worker process finishes it.
+
+    if st.button("Compute"):
+        preview = estimate_limit(expr, var, point, dir)  # milliseconds
+        progressive.start("lim_job", compute_limit, expr_str, var_str, point_str,
+                          preview=preview, context={...}, time_limit=60)
+    progressive.show("lim_job", render_exact, render_preview)
+
+Jobs live in st.session_state, so the result survives reruns until the next start()
+with the same key. While a job runs, a fragment polls it without rerunning the whole
+page; once it is done, the page reruns once and render_exact() draws the final answer.
+"""
+import time
+from concurrent.futures import wait
+
+import streamlit as st
+
+from . import workers
+
+POLL_INTERVAL = 0.5  # seconds between checks of a running job
+FAST_RESULT = 0.5  # seconds to wait before showing a preview, so quick answers don't flicker
+
+
+def start(key, func, *args, preview=None, context=None, time_limit=None, **kwargs):
+    """
+    Submits func(*args, **kwargs) to a worker and stores the job under key, replacing (and
+    cancelling, if still queued) any previous job with that key.
+    preview and context are kept with the job for the render callbacks.
+    """
+    previous = st.session_state.get(key)
+    if previous is not None:
+        previous["future"].cancel()
+    st.session_state[key] = {
+        "future": workers.submit(func, *args, time_limit=time_limit, **kwargs),
+        "preview": preview,
+        "context": context or {},
+        "started": time.monotonic(),
+        "waited": False,
+    }
+
+
+def clear(key):
+    """Forgets the job stored under key (e.g. when a synchronous result replaces it)."""
+    job = st.session_state.pop(key, None)
+    if job is not None:
+        job["future"].cancel()
+
+
+def show(key, render_exact, render_preview=None):
+    """
+    Renders the job stored under key and returns it (None if there is no job).
+    render_exact(job, result, error) draws the finished computation, where error is set if it
+    failed or timed out (job["preview"] is then the best available answer).
+    render_preview(job) draws the preview while the computation is still running.
+    """
+    job = st.session_state.get(key)
+    if job is None:
+        return None
+    if not job["waited"]:
+        job["waited"] = True
+        wait([job["future"]], timeout=FAST_RESULT)
+    if job["future"].done():
+        result, error = workers.wait_result(job["future"])
+        render_exact(job, result, error)
+    else:
+        _poll(key, render_preview)
+    return job
+
+
+@st.fragment(run_every=POLL_INTERVAL)
+def _poll(key, render_preview):
+    job = st.session_state.get(key)
+    if job is None:
+        return
+    if job["future"].done():
+        st.rerun()  # Full rerun: show() renders the exact result and this fragment stops polling
+    if render_preview is not None:
+        render_preview(job)
+    st.caption(f"⏳ Computing the exact result... ({time.monotonic() - job['started']:.0f}s)")
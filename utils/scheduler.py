@@ -0,0 +1,207 @@
+"""
+Fair scheduler for computations offloaded to worker processes.
+
+Jobs are classified as cheap or expensive (by operation and expression size via
+count_ops) and queued per class, each class with its own process pool, so a
+large simplify can't hold up cheap work. Within a class, sessions are served
+round-robin and each session may only run a limited number of jobs at once.
+Identical queued or running jobs are merged and share one result.
+
+Use it through utils.workers.submit(); configuration (environment variables):
+    STREAMLIT_MATH_WORKERS        Total worker processes (default: CPU count)
+    STREAMLIT_MATH_SESSION_LIMIT  Running jobs per session and class (default: 1)
+
+Metrics: 'scheduler.<class>.wait' and '.run' latencies, '.queue_depth' and
+'.running' gauges, and a '.submitted' counter.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import sympy
+
+from .coalesce import canonical
+from .metrics import increment, observe, set_gauge
+from .workers import pool_size, _run_with_time_limit
+
+SESSION_LIMIT_ENV = "STREAMLIT_MATH_SESSION_LIMIT"
+
+CHEAP = "cheap"
+EXPENSIVE = "expensive"
+
+# Relative cost per unit of expression size; unknown operations weigh 1
+OPERATION_WEIGHTS = {
+    "diff": 1, "expand": 2, "cancel": 3, "factor": 5, "trigsimp": 5, "limit": 5,
+    "simplify": 10, "solveset": 10, "integrate": 10, "series": 10, "summation": 10,
+}
+EXPENSIVE_COST = 100  # weight * (1 + count_ops) above which a job is expensive
+
+
+def classify(operation, args=()):
+    """Returns CHEAP or EXPENSIVE for an operation on the given arguments."""
+    size = 0
+    for arg in args:
+        if isinstance(arg, sympy.Basic):
+            try:
+                size += sympy.count_ops(arg)
+            except Exception:
+                size += len(sympy.srepr(arg)) // 10 # Rough fallback for objects count_ops can't handle
+    cost = OPERATION_WEIGHTS.get(operation, 1) * (1 + size)
+    return EXPENSIVE if cost > EXPENSIVE_COST else CHEAP
+
+
+def current_session_id():
+    """The Streamlit session running this thread, or None outside a script run."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+    except Exception:
+        return None
+    return ctx.session_id if ctx is not None else None
+
+
+def session_limit():
+    try:
+        return max(1, int(os.environ.get(SESSION_LIMIT_ENV, "")))
+    except ValueError:
+        return 1
+
+
+class _Job:
+    def __init__(self, key, cost_class, session_id, call):
+        self.key = key
+        self.cost_class = cost_class
+        self.session_id = session_id
+        self.call = call  # (func, time_limit, args, kwargs)
+        self.waiters = []  # One Future per caller, so a caller giving up doesn't cancel the others
+        self.queued_at = time.monotonic()
+        self.started_at = None
+
+
+class Scheduler:
+    def __init__(self, cheap_slots, expensive_slots, per_session):
+        self._slots = {CHEAP: cheap_slots, EXPENSIVE: expensive_slots}
+        self._per_session = per_session
+        self._lock = threading.RLock()  # Re-entrant: a done callback can fire inside _dispatch_locked
+        self._pools = {}
+        self._queues = {CHEAP: OrderedDict(), EXPENSIVE: OrderedDict()}  # session -> deque of jobs
+        self._running = {CHEAP: 0, EXPENSIVE: 0}
+        self._session_running = {}  # (class, session) -> running jobs
+        self._jobs = {}  # key -> queued or running job
+
+    def submit(self, operation, func, args=(), kwargs=None, time_limit=None, session_id=None):
+        """Queues func(*args, **kwargs) and returns a Future for its result."""
+        kwargs = kwargs or {}
+        key = (operation, func.__module__, func.__qualname__, canonical(list(args)),
+               canonical(sorted(kwargs.items())), time_limit)
+        waiter = Future()
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                if job.started_at is not None:
+                    waiter.set_running_or_notify_cancel() # Joining a running job: like the others, no longer cancellable
+                job.waiters.append(waiter)
+                increment(f"coalesce.{operation}.coalesced")
+                return waiter
+            cost_class = classify(operation, list(args) + list(kwargs.values()))
+            job = _Job(key, cost_class, session_id, (func, time_limit, args, kwargs))
+            job.waiters.append(waiter)
+            self._jobs[key] = job
+            self._queues[cost_class].setdefault(session_id, deque()).append(job)
+            increment(f"scheduler.{cost_class}.submitted")
+            self._dispatch_locked()
+        return waiter
+
+    def _pool(self, cost_class):
+        pool = self._pools.get(cost_class)
+        if pool is None:
+            # 'spawn' is safe to use from the (multi-threaded) Streamlit server
+            pool = ProcessPoolExecutor(max_workers=self._slots[cost_class], mp_context=multiprocessing.get_context("spawn"))
+            self._pools[cost_class] = pool
+        return pool
+
+    def _next_job_locked(self, cost_class):
+        """Round-robin over sessions with queued jobs that are under their concurrency limit."""
+        queue = self._queues[cost_class]
+        for session_id in list(queue):
+            if self._session_running.get((cost_class, session_id), 0) >= self._per_session:
+                continue
+            jobs = queue.pop(session_id)
+            job = jobs.popleft()
+            if jobs:
+                queue[session_id] = jobs  # Re-inserted at the end: next turn goes to another session
+            return job
+        return None
+
+    def _dispatch_locked(self):
+        for cost_class in (CHEAP, EXPENSIVE):
+            while self._running[cost_class] < self._slots[cost_class]:
+                job = self._next_job_locked(cost_class)
+                if job is None:
+                    break
+                # Callers that gave up while the job was queued have cancelled their futures
+                job.waiters = [w for w in job.waiters if w.set_running_or_notify_cancel()]
+                if not job.waiters:
+                    del self._jobs[job.key]
+                    continue
+                job.started_at = time.monotonic()
+                observe(f"scheduler.{cost_class}.wait", job.started_at - job.queued_at)
+                self._running[cost_class] += 1
+                running_key = (cost_class, job.session_id)
+                self._session_running[running_key] = self._session_running.get(running_key, 0) + 1
+                func, time_limit, args, kwargs = job.call
+                try:
+                    future = self._pool(cost_class).submit(_run_with_time_limit, func, time_limit, args, kwargs)
+                except (BrokenProcessPool, RuntimeError) as e:
+                    self._pools.pop(cost_class, None)
+                    self._finish_locked(job, exception=e)
+                    continue
+                future.add_done_callback(lambda f, job=job: self._on_done(job, f))
+        self._update_gauges_locked()
+
+    def _on_done(self, job, future):
+        exception = future.exception()
+        with self._lock:
+            if isinstance(exception, BrokenProcessPool):
+                self._pools.pop(job.cost_class, None) # A worker died; start a fresh pool next time
+            observe(f"scheduler.{job.cost_class}.run", time.monotonic() - job.started_at, error=exception is not None)
+            self._finish_locked(job, result=None if exception else future.result(), exception=exception)
+            self._dispatch_locked()
+
+    def _finish_locked(self, job, result=None, exception=None):
+        self._jobs.pop(job.key, None)
+        if job.started_at is not None:
+            self._running[job.cost_class] -= 1
+            running_key = (job.cost_class, job.session_id)
+            self._session_running[running_key] -= 1
+            if not self._session_running[running_key]:
+                del self._session_running[running_key]
+        for waiter in job.waiters:
+            if exception is not None:
+                waiter.set_exception(exception)
+            else:
+                waiter.set_result(result)
+
+    def _update_gauges_locked(self):
+        for cost_class in (CHEAP, EXPENSIVE):
+            set_gauge(f"scheduler.{cost_class}.queue_depth", sum(len(jobs) for jobs in self._queues[cost_class].values()))
+            set_gauge(f"scheduler.{cost_class}.running", self._running[cost_class])
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Returns the process-wide scheduler. A quarter of the workers (at least one) serve cheap jobs."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            total = pool_size()
+            cheap = max(1, total // 4)
+            _scheduler = Scheduler(cheap, max(1, total - cheap), session_limit())
+        return _scheduler
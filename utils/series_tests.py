@@ -0,0 +1,262 @@
+"""
+Convergence tests for series sum(a_n, n = 1..oo), chosen by a numeric pre-screen.
+
+Each symbolic test is a SymPy limit (or integral) that can take seconds or hang, so instead
+of trying them all, screen_series() first evaluates log|a_n| on a geometric grid of n up to
+10**6 in one vectorized pass. The statistics it reads off pick the tests worth running:
+
+    ratio        |a_(n+1)/a_n|     clearly away from 1      -> Ratio test
+    root         |a_n|**(1/n)      clearly away from 1      -> Root test
+    slope        -d log|a_n|/d log n settles to p          -> Limit comparison with 1/n**p
+    sign pattern  alternating                              -> Alternating series test
+    tail         |a_n| not tending to 0                    -> Divergence test
+
+The alternating series and integral tests also need |a_n| to decrease eventually, which the
+limits they take can't show; the screen checks it on its last samples ("decreasing").
+
+    screen, err = screen_series(term, n)
+    for test in screen["tests"]:   # most promising first
+        (verdict, detail, seconds), err = run_convergence_test(test, term, n, screen["p"], screen["decreasing"])
+
+run_convergence_test runs a single symbolic test; the pages run it in a worker with a
+time limit and only move on to the next test when it is inconclusive.
+"""
+import math
+import time
+
+import mpmath
+import numpy as np
+import sympy
+
+from .metrics import instrumented
+from .slowlog import recorded
+from . import planner
+
+DIVERGENCE = "divergence"
+RATIO = "ratio"
+ROOT = "root"
+ALTERNATING = "alternating"
+COMPARISON = "comparison"
+INTEGRAL = "integral"
+
+TEST_NAMES = {
+    DIVERGENCE: "Divergence Test",
+    RATIO: "Ratio Test",
+    ROOT: "Root Test",
+    ALTERNATING: "Alternating Series Test",
+    COMPARISON: "Limit Comparison Test",
+    INTEGRAL: "Integral Test",
+}
+
+CONVERGES = "converges"
+DIVERGES = "diverges"
+INCONCLUSIVE = "inconclusive"
+
+SCREEN_GRID = np.unique(np.geomspace(10, 1e6, 240).astype(np.int64)).astype(float)
+SIGN_BLOCK = range(1000, 1040) # Consecutive n for the sign pattern
+DECISIVE_GAP = 0.02 # How far the ratio/root statistics must be from 1 to be worth testing
+DECREASE_SAMPLES = 40 # Last grid points (n from about 1.5e5) on which |a_n| must decrease
+
+_lgamma = np.frompyfunc(math.lgamma, 1, 1)
+
+
+def _log_abs_term(term, var):
+    """log|a_n| with factorials as log-gamma, so huge and tiny terms stay finite."""
+    log_term = sympy.expand_log(sympy.log(sympy.Abs(term)), force=True)
+    log_term = log_term.replace(lambda e: isinstance(e, sympy.log) and isinstance(e.args[0], sympy.factorial),
+                                lambda e: sympy.loggamma(e.args[0].args[0] + 1))
+    log_term = log_term.replace(lambda e: isinstance(e, sympy.log) and isinstance(e.args[0], sympy.gamma),
+                                lambda e: sympy.loggamma(e.args[0].args[0]))
+    return log_term.rewrite(sympy.gamma)
+
+
+def _evaluate_log_abs(term, var, n_vals):
+    """log|a_n| over n_vals: vectorized NumPy, or mpmath per point if that fails."""
+    try:
+        func = sympy.lambdify(var, _log_abs_term(term, var), modules=[{"loggamma": lambda u: _lgamma(u).astype(float)}, "numpy"])
+        with np.errstate(all='ignore'):
+            values = np.real(np.asarray(func(n_vals), dtype=complex)) * np.ones_like(n_vals)
+        if np.isfinite(values[-len(n_vals) // 4:]).all():
+            return values
+    except Exception:
+        pass
+    f = sympy.lambdify(var, term, modules=['mpmath'])
+    values = []
+    for v in n_vals:
+        try:
+            values.append(float(mpmath.log(abs(f(mpmath.mpf(v))))))
+        except (ValueError, ZeroDivisionError, TypeError, OverflowError):
+            values.append(np.nan)
+    return np.array(values)
+
+
+def _sign_pattern(term, var):
+    f = sympy.lambdify(var, term, modules=['mpmath'])
+    signs = []
+    for v in SIGN_BLOCK:
+        value = mpmath.mpmathify(f(mpmath.mpf(v)))
+        if isinstance(value, mpmath.mpc) and abs(value.imag) > 1e-12 * abs(value):
+            return "complex"
+        signs.append(mpmath.sign(mpmath.re(value)))
+    if all(s > 0 for s in signs) or all(s < 0 for s in signs):
+        return "constant"
+    if all(s != 0 for s in signs) and all(a == -b for a, b in zip(signs, signs[1:])):
+        return "alternating"
+    return "mixed"
+
+
+@instrumented
+def screen_series(term, var):
+    """
+    Numeric pre-screen of sum(term, var = 1..oo). Returns (screen, None) where screen has the
+    statistics at the largest n ("ratio", "root", "p", "tail", "sign", "terms_vanish" unless
+    |a_n| visibly stays away from 0, and "decreasing" if |a_n| decreases over the last
+    DECREASE_SAMPLES grid points and from each of them to the next n), the tests ranked
+    most promising first ("tests") and the time taken ("seconds"); or (None, error message).
+    """
+    start = time.perf_counter()
+    try:
+        if term.free_symbols - {var}:
+            return None, "The term may only depend on n."
+        n_vals = SCREEN_GRID
+        log_a = _evaluate_log_abs(term, var, n_vals)
+        log_next = _evaluate_log_abs(term, var, n_vals + 1)
+        finite = np.isfinite(log_a) & np.isfinite(log_next)
+        if finite.sum() < 8:
+            return None, "Could not evaluate the terms numerically."
+        n_vals, log_a, log_next = n_vals[finite], log_a[finite], log_next[finite]
+
+        with np.errstate(over='ignore'):
+            ratio = np.exp(log_next - log_a)
+            root = np.exp(log_a / n_vals)
+            tail = float(np.exp(log_a[-1]))
+        slopes = -np.diff(log_a) / np.diff(np.log(n_vals)) # Local power-law exponent p
+        p_end = float(np.median(slopes[-10:]))
+        p_mid = float(np.median(slopes[len(slopes) // 2 - 5:len(slopes) // 2 + 5]))
+        sign = _sign_pattern(term, var)
+        recent = slice(-DECREASE_SAMPLES, None)
+        decreasing = bool(np.all(np.diff(log_a[recent]) <= 0) and np.all(log_next[recent] <= log_a[recent]))
+
+        screen = {
+            "ratio": float(ratio[-1]), "root": float(root[-1]), "p": None, "p_estimate": p_end,
+            "tail": tail, "sign": sign, "terms_vanish": not (tail > 1e-3 and p_end < 0.1), "decreasing": decreasing,
+        }
+        tests = []
+        if not screen["terms_vanish"]:
+            tests.append(DIVERGENCE)
+        # Only a statistic that has settled over the last samples says anything about its limit
+        if abs(screen["ratio"] - 1) > DECISIVE_GAP and np.ptp(ratio[-10:]) < DECISIVE_GAP:
+            tests.append(RATIO)
+        elif abs(screen["root"] - 1) > DECISIVE_GAP and np.ptp(root[-10:]) < DECISIVE_GAP:
+            tests.append(ROOT)
+        if sign == "alternating" and decreasing:
+            tests.append(ALTERNATING)
+        if sign == "constant" and abs(p_end - p_mid) < 0.05 and p_end > 0:
+            # Power-law decay: compare with 1/n**p for p rounded to a half-integer (slower than
+            # any power, like 1/log(n), still diverges against 1/sqrt(n))
+            screen["p"] = max(sympy.Rational(round(2 * p_end), 2), sympy.Rational(1, 2))
+            tests.append(COMPARISON)
+        if sign == "constant" and decreasing:
+            tests.append(INTEGRAL)
+        if DIVERGENCE not in tests:
+            tests.append(DIVERGENCE)
+        screen["tests"] = tests
+        screen["seconds"] = time.perf_counter() - start
+        return screen, None
+    except Exception as e:
+        return None, f"Could not screen the series: {str(e) or type(e).__name__}"
+
+
+def _limit_at_infinity(expr, var):
+    result, _ = planner.limit(expr, var, sympy.oo)
+    return result
+
+
+def _compare_to_one(value, name):
+    """Verdict of the ratio/root tests from their limit."""
+    if value.is_finite is False or (value.is_real and value > 1):
+        return DIVERGES, f"{name} = {sympy.latex(value)} > 1"
+    if value.is_real and value < 1:
+        return CONVERGES, f"{name} = {sympy.latex(value)} < 1"
+    return INCONCLUSIVE, f"{name} = {sympy.latex(value)}"
+
+
+def _divergence(term, var, p, decreasing):
+    value = _limit_at_infinity(term, var)
+    if value == 0:
+        return INCONCLUSIVE, "\\lim a_n = 0"
+    if value is sympy.nan or isinstance(value, sympy.AccumBounds):
+        return DIVERGES, "\\lim a_n \\text{ does not exist}"
+    return DIVERGES, f"\\lim a_n = {sympy.latex(value)} \\neq 0"
+
+
+def _ratio(term, var, p, decreasing):
+    ratio = sympy.combsimp(sympy.powsimp(sympy.Abs(term.subs(var, var + 1) / term), force=True))
+    return _compare_to_one(_limit_at_infinity(ratio, var), "\\lim |a_{n+1}/a_n|")
+
+
+def _root(term, var, p, decreasing):
+    return _compare_to_one(_limit_at_infinity(sympy.Abs(term) ** (1 / var), var), "\\lim |a_n|^{1/n}")
+
+
+def _alternating(term, var, p, decreasing):
+    # The eventual decrease of |a_n| comes from the pre-screen's samples
+    if not decreasing:
+        return INCONCLUSIVE, "|a_n| \\text{ is not eventually decreasing}"
+    value = _limit_at_infinity(sympy.Abs(term), var)
+    if value == 0:
+        return CONVERGES, "\\lim |a_n| = 0 \\text{ with alternating signs, } |a_n| \\text{ decreasing}"
+    return DIVERGES, f"\\lim |a_n| = {sympy.latex(value)} \\neq 0"
+
+
+def _comparison(term, var, p, decreasing):
+    value = _limit_at_infinity(sympy.Abs(term) * var ** p, var)
+    detail = f"\\lim |a_n| \\cdot n^{{{sympy.latex(p)}}} = {sympy.latex(value)}"
+    positive_finite = value.is_positive and value.is_finite
+    if (positive_finite or value == 0) and p > 1:
+        return CONVERGES, detail + f", \\; \\sum 1/n^{{{sympy.latex(p)}}} \\text{{ converges}}"
+    if (positive_finite or value.is_infinite) and p <= 1:
+        return DIVERGES, detail + f", \\; \\sum 1/n^{{{sympy.latex(p)}}} \\text{{ diverges}}"
+    return INCONCLUSIVE, detail
+
+
+def _integral(term, var, p, decreasing):
+    if not decreasing:
+        return INCONCLUSIVE, "|a_n| \\text{ is not eventually decreasing}"
+    x = sympy.Symbol('x', positive=True)
+    value = sympy.integrate(sympy.Abs(term).subs(var, x), (x, 1, sympy.oo))
+    detail = f"\\int_1^\\infty a(x)\\,dx = {sympy.latex(value)}"
+    if value.has(sympy.Integral):
+        return INCONCLUSIVE, "\\int_1^\\infty a(x)\\,dx \\text{ not found}"
+    if value.has(sympy.oo, -sympy.oo, sympy.zoo):
+        return DIVERGES, detail # e.g. oo - li(2): an infinite part is enough for a positive integrand
+    if value.is_finite:
+        return CONVERGES, detail
+    return INCONCLUSIVE, detail
+
+
+TESTS = {
+    DIVERGENCE: _divergence,
+    RATIO: _ratio,
+    ROOT: _root,
+    ALTERNATING: _alternating,
+    COMPARISON: _comparison,
+    INTEGRAL: _integral,
+}
+
+
+@instrumented
+@recorded
+def run_convergence_test(test, term, var, p=None, decreasing=False):
+    """
+    Runs one symbolic convergence test, with p and decreasing from screen_series (the alternating
+    series and integral tests are inconclusive unless |a_n| is decreasing). Returns
+    ((verdict, detail, seconds), None), where verdict is 'converges', 'diverges' or
+    'inconclusive' and detail is the deciding quantity as LaTeX; or (None, error message).
+    """
+    start = time.perf_counter()
+    try:
+        verdict, detail = TESTS[test](term, var, p, decreasing)
+        return (verdict, detail, time.perf_counter() - start), None
+    except Exception as e:
+        return None, f"{TEST_NAMES.get(test, test)} failed: {str(e) or type(e).__name__}"
@@ -0,0 +1,242 @@
+"""
+Slow-expression log.
+
+Any recorded call that takes longer than the threshold is appended to a JSONL file
+with its inputs, duration and SymPy version. The log can be replayed offline with
+profiling to analyze pathological inputs:
+
+    python -m utils.slowlog replay [slow_expressions.jsonl] --profile-dir profiles/
+    python -m utils.slowlog replay --operation compute_integral --top 15
+
+Configuration (environment variables):
+    STREAMLIT_MATH_SLOW_LOG        Log file path (default: slow_expressions.jsonl)
+    STREAMLIT_MATH_SLOW_THRESHOLD  Threshold in seconds (default: 2.0)
+"""
+import argparse
+import cProfile
+import functools
+import inspect
+import io
+import json
+import os
+import platform
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import sympy
+
+SLOW_LOG_ENV = "STREAMLIT_MATH_SLOW_LOG"
+SLOW_THRESHOLD_ENV = "STREAMLIT_MATH_SLOW_THRESHOLD"
+DEFAULT_LOG_PATH = "slow_expressions.jsonl"
+DEFAULT_THRESHOLD = 2.0  # seconds
+
+_write_lock = threading.Lock()
+
+
+def log_path():
+    return os.environ.get(SLOW_LOG_ENV, DEFAULT_LOG_PATH)
+
+
+def threshold():
+    try:
+        return float(os.environ.get(SLOW_THRESHOLD_ENV, DEFAULT_THRESHOLD))
+    except ValueError:
+        return DEFAULT_THRESHOLD
+
+
+def _encode(value):
+    """Makes an input JSON-serializable. SymPy objects are stored as srepr so replay is exact."""
+    if isinstance(value, sympy.Basic):
+        return {"srepr": sympy.srepr(value), "str": str(value)}
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return str(value)
+
+
+def _decode(value):
+    if isinstance(value, dict) and "srepr" in value:
+        return sympy.sympify(value["srepr"])
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+def record(operation, inputs, duration, error=None):
+    """Appends one entry to the slow log. Never raises: logging must not break the app."""
+    entry = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "operation": operation,
+        "inputs": {name: _encode(value) for name, value in inputs.items()},
+        "duration": round(duration, 6),
+        "sympy_version": sympy.__version__,
+        "python_version": platform.python_version(),
+    }
+    if error is not None:
+        entry["error"] = f"{type(error).__name__}: {error}"
+    try:
+        line = json.dumps(entry)
+        with _write_lock:
+            with open(log_path(), "a") as f:
+                f.write(line + "\n")
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+@contextmanager
+def watch(operation, **inputs):
+    """
+    Context manager that logs the enclosed block if it runs longer than the threshold.
+    Pass the inputs as keyword arguments named after the replayed function's parameters,
+    e.g. watch("solveset", f=equation, symbol=var, domain=domain).
+    """
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        if duration >= threshold():
+            record(operation, inputs, duration, error)
+
+
+def recorded(operation=None):
+    """
+    Decorator that logs calls slower than the threshold, capturing the bound arguments.
+    Usable bare (@recorded) or with an explicit operation name.
+    """
+    def decorator(func):
+        name = operation or func.__name__
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            error = None
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                duration = time.perf_counter() - start
+                if duration >= threshold():
+                    bound = signature.bind(*args, **kwargs)
+                    bound.apply_defaults()
+                    record(name, dict(bound.arguments), duration, error)
+        return wrapper
+
+    if callable(operation):  # Used bare: @recorded
+        func, operation = operation, None
+        return decorator(func)
+    return decorator
+
+
+# --- Replay ---
+
+def replay_operations():
+    """Maps logged operation names to the functions that replay them."""
+    # Imported here: calculus_helpers and coalesce themselves use this module
+    from . import calculus_helpers, coalesce
+    return {
+        "compute_limit": calculus_helpers.compute_limit,
+        "compute_derivative": calculus_helpers.compute_derivative,
+        "compute_integral": calculus_helpers.compute_integral,
+        "compute_taylor_series": calculus_helpers.compute_taylor_series,
+        "simplify": coalesce.simplify,
+        "trigsimp": coalesce.trigsimp,
+        "solveset": sympy.solveset,
+    }
+
+
+def read_log(path):
+    """Yields the entries of a slow log, skipping malformed lines."""
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def replay_call(entry, operations=None):
+    """Returns a zero-argument callable that re-runs a logged entry."""
+    if operations is None:
+        operations = replay_operations()
+    func = operations.get(entry["operation"])
+    if func is None:
+        raise KeyError(f"Unknown operation '{entry['operation']}'")
+    inputs = {name: _decode(value) for name, value in entry["inputs"].items()}
+    return lambda: func(**inputs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.slowlog", description="Inspect and replay the slow-expression log.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    replay_parser = subparsers.add_parser("replay", help="Re-run logged entries under cProfile.")
+    replay_parser.add_argument("log", nargs="?", default=None, help="Slow log file (default: $STREAMLIT_MATH_SLOW_LOG or slow_expressions.jsonl).")
+    replay_parser.add_argument("--profile-dir", default="slow_profiles", help="Directory for per-entry .prof files (default: slow_profiles).")
+    replay_parser.add_argument("--operation", default=None, help="Only replay entries of this operation.")
+    replay_parser.add_argument("--top", type=int, default=10, help="Functions to show per entry, by cumulative time (default: 10).")
+    args = parser.parse_args(argv)
+
+    path = args.log or log_path()
+    try:
+        entries = list(read_log(path))
+    except FileNotFoundError:
+        print(f"No slow log found at {path}.")
+        return 1
+    if args.operation:
+        entries = [e for e in entries if e.get("operation") == args.operation]
+    if not entries:
+        print("No entries to replay.")
+        return 0
+
+    # Replayed calls go through the same recorders; don't let them append to the log.
+    # (Set via the environment because under -m this module is loaded twice.)
+    os.environ[SLOW_THRESHOLD_ENV] = "inf"
+
+    os.makedirs(args.profile_dir, exist_ok=True)
+    operations = replay_operations()
+    for index, entry in enumerate(entries, start=1):
+        inputs_desc = ", ".join(f"{k}={v['str'] if isinstance(v, dict) else v!r}" for k, v in entry["inputs"].items())
+        print(f"[{index}/{len(entries)}] {entry['operation']}({inputs_desc})")
+        print(f"    logged: {entry['duration']:.3f}s on SymPy {entry.get('sympy_version', '?')}; replaying on SymPy {sympy.__version__}")
+        try:
+            call = replay_call(entry, operations)
+        except (KeyError, sympy.SympifyError) as e:
+            print(f"    skipped: {e}")
+            continue
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profiler.runcall(call)
+            outcome = "ok"
+        except Exception as e:
+            outcome = f"raised {type(e).__name__}: {e}"
+        duration = time.perf_counter() - start
+
+        profile_path = os.path.join(args.profile_dir, f"{index:04d}_{entry['operation']}.prof")
+        profiler.dump_stats(profile_path)
+        print(f"    replayed: {duration:.3f}s ({outcome}); profile: {profile_path}")
+
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(args.top)
+        print("\n".join("    " + line for line in stream.getvalue().strip().splitlines()))
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 import sympy
 import numpy as np
 import math
+from .metrics import instrumented
 
 # Define reference angles in radians and their exact SymPy values
 # Using SymPy values ensures precision for comparisons and display
@@ -48,6 +49,7 @@ TRIG_IDENTITIES = [
     # NEEDED: difference angles, half-angles, power-reducing, sum-to-product, ...
 ]
 
+@instrumented
 def get_trig_values(angle_rad_sympy):
     """Calculates all 6 trig values using SymPy for precision."""
     vals = {
@@ -62,6 +64,7 @@ def get_trig_values(angle_rad_sympy):
     vals_evalf = {k: v.evalf(5) if hasattr(v, 'evalf') else v for k, v in vals.items()}
     return vals, vals_evalf
 
+@instrumented
 def check_reference_angle(angle_deg):
     """Checks if the angle (in degrees) is a common reference angle."""
     for deg, data in REFERENCE_ANGLES.items():
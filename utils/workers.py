@@ -0,0 +1,99 @@
+"""
+Worker processes for offloading heavy SymPy computations.
+
+SymPy is pure Python, so threads don't add CPU parallelism; worker processes do,
+and keep slow symbolic work from tying up the Streamlit script thread.
+Jobs are queued fairly across sessions by utils.scheduler.
+
+    future = workers.submit(sympy.solveset, equation, var, domain, time_limit=10)
+    solution, error = workers.wait_result(future, timeout=15)
+
+    result, error = workers.run(coalesce.simplify, expr, time_limit=30)
+
+Set STREAMLIT_MATH_WORKERS to change the number of worker processes (default: CPU count).
+"""
+import os
+import signal
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+
+WORKERS_ENV = "STREAMLIT_MATH_WORKERS"
+
+
+class WorkerTimeout(BaseException):
+    """
+    Raised when a computation exceeds its time limit.
+    Derives from BaseException so the helpers' generic `except Exception` handlers don't swallow it.
+    """
+
+
+def _alarm_handler(signum, frame):
+    raise WorkerTimeout()
+
+
+@contextmanager
+def time_limit(seconds):
+    """
+    Raises WorkerTimeout in the enclosed block after `seconds`.
+    Uses SIGALRM, so it only takes effect on Unix in the main thread (always the case in
+    pool workers); elsewhere it is a no-op and callers must rely on waiting with a timeout.
+    """
+    if (seconds is None or not hasattr(signal, "setitimer")
+            or threading.current_thread() is not threading.main_thread()):
+        yield
+        return
+    previous_handler = signal.signal(signal.SIGALRM, _alarm_handler)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def _run_with_time_limit(func, seconds, args, kwargs):
+    with time_limit(seconds):
+        return func(*args, **kwargs)
+
+
+def pool_size():
+    try:
+        return max(1, int(os.environ.get(WORKERS_ENV, "")))
+    except ValueError:
+        return os.cpu_count() or 1
+
+
+def submit(func, *args, time_limit=None, **kwargs):
+    """
+    Schedules func(*args, **kwargs) on a worker process and returns a Future.
+    The job is classified (cheap or expensive) by the function's name and the size of its
+    SymPy arguments, and queued for the calling Streamlit session.
+    With time_limit (seconds), the worker abandons the call by raising WorkerTimeout,
+    so a pathological input can't occupy a worker forever.
+    func and its arguments must be picklable (module-level functions, SymPy objects).
+    """
+    from .scheduler import get_scheduler, current_session_id # Imported here: scheduler imports this module
+    return get_scheduler().submit(func.__name__, func, args, kwargs, time_limit=time_limit, session_id=current_session_id())
+
+
+def wait_result(future, timeout=None):
+    """
+    Waits for a submitted computation. Returns (result, None) on success or
+    (None, error message) on timeout or failure.
+    """
+    try:
+        return future.result(timeout=timeout), None
+    except (FutureTimeoutError, WorkerTimeout):
+        future.cancel() # Drops it if it never started; a running call ends at its time_limit
+        return None, f"Timed out after {timeout:g}s." if timeout else "Timed out."
+    except Exception as e:
+        return None, str(e) or type(e).__name__
+
+
+def run(func, *args, time_limit=None, **kwargs):
+    """
+    Runs func in a worker and waits for it; returns (result, error message).
+    Waits through any queueing: the time limit bounds the computation itself.
+    """
+    return wait_result(submit(func, *args, time_limit=time_limit, **kwargs))